@@ -1,6 +1,12 @@
 # app/__init__.py
 from flask import Flask
 from config import Config
+from . import database
+from .cache import CacheOtimizacao
+from .comandos import registrar_comandos
+from .metricas import registrar_metricas
+from .renderizacao import registrar_renderizacao
+from .tarefas import GerenciadorTarefas
 
 def create_app(config_class=Config):
     """Fábrica de Aplicação"""
@@ -14,9 +20,43 @@ def create_app(config_class=Config):
     app.config['LARGURA_CHAPA_PADRAO'] = config_class.LARGURA_CHAPA_PADRAO
     app.config['DATABASE_PATH'] = config_class.DATABASE_PATH
     
+    # Índices/WAL no banco e snapshot opcional do catálogo em memória
+    database.preparar_banco(config_class.DATABASE_PATH)
+    database.ativar_catalogo(config_class.CATALOGO_EM_MEMORIA)
+    
+    # Cache LRU dos resultados do otimizador, compartilhado pelas rotas
+    app.extensions['cache_otimizacao'] = CacheOtimizacao(
+        config_class.DATABASE_PATH,
+        max_itens=config_class.CACHE_MAX_ITENS,
+        max_bytes=int(config_class.CACHE_MAX_MB * 1024 * 1024)
+    )
+    
+    # Resultados por perfil de demanda: não são descartados quando o banco
+    # muda, então uma sincronização que não altera o perfil sai de graça
+    app.extensions['cache_perfis'] = CacheOtimizacao(
+        None,
+        max_itens=config_class.CACHE_PERFIS_MAX_ITENS,
+        max_bytes=int(config_class.CACHE_PERFIS_MAX_MB * 1024 * 1024)
+    )
+    
+    # Pool que roda as otimizações pedidas como tarefa, fora das requisições
+    app.extensions['tarefas'] = GerenciadorTarefas(
+        max_trabalhadores=config_class.TAREFAS_TRABALHADORES,
+        retencao_s=config_class.TAREFAS_RETENCAO_S
+    )
+    
     # Registra as rotas (Blueprint)
     with app.app_context():
         from . import routes
         app.register_blueprint(routes.bp)
-
+    
+    # Comandos de linha de comando (flask otimizar-lote, ...)
+    registrar_comandos(app)
+    
+    # Latência de todas as requisições, exportada em /metrics
+    registrar_metricas(app)
+    
+    # Cartões renderizados em cache, estáticos com hash e respostas comprimidas
+    registrar_renderizacao(app)
+    
     return app
\ No newline at end of file
@@ -0,0 +1,141 @@
+# app/cache.py
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional
+
+from . import database
+from .models import Item
+
+
+def impressao_digital(itens: List[Item]) -> str:
+    """Resumo estável do grupo: muda se qualquer medida, estoque ou demanda mudar"""
+    campos = sorted(
+        (item.item_code, item.item_name, item.espessura, item.desenvolvimento, item.largura,
+         item.estoque_atual, item.estoque_maximo, item.demanda)
+        for item in itens
+    )
+    return hashlib.sha1(repr(campos).encode('utf-8')).hexdigest()
+
+
+def _estimar_tamanho(valor: Any, vistos: set = None) -> int:
+    """Estimativa recursiva de memória (bytes) de um resultado em cache"""
+    if vistos is None:
+        vistos = set()
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    
+    tamanho = sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        tamanho += sum(_estimar_tamanho(k, vistos) + _estimar_tamanho(v, vistos) for k, v in valor.items())
+    elif isinstance(valor, (list, tuple, set)):
+        tamanho += sum(_estimar_tamanho(v, vistos) for v in valor)
+    elif hasattr(valor, '__dict__'):
+        tamanho += _estimar_tamanho(vars(valor), vistos)
+    
+    return tamanho
+
+
+class CacheOtimizacao:
+    """Cache LRU dos resultados do otimizador, limitado em entradas e memória.
+    
+    A chave leva a largura utilizável e a impressão digital do grupo. Além
+    disso, o cache inteiro é descartado quando `PRAGMA data_version` muda,
+    ou seja, quando alguma conexão grava em `tbl_demanda`. Sem `db_path`,
+    as entradas só saem por LRU (chaves que já descrevem tudo o que o valor
+    depende, como a do perfil de demanda do otimizador).
+    """
+    
+    def __init__(self, db_path: Optional[str], max_itens: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_itens = max_itens
+        self.max_bytes = max_bytes
+        
+        self._entradas = OrderedDict()  # chave -> (valor, tamanho estimado)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._versao_dados = None
+        
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.invalidacoes = 0
+    
+    def obter_ou_calcular(self, chave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Devolve o valor em cache ou calcula, guarda e devolve"""
+        with self._lock:
+            self._verificar_versao()
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave][0]
+            self.falhas += 1
+        
+        # Calcula fora do lock para não serializar otimizações diferentes
+        valor = calcular()
+        self.guardar(chave, valor)
+        return valor
+    
+    def consultar(self, chave: Hashable, padrao: Any = None) -> Any:
+        """Valor em cache sem calcular nada (`padrao` se não houver)"""
+        with self._lock:
+            self._verificar_versao()
+            if chave in self._entradas:
+                self._entradas.move_to_end(chave)
+                self.acertos += 1
+                return self._entradas[chave][0]
+            return padrao
+    
+    def guardar(self, chave: Hashable, valor: Any):
+        """Insere o valor e remove os menos usados até caber nos limites"""
+        tamanho = _estimar_tamanho(valor)
+        if tamanho > self.max_bytes:
+            return
+        
+        with self._lock:
+            if chave in self._entradas:
+                self._bytes -= self._entradas.pop(chave)[1]
+            
+            self._entradas[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            
+            while len(self._entradas) > self.max_itens or self._bytes > self.max_bytes:
+                _, (_, tamanho_removido) = self._entradas.popitem(last=False)
+                self._bytes -= tamanho_removido
+                self.remocoes += 1
+    
+    def limpar(self):
+        """Descarta todas as entradas"""
+        with self._lock:
+            self._entradas.clear()
+            self._bytes = 0
+    
+    def estatisticas(self) -> dict:
+        """Contadores de uso do cache"""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self._bytes,
+                'max_itens': self.max_itens,
+                'max_bytes': self.max_bytes,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+                'remocoes': self.remocoes,
+                'invalidacoes': self.invalidacoes
+            }
+    
+    def _verificar_versao(self):
+        """Esvazia o cache se o banco mudou desde a última consulta (chamado com o lock)"""
+        if self.db_path is None:
+            return
+        versao = database.versao_dados(self.db_path)
+        if versao != self._versao_dados:
+            if self._versao_dados is not None and self._entradas:
+                self.invalidacoes += 1
+            self._entradas.clear()
+            self._bytes = 0
+            self._versao_dados = versao
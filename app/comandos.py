@@ -0,0 +1,110 @@
+# app/comandos.py
+import json
+
+import click
+from flask import current_app
+
+from .intercambio import importar_csv
+from .lote import otimizar_lote
+from .precalculo import atualizar_padroes, grupos_desatualizados
+
+
+def _ler_grupo(valor: str):
+    """Converte 'espessura:largura' em tupla de floats"""
+    try:
+        espessura, largura = valor.split(':')
+        return float(espessura), float(largura)
+    except ValueError:
+        raise click.BadParameter(f"Grupo inválido '{valor}', use espessura:largura")
+
+
+@click.command('otimizar-lote')
+@click.option('--largura', type=float, default=None, help='Largura bruta da chapa (mm)')
+@click.option('--refilo', type=float, default=0.0, help='Refilo descontado da largura (mm)')
+@click.option('--grupo', 'grupos', multiple=True, help='Grupo espessura:largura (repetível); padrão: todos')
+@click.option('--processos', type=int, default=None, help='Processos em paralelo; padrão: núcleos da máquina')
+@click.option('--top', 'top_n', type=int, default=10, help='Padrões por grupo')
+def otimizar_lote_comando(largura, refilo, grupos, processos, top_n):
+    """Otimiza todos os grupos (ou os escolhidos) e imprime um JSON por linha"""
+    largura_bruta = largura or current_app.config['LARGURA_CHAPA_PADRAO']
+    largura_utilizavel = largura_bruta - refilo
+    if largura_utilizavel <= 0:
+        raise click.BadParameter('Refilo não pode ser maior que a largura da chapa.')
+    
+    resultados = otimizar_lote(
+        current_app.config['DATABASE_PATH'],
+        largura_utilizavel,
+        grupos=[_ler_grupo(grupo) for grupo in grupos] or None,
+        processos=processos or current_app.config['LOTE_PROCESSOS'],
+        top_n=top_n,
+        margem_corte=current_app.config['MARGEM_CORTE'],
+        semente=current_app.config['BUSCA_SEMENTE'],
+        partidas=current_app.config['BUSCA_PARTIDAS']
+    )
+    
+    for resultado in resultados:
+        click.echo(json.dumps(resultado, ensure_ascii=False))
+
+
+@click.command('precalcular-padroes')
+@click.option('--largura', 'larguras', type=float, multiple=True, help='Largura bruta da chapa (mm, repetível)')
+@click.option('--refilo', type=float, default=0.0, help='Refilo descontado da largura (mm)')
+@click.option('--grupo', 'grupos', multiple=True, help='Grupo espessura:largura (repetível); padrão: todos')
+@click.option('--qtd-minima', 'quantidade_minima', type=int, default=1, help='Peças mínimas do item escolhido')
+@click.option('--forcar', is_flag=True, help='Recalcula mesmo os grupos sem alteração')
+@click.option('--verificar', is_flag=True, help='Só lista os grupos desatualizados, sem calcular')
+@click.option('--processos', type=int, default=None, help='Processos em paralelo; padrão: núcleos da máquina')
+def precalcular_padroes_comando(larguras, refilo, grupos, quantidade_minima, forcar, verificar, processos):
+    """Grava o top 10 ancorado de cada item dos grupos novos ou alterados"""
+    db_path = current_app.config['DATABASE_PATH']
+    margem_corte = current_app.config['MARGEM_CORTE']
+    semente, partidas = current_app.config['BUSCA_SEMENTE'], current_app.config['BUSCA_PARTIDAS']
+    grupos = [_ler_grupo(grupo) for grupo in grupos] or None
+    quantidade_minima = max(quantidade_minima, 1)
+    
+    for largura_bruta in larguras or [current_app.config['LARGURA_CHAPA_PADRAO']]:
+        largura_util = largura_bruta - refilo
+        if largura_util <= 0:
+            raise click.BadParameter('Refilo não pode ser maior que a largura da chapa.')
+        
+        if verificar:
+            desatualizados = grupos_desatualizados(
+                db_path, largura_util, quantidade_minima, grupos, margem_corte, semente, partidas
+            )
+            for espessura, largura in desatualizados:
+                click.echo(json.dumps({'espessura': espessura, 'largura': largura, 'largura_util': largura_util}))
+            continue
+        
+        resultados = atualizar_padroes(
+            db_path,
+            largura_util,
+            quantidade_minima=quantidade_minima,
+            grupos=grupos,
+            forcar=forcar,
+            processos=processos or current_app.config['LOTE_PROCESSOS'],
+            margem_corte=margem_corte,
+            semente=semente,
+            partidas=partidas
+        )
+        for resultado in resultados:
+            click.echo(json.dumps(resultado, ensure_ascii=False))
+
+
+@click.command('importar-itens')
+@click.argument('arquivo', type=click.Path(exists=True, dir_okay=False))
+def importar_itens_comando(arquivo):
+    """Upsert dos itens de um CSV em tbl_demanda por ItemCode (uma transação)"""
+    try:
+        with open(arquivo, encoding='utf-8-sig', newline='') as entrada:
+            resultado = importar_csv(current_app.config['DATABASE_PATH'], entrada)
+    except ValueError as erro:
+        raise click.ClickException(str(erro))
+    
+    click.echo(json.dumps(resultado, ensure_ascii=False))
+
+
+def registrar_comandos(app):
+    """Registra os comandos de linha de comando (flask ...) na aplicação"""
+    app.cli.add_command(otimizar_lote_comando)
+    app.cli.add_command(precalcular_padroes_comando)
+    app.cli.add_command(importar_itens_comando)
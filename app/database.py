@@ -1,17 +1,175 @@
 # app/database.py
+import functools
+import itertools
+import os
 import sqlite3
-from typing import List
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Tuple
+from . import metricas
 from .models import Item
 
-# Nota: A conexão não é mais global. 
-# É uma boa prática abrir e fechar conexões por transação.
+# Conexões ficam abertas por thread (pool thread-local) e são reutilizadas
+# entre chamadas; o SQLite não permite compartilhar uma conexão entre threads.
+_local = threading.local()
 
-def get_db_connection(db_path: str):
-    """Conecta ao banco de dados"""
+# Colunas lidas de tbl_demanda, na ordem esperada por _row_to_item
+_COLUNAS = (
+    'ItemCode, ItemName, espessura, desenvolvimento, largura, '
+    'estoque_atual, estoque_maximo, demanda'
+)
+CAMPOS = tuple(coluna.strip() for coluna in _COLUNAS.split(','))
+
+# Linhas por `executemany`/`fetchmany` na importação e na exportação
+LOTE_LINHAS = 1000
+
+_lock = threading.Lock()
+_bancos_preparados = set()
+_monitores: Dict[str, sqlite3.Connection] = {}
+_catalogos: Dict[str, 'CatalogoItens'] = {}
+_catalogo_ativo = False
+_herdadas = []
+
+# Fallback da versão da tabela quando não há tbl_versao (banco somente leitura)
+_INICIO_PROCESSO = time.time()
+
+# Gatilhos que contam alterações em tbl_demanda (versão persistente + instante)
+_GATILHOS_VERSAO = {
+    'trg_demanda_versao_insert': 'AFTER INSERT ON tbl_demanda',
+    'trg_demanda_versao_update': 'AFTER UPDATE ON tbl_demanda',
+    'trg_demanda_versao_delete': 'AFTER DELETE ON tbl_demanda',
+}
+
+
+def _apos_fork():
+    """Processo filho (ex.: pool do lote) não pode reutilizar conexões do pai"""
+    global _local, _lock
+    # Guarda as referências: fechar no filho mexeria nos locks do arquivo do pai
+    _herdadas.append((_local, dict(_monitores)))
+    _local = threading.local()
+    _lock = threading.Lock()
+    _monitores.clear()
+
+
+os.register_at_fork(after_in_child=_apos_fork)
+
+
+def _medir(funcao):
+    """Registra a duração da consulta no histograma do /metrics"""
+    @functools.wraps(funcao)
+    def medida(*args, **kwargs):
+        with metricas.cronometrar(metricas.BANCO_SEGUNDOS, consulta=funcao.__name__):
+            return funcao(*args, **kwargs)
+    return medida
+
+
+def ativar_catalogo(ativo: bool = True):
+    """Liga/desliga o snapshot do catálogo em memória para as consultas de leitura"""
+    global _catalogo_ativo
+    _catalogo_ativo = ativo
+    if not ativo:
+        _catalogos.clear()
+
+
+def preparar_banco(db_path: str):
+    """Ativa WAL e cria os índices usados pelas consultas (uma vez por processo).
+    
+    Só conta como preparado depois que tudo foi gravado: com o banco
+    ocupado ou somente leitura, a próxima conexão nova tenta de novo.
+    """
+    with _lock:
+        if db_path in _bancos_preparados:
+            return
+    
     conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_demanda_itemcode ON tbl_demanda (ItemCode)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_demanda_dimensoes ON tbl_demanda (espessura, largura)')
+        
+        # Versão da tabela para ETag/Last-Modified: sobrevive a reinícios,
+        # ao contrário de `PRAGMA data_version`
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS tbl_versao ('
+            'tabela TEXT PRIMARY KEY, versao INTEGER NOT NULL, alterado_em REAL NOT NULL)'
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO tbl_versao (tabela, versao, alterado_em) "
+            "VALUES ('tbl_demanda', 1, (julianday('now') - 2440587.5) * 86400.0)"
+        )
+        # Top N ancorado pré-calculado por grupo, largura útil, mínimo e item
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS tbl_padroes_precalculados ('
+            'espessura REAL NOT NULL, largura REAL NOT NULL, largura_util REAL NOT NULL, '
+            'quantidade_minima INTEGER NOT NULL, item_code TEXT NOT NULL, impressao TEXT NOT NULL, '
+            'itens TEXT NOT NULL, padroes BLOB NOT NULL, calculado_em REAL NOT NULL, '
+            'PRIMARY KEY (espessura, largura, largura_util, quantidade_minima, item_code))'
+        )
+        
+        for nome, evento in _GATILHOS_VERSAO.items():
+            conn.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {nome} {evento} BEGIN '
+                "UPDATE tbl_versao SET versao = versao + 1, "
+                "alterado_em = (julianday('now') - 2440587.5) * 86400.0 "
+                "WHERE tabela = 'tbl_demanda'; END"
+            )
+        conn.commit()
+        with _lock:
+            _bancos_preparados.add(db_path)
+    except sqlite3.OperationalError:
+        # Banco somente leitura ou ocupado: segue sem WAL/índices
+        pass
+    finally:
+        conn.close()
+
+
+def get_db_connection(db_path: str):
+    """Conexão da thread atual para o banco (criada na primeira chamada)"""
+    conexoes = getattr(_local, 'conexoes', None)
+    if conexoes is None:
+        conexoes = _local.conexoes = {}
+    
+    conn = conexoes.get(db_path)
+    if conn is None:
+        preparar_banco(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conexoes[db_path] = conn
     return conn
 
+
+def versao_dados(db_path: str) -> int:
+    """Valor de `PRAGMA data_version` visto por uma conexão que nunca grava.
+    
+    Muda sempre que qualquer outra conexão (inclusive as do pool) confirma
+    uma gravação no banco.
+    """
+    with _lock:
+        monitor = _monitores.get(db_path)
+        if monitor is None:
+            monitor = _monitores[db_path] = sqlite3.connect(db_path, check_same_thread=False)
+        return monitor.execute('PRAGMA data_version').fetchone()[0]
+
+
+def versao_tabela(db_path: str) -> Tuple[str, float]:
+    """Versão de `tbl_demanda` e instante (epoch) da última alteração.
+    
+    Vem de `tbl_versao`, mantida pelos gatilhos; sem ela (banco somente
+    leitura), usa `data_version` prefixado pelo início do processo.
+    """
+    try:
+        row = get_db_connection(db_path).execute(
+            "SELECT versao, alterado_em FROM tbl_versao WHERE tabela = 'tbl_demanda'"
+        ).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    
+    if row is None:
+        return f'{int(_INICIO_PROCESSO)}.{versao_dados(db_path)}', _INICIO_PROCESSO
+    return str(row['versao']), float(row['alterado_em'])
+
+
 def _row_to_item(row: sqlite3.Row) -> Item:
     """Converte uma linha do banco em um objeto Item"""
     return Item(
@@ -25,29 +183,197 @@ def _row_to_item(row: sqlite3.Row) -> Item:
         demanda=int(row['demanda'])
     )
 
+
+class CatalogoItens:
+    """Snapshot imutável de tbl_demanda indexado por código e por grupo de dimensões"""
+    
+    def __init__(self, itens: List[Item], versao: int):
+        self.versao = versao
+        self.itens = itens
+        self.por_codigo = {item.item_code: item for item in itens}
+        self.por_dimensoes = defaultdict(list)
+        for item in itens:
+            self.por_dimensoes[(item.espessura, item.largura)].append(item)
+
+
+def get_catalogo(db_path: str) -> CatalogoItens:
+    """Snapshot do catálogo, recarregado só quando `data_version` muda"""
+    versao = versao_dados(db_path)
+    catalogo = _catalogos.get(db_path)
+    
+    if catalogo is None or catalogo.versao != versao:
+        with metricas.cronometrar(metricas.BANCO_SEGUNDOS, consulta='carregar_catalogo'):
+            rows = get_db_connection(db_path).execute(f'SELECT {_COLUNAS} FROM tbl_demanda').fetchall()
+            catalogo = CatalogoItens([_row_to_item(row) for row in rows], versao)
+        _catalogos[db_path] = catalogo
+    
+    return catalogo
+
+
+@_medir
 def get_all_items(db_path: str) -> List[Item]:
     """Busca todos os itens do banco"""
-    conn = get_db_connection(db_path)
-    rows = conn.execute('SELECT * FROM tbl_demanda').fetchall()
-    conn.close()
+    if _catalogo_ativo:
+        return list(get_catalogo(db_path).itens)
+    
+    rows = get_db_connection(db_path).execute(f'SELECT {_COLUNAS} FROM tbl_demanda').fetchall()
     return [_row_to_item(row) for row in rows]
 
+
+@_medir
 def get_items_by_dimensions(db_path: str, espessura: float, largura: float) -> List[Item]:
     """Busca itens com mesma espessura e largura"""
-    conn = get_db_connection(db_path)
-    rows = conn.execute(
-        'SELECT * FROM tbl_demanda WHERE espessura = ? AND largura = ?',
+    if _catalogo_ativo:
+        return list(get_catalogo(db_path).por_dimensoes.get((espessura, largura), []))
+    
+    rows = get_db_connection(db_path).execute(
+        f'SELECT {_COLUNAS} FROM tbl_demanda WHERE espessura = ? AND largura = ?',
         (espessura, largura)
     ).fetchall()
-    conn.close()
     return [_row_to_item(row) for row in rows]
 
+
+@_medir
 def get_item_by_code(db_path: str, item_code: str) -> Item | None:
     """Busca um item específico pelo código"""
-    conn = get_db_connection(db_path)
-    row = conn.execute('SELECT * FROM tbl_demanda WHERE ItemCode = ?', (item_code,)).fetchone()
-    conn.close()
+    if _catalogo_ativo:
+        return get_catalogo(db_path).por_codigo.get(item_code)
+    
+    row = get_db_connection(db_path).execute(
+        f'SELECT {_COLUNAS} FROM tbl_demanda WHERE ItemCode = ?', (item_code,)
+    ).fetchone()
     
     if row:
         return _row_to_item(row)
-    return None
\ No newline at end of file
+    return None
+
+
+@_medir
+def get_dimension_groups(db_path: str) -> List[Tuple[float, float, int]]:
+    """Lista os grupos (espessura, largura) distintos com o número de itens"""
+    if _catalogo_ativo:
+        grupos = get_catalogo(db_path).por_dimensoes
+        return [(esp, larg, len(grupos[(esp, larg)])) for esp, larg in sorted(grupos)]
+    
+    rows = get_db_connection(db_path).execute(
+        'SELECT espessura, largura, COUNT(*) AS total FROM tbl_demanda '
+        'GROUP BY espessura, largura ORDER BY espessura, largura'
+    ).fetchall()
+    return [(float(row['espessura']), float(row['largura']), int(row['total'])) for row in rows]
+
+
+@_medir
+def buscar_itens(db_path: str, busca: str = '', espessura: float | None = None,
+                 pagina: int = 1, por_pagina: int = 50) -> Tuple[List[Item], int]:
+    """Página de itens filtrada por código/nome e espessura; devolve (itens, total).
+    
+    Mesma ordem da página inicial: prioridade alta primeiro e, dentro de
+    cada prioridade, a ordem de inserção.
+    """
+    condicoes, parametros = [], []
+    
+    if busca:
+        padrao = '%' + busca.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        condicoes.append("(ItemCode LIKE ? ESCAPE '\\' OR ItemName LIKE ? ESCAPE '\\')")
+        parametros += [padrao, padrao]
+    
+    if espessura is not None:
+        condicoes.append('espessura = ?')
+        parametros.append(espessura)
+    
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ''
+    conn = get_db_connection(db_path)
+    
+    total = conn.execute(f'SELECT COUNT(*) FROM tbl_demanda {where}', parametros).fetchone()[0]
+    
+    # Página depois da última: vazia, sem consulta (o OFFSET poderia nem caber num inteiro do SQLite)
+    if (pagina - 1) * por_pagina >= total:
+        return [], total
+    
+    rows = conn.execute(
+        f'SELECT {_COLUNAS} FROM tbl_demanda {where} '
+        'ORDER BY (demanda > estoque_atual) DESC, rowid LIMIT ? OFFSET ?',
+        parametros + [por_pagina, (pagina - 1) * por_pagina]
+    ).fetchall()
+    
+    return [_row_to_item(row) for row in rows], total
+
+
+@_medir
+def get_espessuras(db_path: str) -> List[float]:
+    """Espessuras distintas, em ordem crescente"""
+    if _catalogo_ativo:
+        return sorted({espessura for espessura, _ in get_catalogo(db_path).por_dimensoes})
+    
+    rows = get_db_connection(db_path).execute(
+        'SELECT DISTINCT espessura FROM tbl_demanda ORDER BY espessura'
+    ).fetchall()
+    return [float(row['espessura']) for row in rows]
+
+
+def iterar_itens(db_path: str, lote: int = LOTE_LINHAS) -> Iterator[Item]:
+    """Todos os itens na ordem de inserção, lidos `lote` linhas por vez (memória constante)"""
+    if _catalogo_ativo:
+        yield from get_catalogo(db_path).itens
+        return
+    
+    cursor = get_db_connection(db_path).execute(f'SELECT {_COLUNAS} FROM tbl_demanda ORDER BY rowid')
+    while True:
+        rows = cursor.fetchmany(lote)
+        if not rows:
+            return
+        for row in rows:
+            yield _row_to_item(row)
+
+
+@_medir
+def gravar_itens(db_path: str, colunas: Tuple[str, ...], linhas: Iterable[tuple],
+                 lote: int = LOTE_LINHAS) -> Dict[str, int]:
+    """Upsert por ItemCode em tbl_demanda, com `executemany` em lotes numa transação só.
+    
+    `colunas` deve conter ItemCode. Com todas as colunas, insere os códigos
+    novos e atualiza os existentes; com só algumas (ex.: ItemCode,
+    estoque_atual, demanda), só atualiza os existentes e ignora os
+    desconhecidos. `linhas` pode ser um gerador: nada é acumulado além de um
+    lote, e um erro no meio desfaz a importação inteira.
+    """
+    if 'ItemCode' not in colunas or not set(colunas) <= set(CAMPOS):
+        raise ValueError(f'Colunas inválidas: {", ".join(colunas)}')
+    
+    atualizar = [coluna for coluna in colunas if coluna != 'ItemCode']
+    completo = set(colunas) == set(CAMPOS)
+    conn = get_db_connection(db_path)
+    
+    if completo:
+        # O upsert precisa de ItemCode único
+        try:
+            conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_demanda_itemcode_unico ON tbl_demanda (ItemCode)')
+        except sqlite3.IntegrityError:
+            raise ValueError('tbl_demanda tem ItemCode repetido; remova as duplicatas antes de importar.') from None
+        sql = (
+            f'INSERT INTO tbl_demanda ({", ".join(colunas)}) VALUES ({", ".join("?" * len(colunas))}) '
+            f'ON CONFLICT (ItemCode) DO UPDATE SET {", ".join(f"{c} = excluded.{c}" for c in atualizar)}'
+        )
+    else:
+        # Parâmetros na ordem de `colunas`: ItemCode vai por nome no WHERE
+        sql = (
+            f'UPDATE tbl_demanda SET {", ".join(f"{c} = :{c}" for c in atualizar)} WHERE ItemCode = :ItemCode'
+        )
+    
+    processadas = alteradas = 0
+    linhas = iter(linhas)
+    with conn:
+        antes = conn.execute('SELECT COUNT(*) FROM tbl_demanda').fetchone()[0]
+        while True:
+            bloco = list(itertools.islice(linhas, lote))
+            if not bloco:
+                break
+            if not completo:
+                bloco = [dict(zip(colunas, linha)) for linha in bloco]
+            alteradas += conn.executemany(sql, bloco).rowcount
+            processadas += len(bloco)
+        inseridas = conn.execute('SELECT COUNT(*) FROM tbl_demanda').fetchone()[0] - antes
+    
+    if completo:
+        return {'linhas': processadas, 'inseridos': inseridas, 'atualizados': processadas - inseridas, 'ignorados': 0}
+    return {'linhas': processadas, 'inseridos': 0, 'atualizados': alteradas, 'ignorados': max(processadas - alteradas, 0)}
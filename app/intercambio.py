@@ -0,0 +1,186 @@
+# app/intercambio.py
+import csv
+import io
+import itertools
+import json
+from typing import Dict, Iterable, Iterator, List, TextIO
+
+from . import database
+
+# Conversão de cada coluna de tbl_demanda lida do CSV
+_TIPOS = {
+    'ItemCode': str,
+    'ItemName': str,
+    'espessura': float,
+    'desenvolvimento': float,
+    'largura': float,
+    'estoque_atual': int,
+    'estoque_maximo': int,
+    'demanda': int,
+}
+
+# Colunas do CSV do plano do lote: uma linha por item de cada padrão, com as
+# peças por chapa (`quantidade`) e no plano todo (`pecas` = quantidade x chapas)
+_COLUNAS_LOTE = (
+    'espessura', 'largura', 'total_chapas', 'limite_inferior', 'padrao', 'chapas', 'desperdicio',
+    'utilizacao_percentual', 'perda_corte', 'item_code', 'item_name', 'desenvolvimento', 'quantidade',
+    'pecas', 'erro'
+)
+
+
+def _converter(valor: str, tipo):
+    """Texto do CSV no tipo da coluna; números aceitam vírgula decimal"""
+    valor = valor.strip()
+    if tipo is str:
+        return valor
+    
+    try:
+        numero = float(valor.replace(',', '.'))
+    except ValueError:
+        raise ValueError(f'{valor!r} não é um número') from None
+    if tipo is int:
+        if not numero.is_integer():
+            raise ValueError(f'{valor!r} não é inteiro')
+        return int(numero)
+    return numero
+
+
+def importar_csv(db_path: str, arquivo: TextIO, lote: int = database.LOTE_LINHAS) -> dict:
+    """Importa um CSV de itens em tbl_demanda (upsert por ItemCode), lendo em fluxo.
+    
+    A primeira linha traz os nomes das colunas de tbl_demanda (sem
+    diferenciar maiúsculas); colunas desconhecidas são ignoradas e listadas
+    no resultado. O separador é `;` ou `,`, o que aparecer mais no
+    cabeçalho. Sem todas as colunas, só atualiza itens existentes (ver
+    `database.gravar_itens`). Levanta ValueError, sem gravar nada, se alguma
+    linha for inválida.
+    """
+    cabecalho = arquivo.readline()
+    if not cabecalho.strip():
+        raise ValueError('CSV vazio')
+    
+    separador = ';' if cabecalho.count(';') > cabecalho.count(',') else ','
+    leitor = csv.reader(itertools.chain([cabecalho], arquivo), delimiter=separador)
+    nomes = [nome.strip() for nome in next(leitor)]
+    
+    conhecidas = {campo.lower(): campo for campo in database.CAMPOS}
+    posicoes = {conhecidas[nome.lower()]: i for i, nome in enumerate(nomes) if nome.lower() in conhecidas}
+    ignoradas = [nome for nome in nomes if nome.lower() not in conhecidas]
+    
+    if 'ItemCode' not in posicoes or len(posicoes) < 2:
+        raise ValueError('O CSV precisa da coluna ItemCode e de pelo menos uma coluna para gravar')
+    
+    colunas = tuple(posicoes)
+    tipos = [_TIPOS[coluna] for coluna in colunas]
+    indices = list(posicoes.values())
+    
+    def linhas():
+        for campos in leitor:
+            if not any(campo.strip() for campo in campos):
+                continue
+            if len(campos) <= max(indices):
+                raise ValueError(f'Linha {leitor.line_num}: faltam colunas')
+            try:
+                valores = tuple(_converter(campos[i], tipo) for i, tipo in zip(indices, tipos))
+            except ValueError as erro:
+                raise ValueError(f'Linha {leitor.line_num}: {erro}') from None
+            if not valores[0]:
+                raise ValueError(f'Linha {leitor.line_num}: ItemCode vazio')
+            yield valores
+    
+    resultado = database.gravar_itens(db_path, colunas, linhas(), lote)
+    resultado['colunas_ignoradas'] = ignoradas
+    return resultado
+
+
+def _em_blocos(valores: Iterable, lote: int) -> Iterator[list]:
+    """Listas de até `lote` valores consecutivos"""
+    valores = iter(valores)
+    while True:
+        bloco = list(itertools.islice(valores, lote))
+        if not bloco:
+            return
+        yield bloco
+
+
+def _blocos_csv(cabecalho: Iterable[str], blocos: Iterable[List[tuple]]) -> Iterator[str]:
+    """CSV com um pedaço de texto por bloco de linhas (para respostas em fluxo)"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(cabecalho)
+    yield buffer.getvalue()
+    
+    for bloco in blocos:
+        buffer.seek(0)
+        buffer.truncate()
+        escritor.writerows(bloco)
+        yield buffer.getvalue()
+
+
+def _blocos_json(blocos: Iterable[List[dict]]) -> Iterator[str]:
+    """Lista JSON com um pedaço de texto por bloco de objetos, sem montar a lista em memória"""
+    yield '['
+    separador = '\n'
+    
+    for bloco in blocos:
+        yield separador + ',\n'.join(json.dumps(objeto, ensure_ascii=False) for objeto in bloco)
+        separador = ',\n'
+    
+    yield '\n]\n'
+
+
+def exportar_itens(db_path: str, formato: str = 'csv', lote: int = database.LOTE_LINHAS) -> Iterator[str]:
+    """Catálogo (tbl_demanda) em CSV, com as colunas do banco, ou em JSON, como `Item.para_dict`"""
+    blocos = _em_blocos(database.iterar_itens(db_path, lote), lote)
+    if formato == 'json':
+        return _blocos_json([item.para_dict() for item in bloco] for bloco in blocos)
+    
+    return _blocos_csv(
+        database.CAMPOS,
+        (
+            [
+                (item.item_code, item.item_name, item.espessura, item.desenvolvimento, item.largura,
+                 item.estoque_atual, item.estoque_maximo, item.demanda)
+                for item in bloco
+            ]
+            for bloco in blocos
+        )
+    )
+
+
+def _linhas_grupo(resultado: Dict) -> List[tuple]:
+    """Plano de um grupo do lote achatado numa linha por item de cada padrão.
+    
+    Grupo sem falta (plano vazio) sai numa linha só, com zero chapas.
+    """
+    grupo = (resultado['espessura'], resultado['largura'])
+    if 'erro' in resultado:
+        return [grupo + ('',) * (len(_COLUNAS_LOTE) - 3) + (resultado['erro'],)]
+    
+    grupo += (resultado['total_chapas'], resultado['limite_inferior'])
+    if not resultado['padroes']:
+        return [grupo + ('',) * (len(_COLUNAS_LOTE) - 4)]
+    
+    linhas = []
+    for posicao, padrao in enumerate(resultado['padroes'], 1):
+        medidas = (
+            posicao, padrao['chapas'], padrao['desperdicio'], padrao['utilizacao_percentual'],
+            padrao['perda_corte']
+        )
+        for item in padrao['itens']:
+            linhas.append(grupo + medidas + (
+                item['item_code'], item['item_name'], item['desenvolvimento'], item['quantidade'],
+                item['quantidade'] * padrao['chapas'], ''
+            ))
+    return linhas
+
+
+def exportar_lote(resultados: Iterable[Dict], formato: str = 'csv') -> Iterator[str]:
+    """Planos de `planejar_lote` em CSV (uma linha por item de cada padrão) ou JSON.
+    
+    Cada grupo é escrito assim que termina, então o primeiro byte sai antes
+    do lote inteiro acabar.
+    """
+    if formato == 'json':
+        return _blocos_json([resultado] for resultado in resultados)
+    return _blocos_csv(_COLUNAS_LOTE, (_linhas_grupo(resultado) for resultado in resultados))
@@ -0,0 +1,109 @@
+# app/lote.py
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from . import database
+from .optimizer import _PARTIDAS, OtimizadorCorte1D
+from .planejador import PlanejadorProducao
+
+
+def _otimizar_grupo(db_path: str, espessura: float, largura: float, largura_utilizavel: float,
+                    top_n: int, margem_corte: float, semente: int, partidas: int) -> dict:
+    """Otimiza um grupo dentro do processo de trabalho e devolve dados serializáveis"""
+    inicio = time.perf_counter()
+    itens = database.get_items_by_dimensions(db_path, espessura, largura)
+    otimizador = OtimizadorCorte1D(largura_utilizavel, margem_corte=margem_corte, semente=semente, partidas=partidas)
+    padroes = otimizador.gerar_padroes_otimizados(itens, top_n=top_n)
+    
+    return {
+        'espessura': espessura,
+        'largura': largura,
+        'total_itens': len(itens),
+        'padroes': [padrao.para_dict() for padrao in padroes],
+        'tempo_s': time.perf_counter() - inicio
+    }
+
+
+def _planejar_grupo(db_path: str, espessura: float, largura: float,
+                    largura_utilizavel: float, margem_corte: float) -> dict:
+    """Planeja a produção de um grupo dentro do processo de trabalho (dados serializáveis)"""
+    inicio = time.perf_counter()
+    itens = database.get_items_by_dimensions(db_path, espessura, largura)
+    plano = PlanejadorProducao(largura_utilizavel, margem_corte).planejar(itens)
+    
+    return {
+        'espessura': espessura,
+        'largura': largura,
+        'total_itens': len(itens),
+        'total_chapas': plano.total_chapas,
+        'limite_inferior': plano.limite_inferior,
+        'producao': plano.producao,
+        'padroes': [dict(padrao.para_dict(), chapas=chapas) for padrao, chapas in plano.padroes],
+        'tempo_s': time.perf_counter() - inicio
+    }
+
+
+def otimizar_lote(db_path: str, largura_utilizavel: float,
+                  grupos: Optional[List[Tuple[float, float]]] = None,
+                  processos: Optional[int] = None, top_n: int = 10,
+                  margem_corte: float = 0.0, semente: int = 0, partidas: int = _PARTIDAS) -> Iterator[dict]:
+    """Otimiza vários grupos (espessura, largura) em paralelo num pool de processos.
+    
+    Sem `grupos`, usa todos os grupos de `tbl_demanda`. Os resultados são
+    entregues na ordem em que cada grupo termina, então um grupo lento não
+    segura os demais; uma falha vira um resultado com a chave `erro`.
+    `semente` e `partidas` são as da busca multipartida (BUSCA_SEMENTE e
+    BUSCA_PARTIDAS nas requisições), para o mesmo resultado de `/otimizar`.
+    """
+    return _executar_lote(
+        db_path, grupos, processos, _otimizar_grupo, largura_utilizavel, top_n, margem_corte, semente, partidas
+    )
+
+
+def planejar_lote(db_path: str, largura_utilizavel: float,
+                  grupos: Optional[List[Tuple[float, float]]] = None,
+                  processos: Optional[int] = None, margem_corte: float = 0.0) -> Iterator[dict]:
+    """Plano de produção (`PlanejadorProducao`) de vários grupos, como `otimizar_lote`.
+    
+    Cada resultado traz as chapas de cada padrão (`padroes[i]['chapas']`),
+    o total de chapas, o limite inferior e as peças produzidas por item.
+    """
+    return _executar_lote(db_path, grupos, processos, _planejar_grupo, largura_utilizavel, margem_corte)
+
+
+def _executar_lote(db_path: str, grupos: Optional[List[Tuple[float, float]]], processos: Optional[int],
+                   tarefa: Callable[..., dict], *argumentos) -> Iterator[dict]:
+    """Roda `tarefa(db_path, espessura, largura, *argumentos)` para cada grupo num pool de processos"""
+    existentes = {(esp, larg): total for esp, larg, total in database.get_dimension_groups(db_path)}
+    if grupos is None:
+        selecionados = list(existentes)
+    else:
+        selecionados = [grupo for grupo in grupos if grupo in existentes]
+    
+    # Grupos maiores primeiro: o lote termina antes quando os longos começam cedo
+    selecionados.sort(key=lambda grupo: existentes[grupo], reverse=True)
+    
+    if not selecionados:
+        return
+    
+    processos = max(1, min(processos or os.cpu_count() or 1, len(selecionados)))
+    
+    executor = ProcessPoolExecutor(max_workers=processos)
+    try:
+        futuros = {
+            executor.submit(tarefa, db_path, esp, larg, *argumentos): (esp, larg)
+            for esp, larg in selecionados
+        }
+        
+        for futuro in as_completed(futuros):
+            espessura, largura = futuros[futuro]
+            try:
+                yield futuro.result()
+            except Exception as erro:
+                yield {'espessura': espessura, 'largura': largura, 'erro': str(erro)}
+    finally:
+        # Gerador fechado no meio (ex.: cliente desconectou do fluxo): os
+        # grupos ainda na fila são cancelados em vez de ocupar os processos
+        executor.shutdown(wait=False, cancel_futures=True)
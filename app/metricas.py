@@ -0,0 +1,206 @@
+# app/metricas.py
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from flask import g, request
+
+# Limites (segundos) dos histogramas de latência
+_LIMITES_REQUISICAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_LIMITES_BANCO = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+_LE_INFINITO = 'le="+Inf"'
+
+
+def _formatar_rotulos(nomes: Tuple[str, ...], valores: Tuple[str, ...], extra: str = '') -> str:
+    """`{a="1",b="2"}` no formato de texto do Prometheus (com escape dos valores)"""
+    pares = [
+        '{}="{}"'.format(nome, str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for nome, valor in zip(nomes, valores)
+    ]
+    if extra:
+        pares.append(extra)
+    return '{' + ','.join(pares) + '}' if pares else ''
+
+
+def _formatar_numero(valor: float) -> str:
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+
+class _Metrica:
+    """Base das métricas: nome, ajuda, rótulos e séries por combinação de rótulos"""
+    
+    tipo = ''
+    
+    def __init__(self, registro: 'Registro', nome: str, ajuda: str, rotulos: Tuple[str, ...] = ()):
+        self.registro = registro
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+    
+    def _chave(self, rotulos: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(rotulos[nome]) for nome in self.rotulos)
+    
+    def exportar(self) -> List[str]:
+        return [f'# HELP {self.nome} {self.ajuda}', f'# TYPE {self.nome} {self.tipo}']
+
+
+class Contador(_Metrica):
+    """Contador monotônico (`_total`)"""
+    
+    tipo = 'counter'
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._valores: Dict[Tuple[str, ...], float] = defaultdict(float)
+    
+    def incrementar(self, valor: float = 1.0, **rotulos):
+        with self.registro.lock:
+            self._valores[self._chave(rotulos)] += valor
+    
+    def exportar(self) -> List[str]:
+        linhas = super().exportar()
+        for chave, valor in sorted(self._valores.items()):
+            linhas.append(f'{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}')
+        return linhas
+
+
+class Histograma(_Metrica):
+    """Histograma com limites fixos (buckets cumulativos, soma e contagem)"""
+    
+    tipo = 'histogram'
+    
+    def __init__(self, *args, limites: Tuple[float, ...] = _LIMITES_REQUISICAO, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limites = tuple(sorted(limites))
+        self._series: Dict[Tuple[str, ...], list] = {}  # chave -> [contagens por limite, soma, total]
+    
+    def observar(self, valor: float, **rotulos):
+        chave = self._chave(rotulos)
+        with self.registro.lock:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * len(self.limites), 0.0, 0]
+            for i, limite in enumerate(self.limites):
+                if valor <= limite:
+                    serie[0][i] += 1
+            serie[1] += valor
+            serie[2] += 1
+    
+    def exportar(self) -> List[str]:
+        linhas = super().exportar()
+        for chave, (contagens, soma, total) in sorted(self._series.items()):
+            for limite, contagem in zip(self.limites, contagens):
+                rotulos = _formatar_rotulos(self.rotulos, chave, f'le="{_formatar_numero(limite)}"')
+                linhas.append(f'{self.nome}_bucket{rotulos} {contagem}')
+            linhas.append(f'{self.nome}_bucket{_formatar_rotulos(self.rotulos, chave, _LE_INFINITO)} {total}')
+            linhas.append(f'{self.nome}_sum{_formatar_rotulos(self.rotulos, chave)} {repr(soma)}')
+            linhas.append(f'{self.nome}_count{_formatar_rotulos(self.rotulos, chave)} {total}')
+        return linhas
+
+
+class Registro:
+    """Conjunto de métricas do processo, exportado no formato de texto do Prometheus"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._metricas: List[_Metrica] = []
+    
+    def contador(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = ()) -> Contador:
+        metrica = Contador(self, nome, ajuda, rotulos)
+        self._metricas.append(metrica)
+        return metrica
+    
+    def histograma(self, nome: str, ajuda: str, rotulos: Tuple[str, ...] = (),
+                   limites: Tuple[float, ...] = _LIMITES_REQUISICAO) -> Histograma:
+        metrica = Histograma(self, nome, ajuda, rotulos, limites=limites)
+        self._metricas.append(metrica)
+        return metrica
+    
+    def exportar(self) -> str:
+        with self.lock:
+            linhas = [linha for metrica in self._metricas for linha in metrica.exportar()]
+        return '\n'.join(linhas) + '\n'
+
+
+REGISTRO = Registro()
+
+
+def _apos_fork():
+    """Processo filho começa com lock novo (o do pai pode ter ficado preso)"""
+    REGISTRO.lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_apos_fork)
+
+REQUISICAO_SEGUNDOS = REGISTRO.histograma(
+    'otimcort_requisicao_segundos', 'Latência das requisições HTTP por endpoint',
+    ('endpoint', 'metodo', 'status')
+)
+BANCO_SEGUNDOS = REGISTRO.histograma(
+    'otimcort_banco_segundos', 'Latência das consultas ao banco (ou ao catálogo em memória)',
+    ('consulta',), limites=_LIMITES_BANCO
+)
+OTIMIZACAO_SEGUNDOS = REGISTRO.histograma(
+    'otimcort_otimizacao_segundos', 'Duração de gerar_padroes_otimizados'
+)
+OTIMIZACAO_REAPROVEITADA = REGISTRO.contador(
+    'otimcort_otimizacao_reaproveitada_total', 'Otimizações respondidas pelo cache de perfis (sem estratégias)'
+)
+ESTRATEGIA_SEGUNDOS = REGISTRO.contador(
+    'otimcort_estrategia_segundos_total', 'Tempo gasto em cada estratégia', ('estrategia',)
+)
+ESTRATEGIA_CANDIDATOS = REGISTRO.contador(
+    'otimcort_estrategia_candidatos_total', 'Padrões candidatos gerados por estratégia', ('estrategia',)
+)
+ESTRATEGIA_DUPLICADOS = REGISTRO.contador(
+    'otimcort_estrategia_duplicados_total', 'Candidatos descartados por já estarem no top N', ('estrategia',)
+)
+ESTRATEGIA_NO_TOP = REGISTRO.contador(
+    'otimcort_estrategia_no_top_total', 'Padrões da estratégia que ficaram no resultado final', ('estrategia',)
+)
+
+
+@contextmanager
+def cronometrar(histograma: Histograma, **rotulos):
+    """Observa no histograma a duração do bloco"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        histograma.observar(time.perf_counter() - inicio, **rotulos)
+
+
+def registrar_otimizacao(estatisticas: dict):
+    """Acumula as estatísticas de uma execução do otimizador"""
+    if estatisticas.get('reaproveitado'):
+        OTIMIZACAO_REAPROVEITADA.incrementar()
+        return
+    OTIMIZACAO_SEGUNDOS.observar(estatisticas['tempo_s'])
+    for nome, estrategia in estatisticas['estrategias'].items():
+        ESTRATEGIA_SEGUNDOS.incrementar(estrategia['tempo_s'], estrategia=nome)
+        ESTRATEGIA_CANDIDATOS.incrementar(estrategia['candidatos'], estrategia=nome)
+        ESTRATEGIA_DUPLICADOS.incrementar(estrategia['duplicados'], estrategia=nome)
+        ESTRATEGIA_NO_TOP.incrementar(estrategia['no_top'], estrategia=nome)
+
+
+def registrar_metricas(app):
+    """Mede a latência de todas as requisições da aplicação"""
+    
+    @app.before_request
+    def _iniciar_cronometro():
+        g.inicio_requisicao = time.perf_counter()
+    
+    @app.after_request
+    def _observar_requisicao(resposta):
+        inicio = g.pop('inicio_requisicao', None)
+        if inicio is not None:
+            REQUISICAO_SEGUNDOS.observar(
+                time.perf_counter() - inicio,
+                endpoint=request.endpoint or 'desconhecido',
+                metodo=request.method,
+                status=resposta.status_code
+            )
+        return resposta
@@ -1,6 +1,6 @@
 # app/models.py
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 @dataclass
 class Item:
@@ -27,6 +27,20 @@ class Item:
         falta = max(0, self.demanda - self.estoque_atual)
         pode_estocar = max(0, self.estoque_maximo - self.estoque_atual - falta)
         return falta, pode_estocar
+    
+    def para_dict(self) -> dict:
+        """Representação serializável (JSON) do item, com a prioridade calculada"""
+        return {
+            'item_code': self.item_code,
+            'item_name': self.item_name,
+            'espessura': self.espessura,
+            'desenvolvimento': self.desenvolvimento,
+            'largura': self.largura,
+            'estoque_atual': self.estoque_atual,
+            'estoque_maximo': self.estoque_maximo,
+            'demanda': self.demanda,
+            'prioridade': self.prioridade
+        }
 
 @dataclass
 class PadraoCorte:
@@ -35,6 +49,43 @@ class PadraoCorte:
     utilizacao_percentual: float
     score_prioridade: int
     largura_chapa: float
+    perda_corte: float = 0.0  # Largura consumida pelos cortes entre as peças (mm)
+    
+    @property
+    def itens_distintos(self) -> int:
+        """Itens diferentes no padrão (cada um é um ajuste de faca)"""
+        return len(self.combinacao)
+    
+    def para_dict(self) -> dict:
+        """Representação serializável (JSON) do padrão"""
+        return {
+            'desperdicio': self.desperdicio,
+            'utilizacao_percentual': self.utilizacao_percentual,
+            'score_prioridade': self.score_prioridade,
+            'largura_chapa': self.largura_chapa,
+            'perda_corte': self.perda_corte,
+            'itens_distintos': self.itens_distintos,
+            'itens': [
+                {
+                    'item_code': item.item_code,
+                    'item_name': item.item_name,
+                    'desenvolvimento': item.desenvolvimento,
+                    'prioridade': item.prioridade,
+                    'quantidade': qty
+                }
+                for item, qty in self.combinacao
+            ]
+        }
+    
+    def __repr__(self):
+        return f"Padrão(desp={self.desperdicio}mm, util={self.utilizacao_percentual:.1f}%, prior={self.score_prioridade})"
+
+@dataclass
+class PlanoProducao:
+    padroes: List[Tuple[PadraoCorte, int]]  # (Padrão, número de chapas)
+    total_chapas: int
+    limite_inferior: int  # Arredondamento para cima do ótimo da relaxação linear
+    producao: Dict[str, int]  # item_code -> peças produzidas pelo plano
     
     def __repr__(self):
-        return f"Padrão(desp={self.desperdicio}mm, util={self.utilizacao_percentual:.1f}%, prior={self.score_prioridade})"
\ No newline at end of file
+        return f"Plano(chapas={self.total_chapas}, limite={self.limite_inferior}, padroes={len(self.padroes)})"
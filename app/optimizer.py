@@ -1,299 +1,1333 @@
 # app/optimizer.py
-import itertools
-from typing import List
+import hashlib
+import heapq
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import reduce
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import metricas
+from .cache import CacheOtimizacao
 from .models import Item, PadraoCorte
 
-class OtimizadorCorte1D:
-    """Otimizador de corte 1D usando múltiplas estratégias"""
+# Ponto fixo: o núcleo trabalha com medidas inteiras em micrômetros
+_UNIDADES_POR_MM = 1000
+
+# Maior capacidade aceita na grade; acima disso usa uma grade mais grossa
+# (a tabela da mochila tem peças x capacidade células, então é sempre limitada)
+_CAPACIDADE_MAXIMA_GRADE = 20_000
+
+# Passos (em unidades) das grades inexatas, do mais fino ao mais grosso
+_PASSOS_GRADE = (10, 100, 1000, 10_000)
+
+# Marca somas inatingíveis na tabela da mochila
+_INATINGIVEL = -(2 ** 30)
+
+# Custo estimado (s) de cada célula da tabela da mochila (peças x capacidade),
+# cerca do dobro do medido; o branch-and-bound só monta a tabela se ela
+# couber no prazo, então sobra tempo para a busca
+_SEGUNDOS_POR_CELULA = 1e-8
+
+# Busca multipartida: partidas independentes (construção gulosa aleatória +
+# busca local) e movimentos de troca tentados em cada uma
+_PARTIDAS = 12
+_MOVIMENTOS_POR_PARTIDA = 6
+
+# Pool da busca multipartida com mais de um processo, reaproveitado entre
+# otimizações (criar processos custa mais que a busca): (processos, pool)
+_pool_multipartida: Optional[Tuple[int, ProcessPoolExecutor]] = None
+_lock_pool = threading.Lock()
+
+# Ruído da ordem de construção e temperatura inicial do recozimento (fração
+# do espaço livre que um movimento aceito pode piorar a sobra), que cai a
+# cada movimento
+_RUIDO_CONSTRUCAO = 0.3
+_TEMPERATURA_INICIAL = 0.02
+_RESFRIAMENTO = 0.6
+
+# Parte do prazo (modo com prazo) que a busca multipartida pode usar; o
+# resto fica para o branch-and-bound
+_FRACAO_PRAZO_MULTIPARTIDA = 0.25
+
+# Largura da busca que alimenta a fronteira de Pareto: feixe da mochila e
+# top local da multipartida (a fronteira sai de todos os candidatos
+# gerados, não de um top por desperdício)
+_CANDIDATOS_PARETO = 100
+
+
+def _para_unidades(medidas) -> np.ndarray:
+    """Medidas em mm como inteiros de ponto fixo (arredondados ao micrômetro)"""
+    return np.rint(np.asarray(medidas, dtype=float) * _UNIDADES_POR_MM).astype(np.int64)
+
+
+def _passo_grade(tamanhos: List[int], capacidade: int) -> int:
+    """Passo da grade, em unidades: o MDC dos tamanhos (grade exata) se a capacidade cabe.
+    
+    Senão, o passo inexato mais fino de `_PASSOS_GRADE` que mantém a
+    capacidade abaixo de `_CAPACIDADE_MAXIMA_GRADE`; se nem o mais grosso
+    basta, o passo que a leva exatamente até esse limite.
+    """
+    passo = reduce(math.gcd, tamanhos, 0) or 1
+    if capacidade // passo <= _CAPACIDADE_MAXIMA_GRADE:
+        return passo
+    return next(
+        (candidato for candidato in _PASSOS_GRADE if capacidade // candidato <= _CAPACIDADE_MAXIMA_GRADE),
+        -(-capacidade // _CAPACIDADE_MAXIMA_GRADE)
+    )
+
+
+def _converter_para_grade(tamanhos: List[int], capacidade: int,
+                          passo: Optional[int] = None) -> Tuple[List[int], int, int]:
+    """Converte tamanhos e capacidade (unidades) para inteiros na grade.
+    
+    Tamanhos são arredondados para cima e a capacidade para baixo, então
+    todo padrão viável na grade também cabe na chapa real (com passo que
+    divide todos os tamanhos, a grade é exata). O MDC dos tamanhos reduz a
+    grade sem perder exatidão. Devolve também quantas unidades vale cada
+    passo da grade. `passo` fixa a grade (larguras diferentes na mesma).
+    """
+    if passo is None:
+        passo = _passo_grade(tamanhos, capacidade)
+    
+    inteiros = [-(-t // passo) for t in tamanhos]
+    divisor = reduce(math.gcd, inteiros, 0) or 1
+    
+    return [t // divisor for t in inteiros], capacidade // (passo * divisor), passo * divisor
+
+
+def _tabela_mochila(tamanhos: List[int], limites: List[int], prioridades: List[int],
+                    capacidade: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Programação dinâmica da mochila limitada, uma linha por sufixo.
+    
+    Para cada sufixo `i..n-1` e sobra `r`, devolve o maior preenchimento
+    atingível sem passar de `r` e o maior score de prioridade com esse
+    preenchimento. É o limite exato usado para podar a busca.
+    """
+    n = len(tamanhos)
+    melhor_score = np.full((n + 1, capacidade + 1), _INATINGIVEL, dtype=np.int32)
+    melhor_score[n, 0] = 0
+    
+    for i in range(n - 1, -1, -1):
+        anterior = melhor_score[i + 1]
+        atual = anterior.copy()
+        for qty in range(1, limites[i] + 1):
+            deslocamento = qty * tamanhos[i]
+            np.maximum(
+                atual[deslocamento:],
+                anterior[:capacidade + 1 - deslocamento] + qty * prioridades[i],
+                out=atual[deslocamento:]
+            )
+        melhor_score[i] = atual
+    
+    posicoes = np.arange(capacidade + 1, dtype=np.int32)
+    preenchimento = np.maximum.accumulate(
+        np.where(melhor_score >= 0, posicoes, 0), axis=1
+    ).astype(np.int32)
+    score = np.take_along_axis(melhor_score, preenchimento, axis=1)
+    
+    return preenchimento, score
+
+
+def _quantas_cabem(ocupados: np.ndarray, capacidade: int) -> np.ndarray:
+    """Quantas peças de cada espaço ocupado (unidades) cabem sozinhas em `capacidade`"""
+    positivos = ocupados > 0
+    cabe = np.zeros(len(ocupados), dtype=np.int64)
+    cabe[positivos] = max(capacidade, 0) // ocupados[positivos]
+    return cabe
+
+
+def _perfil_demanda(itens: List[Item], largura_chapa: float,
+                    margem_corte: float = 0.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Tamanhos (unidades), limite por chapa e prioridade de cada item.
+    
+    É tudo o que as estratégias leem de estoque e demanda: a necessidade
+    entra já cortada no que cabe numa chapa (com a margem de cada corte),
+    então mudanças de estoque ou demanda que não alteram o limite nem a
+    prioridade não mudam o resultado.
+    """
+    tamanhos = _para_unidades([item.desenvolvimento for item in itens])
+    margem = int(_para_unidades(margem_corte))
+    prioridades = np.array([item.prioridade for item in itens], dtype=np.int64)
+    necessidade = np.array([sum(item.quantidade_necessaria) for item in itens], dtype=np.int64)
+    cabem = _quantas_cabem(tamanhos + margem, int(_para_unidades(largura_chapa)) + margem)
+    return tamanhos, np.minimum(necessidade, cabem), prioridades
+
+
+def impressao_perfil(itens: List[Item], largura_chapa: float, margem_corte: float = 0.0,
+                     semente: int = 0, partidas: int = _PARTIDAS) -> str:
+    """Resumo do grupo como o otimizador o vê: medidas, margem, limites por chapa e prioridades.
+    
+    Ao contrário de `cache.impressao_digital`, não muda quando estoque ou
+    demanda mudam sem alterar o limite nem a prioridade de nenhum item.
+    Leva também a `semente` e as `partidas` da busca multipartida, que
+    podem mudar o resultado.
+    """
+    tamanhos, limites, prioridades = _perfil_demanda(itens, largura_chapa, margem_corte)
+    campos = sorted(
+        (item.item_code, int(tamanho), int(limite), int(prioridade))
+        for item, tamanho, limite, prioridade in zip(itens, tamanhos, limites, prioridades)
+    )
+    medidas = (int(_para_unidades(largura_chapa)), int(_para_unidades(margem_corte)))
+    busca = (int(semente), int(partidas))
+    return hashlib.sha1(repr((medidas, busca, campos)).encode('utf-8')).hexdigest()
+
+
+def _fronte_pareto(desperdicio: np.ndarray, score: np.ndarray, distintos: np.ndarray) -> np.ndarray:
+    """Posições dos pontos não dominados em (desperdício menor, score maior, itens distintos menos).
+    
+    Skyline por ordenação e varredura: em ordem de (desperdício, -score,
+    distintos), um ponto é dominado se algum anterior, fora do seu bloco de
+    pontos idênticos, tem distintos <= e score >= os dele (o desperdício já
+    é <=, e pontos diferentes nessas condições são estritamente melhores
+    em algum critério). O maior score por prefixo de distintos sai de um
+    máximo acumulado por nível: O(n log n) da ordenação mais O(n * S)
+    vetorizado, com S valores de distintos (poucos: as peças de um
+    padrão). Devolve as posições do menor desperdício para o maior.
+    """
+    n = len(desperdicio)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    ordem = np.lexsort((distintos, -score, desperdicio))
+    desperdicio, score, distintos = desperdicio[ordem], score[ordem], distintos[ordem]
+    
+    # Início do bloco de pontos idênticos de cada posição
+    novo = np.ones(n, dtype=bool)
+    novo[1:] = (
+        (desperdicio[1:] != desperdicio[:-1]) | (score[1:] != score[:-1]) | (distintos[1:] != distintos[:-1])
+    )
+    inicio = np.maximum.accumulate(np.where(novo, np.arange(n), 0))
+    
+    nenhum = np.iinfo(np.int64).min
+    dominado = np.zeros(n, dtype=bool)
+    for nivel in np.unique(distintos):
+        melhor = np.maximum.accumulate(np.where(distintos <= nivel, score, nenhum))
+        anterior = np.where(inicio > 0, melhor[inicio - 1], nenhum)
+        neste = distintos == nivel
+        dominado[neste] = anterior[neste] >= score[neste]
+    
+    return ordem[~dominado]
+
+
+def fronte_pareto(padroes: List[PadraoCorte]) -> List[PadraoCorte]:
+    """Padrões não dominados em desperdício, score de prioridade e itens distintos (ajustes de faca).
+    
+    Um padrão com um pouco mais de desperdício fica se tiver peças mais
+    urgentes ou menos ajustes de faca que todos os de desperdício menor.
+    """
+    posicoes = _fronte_pareto(
+        np.array([padrao.desperdicio for padrao in padroes], dtype=np.float64),
+        np.array([padrao.score_prioridade for padrao in padroes], dtype=np.int64),
+        np.array([padrao.itens_distintos for padrao in padroes], dtype=np.int64)
+    )
+    return [padroes[i] for i in posicoes.tolist()]
+
+
+def recomendar_largura(resultados: Dict[float, List[PadraoCorte]]) -> Optional[float]:
+    """Largura cujo melhor padrão aproveita mais a chapa (desempate: score, depois a menor)"""
+    candidatas = [(largura, padroes[0]) for largura, padroes in resultados.items() if padroes]
+    if not candidatas:
+        return None
+    
+    largura, _ = min(
+        candidatas,
+        key=lambda candidata: (
+            -round(candidata[1].utilizacao_percentual, 6), -candidata[1].score_prioridade, candidata[0]
+        )
+    )
+    return largura
+
+
+class _TabelaMochila:
+    """Grade e tabela da mochila de um grupo, montadas para a maior largura livre.
+    
+    A tabela guarda somas exatas, que não dependem da capacidade: as linhas
+    até a capacidade de uma largura menor são as que uma tabela só dela
+    teria (os limites maiores não mudam nada, as peças a mais não cabem).
+    Serve a qualquer largura do mesmo grupo no mesmo passo de grade.
+    """
+    
+    def __init__(self, grupo: '_GrupoVetorizado', passo: Optional[int] = None):
+        # Maiores primeiro: o limite da tabela corta mais cedo
+        self.indices = grupo.ordem_decrescente()
+        
+        ocupados = grupo.ocupados[self.indices].tolist()
+        self.passo = _passo_grade(ocupados, grupo.livre) if passo is None else passo
+        tamanhos, capacidade, self.unidade = _converter_para_grade(ocupados, grupo.livre, self.passo)
+        self.tamanhos = np.array(tamanhos, dtype=np.int64)
+        
+        limites = np.minimum(grupo.max_qty[self.indices], capacidade // self.tamanhos)
+        preenchimento, score = _tabela_mochila(
+            self.tamanhos.tolist(), limites.tolist(), grupo.prioridades[self.indices].tolist(), capacidade
+        )
+        # A chave lexicográfica (preenchimento, score) da busca é montada em int64
+        self.preenchimento = preenchimento.astype(np.int64)
+        self.score = score.astype(np.int64)
     
-    def __init__(self, largura_chapa: float):
+    def capacidade(self, livre: int) -> int:
+        """Capacidade na grade desta tabela para o espaço livre `livre` (unidades)"""
+        return livre // self.unidade
+
+
+class _Alcancaveis:
+    """Somas atingíveis na grade por cada sufixo de itens (subset-sum limitado), como bitsets.
+    
+    O bit `s` de `sufixos[i]` diz se os itens `i..n-1`, respeitados os
+    limites, ocupam exatamente `s` passos. Cada bitset é um `int` do
+    Python: um item custa um deslocamento com OU por bit da decomposição
+    binária do limite, O(capacidade / 64) palavras cada, bem menos que a
+    tabela da mochila (sem o score). Com grade exata, dá o menor
+    desperdício possível do grupo; em qualquer grade, é o limite de
+    preenchimento do branch-and-bound.
+    """
+    
+    def __init__(self, grupo: '_GrupoVetorizado'):
+        # Mesma ordem (maiores primeiro) e grade da tabela da mochila
+        self.indices = grupo.ordem_decrescente()
+        ocupados = grupo.ocupados[self.indices].tolist()
+        passo = _passo_grade(ocupados, grupo.livre)
+        self.exata = all(ocupado % passo == 0 for ocupado in ocupados)
+        tamanhos, self.capacidade, self.unidade = _converter_para_grade(ocupados, grupo.livre, passo)
+        self.tamanhos = tamanhos
+        self.limites = [min(int(q), self.capacidade // t) for q, t in zip(grupo.max_qty[self.indices], tamanhos)]
+        
+        mascara = (1 << (self.capacidade + 1)) - 1
+        self.sufixos = [0] * (len(tamanhos) + 1)
+        self.sufixos[-1] = atingiveis = 1
+        for i in range(len(tamanhos) - 1, -1, -1):
+            restante, lote = self.limites[i], 1
+            while restante > 0:
+                lote = min(lote, restante)
+                atingiveis |= (atingiveis << (lote * tamanhos[i])) & mascara
+                restante -= lote
+                lote *= 2
+            self.sufixos[i] = atingiveis
+    
+    def preenchimento(self, i: int, sobra: int) -> int:
+        """Maior soma atingível pelos itens `i..n-1` que cabe em `sobra` passos"""
+        return (self.sufixos[i] & ((1 << (sobra + 1)) - 1)).bit_length() - 1
+    
+    @property
+    def menor_sobra(self) -> int:
+        """Menor sobra atingível, em passos da grade (0 se algum padrão enche a chapa)"""
+        return self.capacidade - self.preenchimento(0, self.capacidade)
+
+
+class _GrupoVetorizado:
+    """Grupo de itens como arrays paralelos, a base das estratégias vetorizadas.
+    
+    Padrões circulam como vetores de quantidades indexados pela posição do
+    item no grupo; `PadraoCorte` só é montado para o resultado final.
+    
+    Medidas são inteiros em micrômetros (`_UNIDADES_POR_MM`). Cada peça
+    ocupa seu tamanho mais a margem de corte, e a capacidade é a largura
+    mais uma margem (o corte depois da última peça cai na borda): um
+    padrão cabe se `contagens @ ocupados <= capacidade`, e o desperdício
+    é a sobra, `capacidade - contagens @ ocupados`, sem ponto flutuante.
+    
+    No modo ancorado, `base` guarda as peças obrigatórias já fixadas em todo
+    padrão; as estratégias preenchem só `livre`, e `max_qty` passa a ser o
+    que ainda pode ser acrescentado de cada item.
+    
+    As estratégias só leem os arrays, nunca os itens: `chave` os resume, e
+    dois grupos com a mesma chave têm o mesmo resultado.
+    """
+    
+    def __init__(self, itens: List[Item], largura_chapa: float,
+                 item_obrigatorio: Optional[str] = None, quantidade_minima: int = 1,
+                 margem_corte: float = 0.0):
+        self.itens = list(itens)
         self.largura_chapa = largura_chapa
+        self.margem_corte = margem_corte
+        self.tamanhos, self.max_qty, self.prioridades = _perfil_demanda(self.itens, largura_chapa, margem_corte)
+        self.margem = int(_para_unidades(margem_corte))
+        self.ocupados = self.tamanhos + self.margem
+        self.capacidade = int(_para_unidades(largura_chapa)) + self.margem
+        self.base = np.zeros(len(self.itens), dtype=np.int64)
+        self._alcancaveis = None
         
-    def gerar_padroes_otimizados(self, itens: List[Item], top_n: int = 10) -> List[PadraoCorte]:
-        """Gera os top N padrões de corte otimizados"""
+        if item_obrigatorio is not None:
+            self._ancorar(item_obrigatorio, max(quantidade_minima, 1))
         
-        # Gera múltiplos padrões usando diferentes estratégias
-        todos_padroes = []
+        self.livre = self.capacidade - int(self.base @ self.ocupados)
+        self.max_qty = np.minimum(self.max_qty, _quantas_cabem(self.ocupados, self.livre))
+    
+    @property
+    def chave(self) -> tuple:
+        """Entradas das estratégias (capacidade, margem, tamanhos, base, limites, prioridades)"""
+        return (
+            self.capacidade, self.margem, self.tamanhos.tobytes(), self.base.tobytes(),
+            self.max_qty.tobytes(), self.prioridades.tobytes()
+        )
+    
+    def _ancorar(self, item_code: str, quantidade_minima: int):
+        """Fixa o item obrigatório; sem ele (ou se não couber) nada é viável"""
+        posicoes = [j for j, item in enumerate(self.itens) if item.item_code == item_code]
         
-        # Estratégia 1: First-Fit Decreasing - Maior primeiro
-        todos_padroes.extend(self._gerar_padroes_ffd(itens, max_padroes=50))
+        if not posicoes or _quantas_cabem(self.ocupados, self.capacidade)[posicoes[0]] < quantidade_minima:
+            self.max_qty[:] = 0
+            return
         
-        # Estratégia 2: Prioridade Alta primeiro
-        todos_padroes.extend(self._gerar_padroes_prioridade(itens, max_padroes=50))
+        # O item escolhido entra mesmo sem necessidade; o mínimo pedido vale como limite
+        j = posicoes[0]
+        self.base[j] = quantidade_minima
+        self.max_qty[j] = max(int(self.max_qty[j]), quantidade_minima) - quantidade_minima
+    
+    def __len__(self):
+        return len(self.itens)
+    
+    def grade_exata(self) -> bool:
+        """Se a grade da mochila (`_passo_grade`) representa as medidas sem arredondar"""
+        ocupados = self.ocupados[self.max_qty > 0].tolist()
+        passo = _passo_grade(ocupados, self.livre)
+        return all(ocupado % passo == 0 for ocupado in ocupados)
+    
+    def ordem_decrescente(self) -> np.ndarray:
+        """Posições dos itens que ainda podem entrar, maiores primeiro (ordem da mochila)"""
+        indices = np.flatnonzero(self.max_qty > 0)
+        return indices[np.argsort(-self.tamanhos[indices], kind='stable')]
+    
+    def alcancaveis(self) -> _Alcancaveis:
+        """Bitsets de somas atingíveis do grupo (montados na primeira chamada)"""
+        if self._alcancaveis is None:
+            self._alcancaveis = _Alcancaveis(self)
+        return self._alcancaveis
+    
+    def desperdicio_minimo(self) -> Optional[float]:
+        """Menor desperdício (mm) que algum padrão atinge, exato pelos bitsets; None em grade inexata"""
+        alcancaveis = self.alcancaveis()
+        if not alcancaveis.exata:
+            return None
+        preenchido = (alcancaveis.capacidade - alcancaveis.menor_sobra) * alcancaveis.unidade
+        return (self.livre - preenchido) / _UNIDADES_POR_MM
+    
+    def avaliar(self, contagens: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Desperdício, utilização, score de prioridade e perda nos cortes de cada linha"""
+        usado = contagens @ self.tamanhos
+        perda = np.maximum(contagens.sum(axis=-1) - 1, 0) * self.margem
+        largura = self.capacidade - self.margem
+        desperdicio = (largura - usado - perda) / _UNIDADES_POR_MM
+        utilizacao = usado / largura * 100
+        score = contagens @ self.prioridades
+        return desperdicio, utilizacao, score, perda / _UNIDADES_POR_MM
+    
+    def padroes(self, contagens: np.ndarray) -> List[PadraoCorte]:
+        """Converte linhas de quantidades em PadraoCorte"""
+        desperdicio, utilizacao, score, perda = self.avaliar(contagens)
+        return [
+            PadraoCorte(
+                combinacao=[(self.itens[j], int(linha[j])) for j in np.flatnonzero(linha)],
+                desperdicio=float(desperdicio[i]),
+                utilizacao_percentual=float(utilizacao[i]),
+                score_prioridade=int(score[i]),
+                largura_chapa=self.largura_chapa,
+                perda_corte=float(perda[i])
+            )
+            for i, linha in enumerate(contagens)
+        ]
+
+
+class _PadraoCompacto:
+    """Padrão como vetor de quantidades por posição no grupo.
+    
+    As quantidades ficam num `bytes` imutável (uint16/uint32 por item), que
+    já guarda o próprio hash: comparar e deduplicar custa uma consulta em
+    dicionário, sem montar assinaturas de tuplas.
+    """
+    
+    __slots__ = ('dados', '_hash')
+    
+    def __init__(self, dados: bytes):
+        self.dados = dados
+        self._hash = hash(dados)
+    
+    def __hash__(self):
+        return self._hash
+    
+    def __eq__(self, outro):
+        return self._hash == outro._hash and self.dados == outro.dados
+
+
+class _MelhoresPadroes:
+    """Heap limitado com os `k` melhores padrões por (desperdício, -score).
+    
+    Recebe os padrões um a um das estratégias e descarta na hora os
+    duplicados e os que não entram no top `k`, então a memória fica em
+    O(k). O desperdício é a sobra inteira (unidades), então empates são
+    exatos; a pior sobra mantida serve de limite de poda para as
+    estratégias.
+    """
+    
+    __slots__ = ('grupo', 'k', 'tipo', '_heap', '_membros', '_sequencia', 'descartados', 'duplicados')
+    
+    def __init__(self, grupo: _GrupoVetorizado, k: int):
+        self.grupo = grupo
+        self.k = k
+        maior = int(grupo.max_qty.max()) if len(grupo) else 0
+        self.tipo = np.uint16 if maior <= np.iinfo(np.uint16).max else np.uint32
+        self._heap = []  # (-desperdício, score, -sequência, padrão, origem): o pior fica no topo
+        self._membros = set()
+        self._sequencia = 0
+        self.descartados = 0
+        self.duplicados = 0
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    @property
+    def cheio(self) -> bool:
+        return len(self._heap) >= self.k
+    
+    @property
+    def pior_sobra(self) -> float:
+        """Sobra (unidades) que um novo padrão precisa igualar para entrar (inf se há vaga)"""
+        return -self._heap[0][0] if self.cheio else math.inf
+    
+    @property
+    def pior_score(self) -> int:
+        """Score que um padrão com o pior desperdício precisa superar para entrar (-1 se há vaga)"""
+        return self._heap[0][1] if self.cheio else -1
+    
+    def oferecer(self, contagens: np.ndarray, origem='') -> bool:
+        """Tenta inserir um padrão (vindo da estratégia `origem`); True se entrou no top `k`.
+        
+        `origem` é só guardada: na busca multipartida é a etiqueta
+        (partida, movimento) do padrão.
+        """
+        if self.k <= 0 or not contagens.any():
+            return False
         
-        # Estratégia 3: Best-Fit - Menor desperdício
-        todos_padroes.extend(self._gerar_padroes_best_fit(itens, max_padroes=50))
+        sobra = self.grupo.capacidade - int(contagens @ self.grupo.ocupados)
+        score = int(contagens @ self.grupo.prioridades)
         
-        # Estratégia 4: Combinações específicas
-        todos_padroes.extend(self._gerar_combinacoes_especificas(itens, max_padroes=100))
+        # Mais antigos vencem empates, como numa ordenação estável
+        chave = (-sobra, score, -self._sequencia)
+        if self.cheio and chave <= self._heap[0][:3]:
+            self.descartados += 1
+            return False
         
-        # Remove duplicatas e ordena
-        padroes_unicos = self._remover_duplicatas(todos_padroes)
-        padroes_ordenados = self._ordenar_padroes(padroes_unicos)
+        padrao = _PadraoCompacto(np.ascontiguousarray(contagens, dtype=self.tipo).tobytes())
+        if padrao in self._membros:
+            self.descartados += 1
+            self.duplicados += 1
+            return False
         
-        return padroes_ordenados[:top_n]
+        self._sequencia += 1
+        self._membros.add(padrao)
+        if self.cheio:
+            removido = heapq.heapreplace(self._heap, chave + (padrao, origem))[3]
+            self._membros.discard(removido)
+            self.descartados += 1
+        else:
+            heapq.heappush(self._heap, chave + (padrao, origem))
+        return True
     
-    def _gerar_padroes_ffd(self, itens: List[Item], max_padroes: int) -> List[PadraoCorte]:
-        """First-Fit Decreasing: ordena por tamanho e tenta encaixar"""
-        padroes = []
-        itens_ordenados = sorted(itens, key=lambda x: x.desenvolvimento, reverse=True)
+    def ordenados(self) -> np.ndarray:
+        """Quantidades dos padrões mantidos, do melhor para o pior"""
+        if not self._heap:
+            return np.zeros((0, len(self.grupo)), dtype=np.int64)
+        entradas = sorted(self._heap, reverse=True)
+        dados = b''.join(entrada[3].dados for entrada in entradas)
+        return np.frombuffer(dados, dtype=self.tipo).reshape(-1, len(self.grupo)).astype(np.int64)
+    
+    def origens(self) -> list:
+        """Estratégia que gerou cada padrão mantido, na mesma ordem de `ordenados`"""
+        return [entrada[4] for entrada in sorted(self._heap, reverse=True)]
+
+
+def _construir_aleatorio(grupo: _GrupoVetorizado, rng: np.random.Generator) -> np.ndarray:
+    """Construção gulosa aleatória (GRASP): quantidades acrescentadas à base, ou None.
+    
+    A ordem mistura tamanho e prioridade com um peso sorteado, mais ruído;
+    cada item entra com tudo o que cabe no espaço que sobrou.
+    """
+    disponiveis = np.flatnonzero(grupo.max_qty > 0)
+    if not len(disponiveis):
+        return None
+    
+    peso = rng.random()
+    chave = (
+        peso * grupo.ocupados[disponiveis] / grupo.livre
+        + (1 - peso) * grupo.prioridades[disponiveis] / (int(grupo.prioridades.max()) or 1)
+        + _RUIDO_CONSTRUCAO * rng.random(len(disponiveis))
+    )
+    
+    acrescentados = np.zeros(len(grupo), dtype=np.int64)
+    espaco = grupo.livre
+    menor = int(grupo.ocupados[disponiveis].min())
+    ocupados, max_qty = grupo.ocupados.tolist(), grupo.max_qty.tolist()
+    for j in disponiveis[np.argsort(-chave, kind='stable')].tolist():
+        if espaco < menor:
+            break
+        quantidade = min(espaco // ocupados[j], max_qty[j])
+        if quantidade > 0:
+            acrescentados[j] = quantidade
+            espaco -= quantidade * ocupados[j]
+    
+    return acrescentados
+
+
+def _fronte_coletados(grupo: _GrupoVetorizado, coletados: Dict[bytes, tuple]) -> Tuple[np.ndarray, list]:
+    """Quantidades e origens dos candidatos coletados que estão na fronteira de Pareto"""
+    if not coletados:
+        return np.zeros((0, len(grupo)), dtype=np.int64), []
+    
+    entradas = list(coletados.values())
+    contagens = np.array([linha for linha, _ in entradas])
+    desperdicio, _, score, _ = grupo.avaliar(contagens)
+    posicoes = _fronte_pareto(desperdicio, score, np.count_nonzero(contagens, axis=1))
+    return contagens[posicoes], [entradas[i][1] for i in posicoes.tolist()]
+
+
+def _completar(grupo: _GrupoVetorizado, acrescentados: np.ndarray, sobra: int) -> int:
+    """Enche a sobra com os maiores itens que ainda cabem (no lugar); devolve a nova sobra"""
+    restam = grupo.max_qty - acrescentados
+    cabem = np.flatnonzero((restam > 0) & (grupo.ocupados <= sobra))
+    for j in cabem[np.argsort(-grupo.ocupados[cabem], kind='stable')].tolist():
+        quantidade = min(sobra // int(grupo.ocupados[j]), int(restam[j]))
+        acrescentados[j] += quantidade
+        sobra -= quantidade * int(grupo.ocupados[j])
+    return sobra
+
+
+def _obter_pool(processos: int) -> ProcessPoolExecutor:
+    """Pool da busca multipartida com `processos` processos, criado no primeiro uso"""
+    global _pool_multipartida
+    with _lock_pool:
+        if _pool_multipartida is None or _pool_multipartida[0] != processos:
+            if _pool_multipartida is not None:
+                _pool_multipartida[1].shutdown(wait=False)
+            _pool_multipartida = (processos, ProcessPoolExecutor(max_workers=processos))
+        return _pool_multipartida[1]
+
+
+def _descartar_pool(pool: ProcessPoolExecutor):
+    """Tira `pool` de uso (ex.: um processo morreu); o próximo uso cria outro"""
+    global _pool_multipartida
+    with _lock_pool:
+        if _pool_multipartida is not None and _pool_multipartida[1] is pool:
+            _pool_multipartida = None
+    pool.shutdown(wait=False)
+
+
+def _apos_fork():
+    """Processo filho não usa o pool nem o lock do pai"""
+    global _pool_multipartida, _lock_pool
+    _pool_multipartida = None
+    _lock_pool = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_apos_fork)
+
+
+def _busca_multipartida(grupo: _GrupoVetorizado, partidas: Sequence[int], semente: int, k: int,
+                        prazo_s: Optional[float] = None) -> Tuple[list, int, int]:
+    """Roda as `partidas` e devolve o top `k` local com etiquetas, as partidas feitas e os movimentos.
+    
+    Cada partida tem o próprio gerador, semeado por (semente, partida), e
+    não depende das outras: dividir as partidas entre processos não muda
+    o que cada uma encontra. A construção aleatória é seguida de busca
+    local por trocas (sai uma peça de um item, entra o máximo de outro, e
+    a sobra é completada): a melhor troca que melhora (sobra, score) é
+    aplicada; sem nenhuma, uma troca sorteada é aceita como no
+    recozimento simulado, com probabilidade exp(-piora / temperatura), e
+    a partida termina se ela for recusada.
+    Todo padrão visitado é oferecido ao top local com a etiqueta
+    (partida, movimento), a ordem em que uma execução serial o veria.
+    """
+    limite = time.perf_counter() + prazo_s if prazo_s is not None else None
+    melhores = _MelhoresPadroes(grupo, k)
+    ocupados, prioridades = grupo.ocupados, grupo.prioridades
+    feitas = movimentos = 0
+    
+    # Troca numa chave só: menor sobra, e no empate maior ganho de score
+    # (|ganho| < peso / 2); trocas impossíveis ficam com `sem_troca`
+    peso = 2 * int(prioridades.max(initial=0)) * (int(grupo.max_qty.max(initial=0)) + 1) + 1
+    sem_troca = np.iinfo(np.int64).max
+    
+    for partida in partidas:
+        if limite is not None and time.perf_counter() >= limite:
+            break
+        feitas += 1
         
-        for _ in range(min(max_padroes, 20)):
-            padrao = self._construir_padrao_greedy(itens_ordenados)
-            if padrao:
-                padroes.append(padrao)
+        rng = np.random.default_rng((semente, partida))
+        acrescentados = _construir_aleatorio(grupo, rng)
+        if acrescentados is None:
+            continue
+        sobra = grupo.livre - int(acrescentados @ ocupados)
+        melhores.oferecer(grupo.base + acrescentados, (partida, 0))
+        temperatura = _TEMPERATURA_INICIAL * grupo.livre
         
-        return padroes
+        for movimento in range(1, _MOVIMENTOS_POR_PARTIDA + 1):
+            saem = np.flatnonzero(acrescentados)
+            if not len(saem):
+                break
+            
+            # Linha: item que perde uma peça; coluna: item que entra com o máximo que cabe
+            espaco = sobra + ocupados[saem]
+            entram = np.minimum(grupo.max_qty - acrescentados, espaco[:, None] // ocupados)
+            entram[np.arange(len(saem)), saem] = 0
+            novas_sobras = espaco[:, None] - entram * ocupados
+            chaves = np.where(entram > 0, novas_sobras * peso - entram * prioridades + prioridades[saem][:, None],
+                              sem_troca).ravel()
+            
+            troca = int(chaves.argmin())
+            if chaves[troca] == sem_troca:
+                break
+            if chaves[troca] >= sobra * peso:
+                # Nenhuma troca melhora: sorteia uma; recusada, a partida termina
+                possiveis = np.flatnonzero(chaves != sem_troca)
+                troca = int(possiveis[rng.integers(len(possiveis))])
+                piora = int(novas_sobras.flat[troca]) - sobra
+                if piora > 0 and rng.random() >= math.exp(-piora / temperatura):
+                    break
+            temperatura *= _RESFRIAMENTO
+            
+            linha, b = divmod(troca, len(grupo))
+            acrescentados[saem[linha]] -= 1
+            acrescentados[b] += entram[linha, b]
+            sobra = _completar(grupo, acrescentados, int(novas_sobras[linha, b]))
+            movimentos += 1
+            melhores.oferecer(grupo.base + acrescentados, (partida, movimento))
     
-    def _gerar_padroes_prioridade(self, itens: List[Item], max_padroes: int) -> List[PadraoCorte]:
-        """Prioriza itens com maior necessidade"""
-        padroes = []
+    return list(zip(melhores.origens(), melhores.ordenados())), feitas, movimentos
+
+
+class OtimizadorCorte1D:
+    """Otimizador de corte 1D usando múltiplas estratégias"""
+    
+    def __init__(self, largura_chapa: float, cache_perfis: Optional[CacheOtimizacao] = None,
+                 margem_corte: float = 0.0, semente: int = 0, partidas: int = _PARTIDAS,
+                 processos: int = 1):
+        self.largura_chapa = largura_chapa
+        self.margem_corte = margem_corte  # Largura consumida por corte (mm)
+        self.cache_perfis = cache_perfis  # Resultados por chave do grupo (opcional)
+        self.semente = semente  # Mesma semente, mesmo resultado (fora do modo com prazo)
+        self.partidas = partidas  # Partidas da busca multipartida (0 = desligada)
+        self.processos = processos  # Processos da busca multipartida (1 = no próprio processo)
+        self.estatisticas: Optional[dict] = None  # Medidas da última execução
         
-        # Ordena por prioridade e depois por tamanho
-        itens_ordenados = sorted(itens, key=lambda x: (-x.prioridade, -x.desenvolvimento))
+    def gerar_padroes_otimizados(self, itens: List[Item], top_n: int = 10,
+                                 item_obrigatorio: Optional[str] = None,
+                                 quantidade_minima: int = 1,
+                                 progresso: Optional[Callable[[str, List[PadraoCorte]], None]] = None,
+                                 prazo_ms: Optional[float] = None) -> List[PadraoCorte]:
+        """Gera os top N padrões de corte otimizados.
+        
+        Com `item_obrigatorio`, a busca fica ancorada: só gera padrões com
+        pelo menos `quantidade_minima` peças desse item. Com `progresso`,
+        chama `progresso(estrategia, melhores_ate_agora)` ao fim de cada
+        estratégia (usado pelas tarefas em segundo plano).
+        
+        Com `prazo_ms`, a mochila dá lugar ao branch-and-bound com prazo:
+        as heurísticas semeiam o heap e a busca devolve o melhor top N que
+        achar até o prazo; `estatisticas['otimo_provado']` diz se ela
+        terminou antes (e só então o resultado vai para o cache de perfis).
         
-        for _ in range(min(max_padroes, 20)):
-            padrao = self._construir_padrao_greedy(itens_ordenados)
-            if padrao:
-                padroes.append(padrao)
+        A busca multipartida é aleatória, mas semeada: com a mesma
+        `semente` e `partidas`, o resultado é o mesmo com qualquer número
+        de `processos`. Ela só roda onde a mochila não basta: com prazo,
+        quando a grade é inexata (medidas arredondadas, em que a mochila
+        não é exata) e na fronteira de Pareto; numa grade exata sem prazo,
+        o top N da mochila já é o exato. `partidas=0` a desliga.
         
+        Com `cache_perfis`, o resultado fica guardado pela chave do grupo
+        (medidas, limites por chapa e prioridades) como matriz de
+        quantidades. Depois de uma mudança de estoque ou demanda que não
+        altera essa chave, as estratégias não rodam: só o desperdício e o
+        score são recalculados sobre os itens atuais.
+        
+        Tempo, candidatos, duplicados e padrões no top N de cada estratégia
+        ficam em `self.estatisticas` e vão para as métricas do processo.
+        """
+        grupo = _GrupoVetorizado(itens, self.largura_chapa, item_obrigatorio, quantidade_minima, self.margem_corte)
+        padroes, self.estatisticas = self._otimizar_grupo(grupo, top_n, progresso, prazo_ms=prazo_ms)
         return padroes
     
-    def _gerar_padroes_best_fit(self, itens: List[Item], max_padroes: int) -> List[PadraoCorte]:
-        """Best-Fit: tenta minimizar desperdício em cada passo"""
-        padroes = []
+    def gerar_fronte_pareto(self, itens: List[Item], item_obrigatorio: Optional[str] = None,
+                            quantidade_minima: int = 1, candidatos: int = _CANDIDATOS_PARETO,
+                            progresso: Optional[Callable[[str, List[PadraoCorte]], None]] = None,
+                            prazo_ms: Optional[float] = None) -> List[PadraoCorte]:
+        """Fronteira de Pareto (desperdício, score, itens distintos) dos padrões gerados.
         
-        for _ in range(min(max_padroes, 20)):
-            padrao = self._construir_padrao_best_fit(itens)
-            if padrao:
-                padroes.append(padrao)
+        A fronteira sai de todos os padrões distintos que as estratégias
+        geram, antes de qualquer corte por desperdício. A mochila roda sem
+        a poda pelo heap, com feixe de `candidatos` nós, e a multipartida
+        devolve o seu top `candidatos`; o limite é esse: um padrão que
+        nenhuma estratégia gera fica de fora. Para cobrir as pontas que a
+        busca por desperdício quase não visita, entram ainda os padrões de
+        um item só, completados ou não com os maiores que cabem.
         
-        return padroes
+        Sai do menor desperdício ao maior, e `progresso` recebe a fronteira
+        parcial. Com `cache_perfis`, a fronteira fica guardada pela chave
+        do grupo (com prazo, não vai para o cache).
+        `self.estatisticas['fronte']` tem o tamanho da fronteira,
+        `['candidatos']` quantos padrões distintos a alimentaram, e o
+        `no_top` de cada estratégia conta os seus padrões na fronteira.
+        """
+        grupo = _GrupoVetorizado(itens, self.largura_chapa, item_obrigatorio, quantidade_minima, self.margem_corte)
+        fronte, self.estatisticas = self._otimizar_grupo(grupo, candidatos, progresso, prazo_ms=prazo_ms, pareto=True)
+        self.estatisticas['fronte'] = len(fronte)
+        return fronte
     
-    def _gerar_combinacoes_especificas(self, itens: List[Item], max_padroes: int) -> List[PadraoCorte]:
-        """Gera combinações específicas explorando espaço de soluções"""
-        padroes = []
+    def varrer_larguras(self, itens: List[Item], larguras: List[float], top_n: int = 10,
+                        item_obrigatorio: Optional[str] = None,
+                        quantidade_minima: int = 1) -> Dict[float, List[PadraoCorte]]:
+        """Top N de cada largura útil de `larguras` numa só chamada.
         
-        # Limita número de itens para evitar explosão combinatória
-        n_itens = min(len(itens), 8)
-        itens_principais = itens[:n_itens]
+        Cada largura dá o mesmo resultado de `gerar_padroes_otimizados` com
+        `largura_chapa` igual a ela, mas as larguras dividem a tabela da
+        mochila (a parte cara): uma por passo de grade, montada para a
+        maior largura livre do passo e só se alguma largura não sair do
+        cache de perfis. As heurísticas são baratas e rodam por largura.
         
-        # Tenta diferentes quantidades de cada item
-        for item in itens_principais:
-            max_qty = int(self.largura_chapa / (item.desenvolvimento))
-            
-            # Padrão com apenas este item
-            for qty in range(1, min(max_qty + 1, 20)):
-                padrao = self._criar_padrao_simples(item, qty)
-                if padrao:
-                    padroes.append(padrao)
-            
-            # Combinações com outros itens
-            for outro_item in itens_principais:
-                if outro_item.item_code != item.item_code:
-                    padroes.extend(self._gerar_combinacoes_dois_itens(item, outro_item))
+        `self.estatisticas` guarda as medidas de cada largura e quantas
+        tabelas foram montadas.
+        """
+        inicio = time.perf_counter()
+        grupos = {
+            largura: _GrupoVetorizado(itens, largura, item_obrigatorio, quantidade_minima, self.margem_corte)
+            for largura in dict.fromkeys(larguras)
+        }
+        if not grupos:
+            self.estatisticas = {'tempo_s': 0.0, 'itens': len(itens), 'top_n': top_n, 'tabelas': 0, 'larguras': {}}
+            return {}
+        
+        # O passo da grade sai dos itens da maior largura (os das menores
+        # são um subconjunto), então larguras no mesmo passo usam a mesma grade
+        maior = max(grupos.values(), key=lambda grupo: grupo.livre)
+        ocupados = maior.ocupados[maior.max_qty > 0].tolist()
+        passos = {largura: _passo_grade(ocupados, grupo.livre) for largura, grupo in grupos.items()}
+        tabelas: Dict[int, _TabelaMochila] = {}
         
-        # Combinações de 3 itens
-        if len(itens_principais) >= 3:
-            for combo in itertools.combinations(itens_principais, 3):
-                padroes.extend(self._gerar_combinacao_tres_itens(list(combo)))
+        def tabela_do_passo(passo: int) -> Callable[[], _TabelaMochila]:
+            def obter():
+                if passo not in tabelas:
+                    base = max(
+                        (grupo for largura, grupo in grupos.items() if passos[largura] == passo),
+                        key=lambda grupo: grupo.livre
+                    )
+                    tabelas[passo] = _TabelaMochila(base, passo)
+                return tabelas[passo]
+            return obter
         
-        return padroes[:max_padroes]
+        resultados, medidas = {}, {}
+        for largura, grupo in grupos.items():
+            resultados[largura], medidas[largura] = self._otimizar_grupo(
+                grupo, top_n, tabela=tabela_do_passo(passos[largura])
+            )
+        
+        self.estatisticas = {
+            'tempo_s': time.perf_counter() - inicio,
+            'itens': len(itens),
+            'top_n': top_n,
+            'tabelas': len(tabelas),
+            'larguras': medidas
+        }
+        return resultados
     
-    def _construir_padrao_greedy(self, itens: List[Item]) -> PadraoCorte:
-        """Constrói padrão usando abordagem greedy"""
-        espaco_restante = self.largura_chapa
-        combinacao = []
-        score_prioridade = 0
+    def _otimizar_grupo(self, grupo: _GrupoVetorizado, top_n: int,
+                        progresso: Optional[Callable[[str, List[PadraoCorte]], None]] = None,
+                        tabela: Optional[Callable[[], _TabelaMochila]] = None,
+                        prazo_ms: Optional[float] = None,
+                        pareto: bool = False) -> Tuple[List[PadraoCorte], dict]:
+        """Top N do grupo, ou a fronteira com `pareto` (do cache de perfis se a chave já foi vista), e as medidas"""
+        inicio = time.perf_counter()
+        limite_tempo = inicio + prazo_ms / 1000 if prazo_ms is not None else None
+        estrategias = None
         
-        for item in itens:
-            qty_possivel = int(espaco_restante / item.desenvolvimento)
-            
-            if qty_possivel > 0:
-                # Limita pela necessidade do item
-                falta, pode_estocar = item.quantidade_necessaria
-                qty_desejada = min(qty_possivel, falta + pode_estocar, 50)
-                
-                if qty_desejada > 0:
-                    combinacao.append((item, qty_desejada))
-                    espaco_usado = qty_desejada * item.desenvolvimento
-                    espaco_restante -= espaco_usado
-                    score_prioridade += item.prioridade * qty_desejada
+        def executar():
+            nonlocal estrategias
+            contagens, estrategias = self._executar_estrategias(
+                grupo, top_n, progresso, tabela, limite_tempo, pareto
+            )
+            return contagens
         
-        if not combinacao:
-            return None
+        if self.cache_perfis is None or (pareto and prazo_ms is not None):
+            contagens = executar()
+        elif prazo_ms is None:
+            contagens = self.cache_perfis.obter_ou_calcular(
+                ('fronte' if pareto else 'perfil', grupo.chave, top_n, self.semente, self.partidas), executar
+            )
+        else:
+            # Com prazo, só o resultado provado independe do tempo disponível
+            chave = ('perfil_provado', grupo.chave, top_n, self.semente, self.partidas)
+            contagens = self.cache_perfis.consultar(chave)
+            if contagens is None:
+                contagens = executar()
+                if estrategias['branch_bound']['otimo_provado']:
+                    self.cache_perfis.guardar(chave, contagens)
         
-        desperdicio = espaco_restante
-        utilizacao = ((self.largura_chapa - desperdicio) / self.largura_chapa) * 100
+        # Reavalia com os itens atuais (estoque e demanda podem ter mudado)
+        padroes = grupo.padroes(contagens)
         
-        return PadraoCorte(
-            combinacao=combinacao,
-            desperdicio=desperdicio,
-            utilizacao_percentual=utilizacao,
-            score_prioridade=score_prioridade,
-            largura_chapa=self.largura_chapa
-        )
+        estatisticas = {
+            'tempo_s': time.perf_counter() - inicio,
+            'itens': len(grupo),
+            'top_n': top_n,
+            'padroes': len(padroes),
+            'desperdicio_minimo': grupo.desperdicio_minimo(),
+            'reaproveitado': estrategias is None,
+            'estrategias': estrategias or {}
+        }
+        if pareto and estrategias is not None:
+            estatisticas['candidatos'] = sum(
+                estrategia['candidatos'] - estrategia['duplicados'] for estrategia in estrategias.values()
+            )
+        if prazo_ms is not None:
+            estatisticas['prazo_ms'] = prazo_ms
+            estatisticas['otimo_provado'] = estrategias is None or estrategias['branch_bound']['otimo_provado']
+        metricas.registrar_otimizacao(estatisticas)
+        
+        return padroes, estatisticas
     
-    def _construir_padrao_best_fit(self, itens: List[Item]) -> PadraoCorte:
-        """Constrói padrão tentando minimizar desperdício em cada passo"""
-        espaco_restante = self.largura_chapa
-        combinacao = []
-        score_prioridade = 0
+    def _executar_estrategias(self, grupo: _GrupoVetorizado, top_n: int,
+                              progresso: Optional[Callable[[str, List[PadraoCorte]], None]] = None,
+                              tabela: Optional[Callable[[], _TabelaMochila]] = None,
+                              limite_tempo: Optional[float] = None,
+                              pareto: bool = False) -> Tuple[np.ndarray, dict]:
+        """Roda todas as estratégias; devolve as quantidades do top N e as medidas de cada uma.
         
-        itens_disponiveis = itens.copy()
+        Com `pareto`, todo padrão distinto gerado fica em `coletados` e a
+        fronteira sai deles; o heap segue só como limite de poda do
+        branch-and-bound, e `duplicados` conta os repetidos na coleta.
+        """
+        melhores = _MelhoresPadroes(grupo, top_n)
+        coletados: Optional[Dict[bytes, tuple]] = {} if pareto else None  # quantidades -> (linha, origem)
+        estrategias = {}
+        situacoes = {}  # Medidas próprias de cada estratégia, preenchidas por ela
         
-        while itens_disponiveis and espaco_restante > 0:
-            melhor_item = None
-            melhor_qty = 0
-            menor_desperdicio = float('inf')
+        # Cada padrão vai direto para o heap, e as estratégias leem dele o
+        # limite de poda
+        for nome, estrategia in self._estrategias(grupo, top_n, melhores, tabela, limite_tempo, situacoes, pareto):
+            inicio_estrategia = time.perf_counter()
+            duplicados = melhores.duplicados
+            repetidos = 0
+            candidatos = 0
+            for contagens in estrategia:
+                candidatos += 1
+                melhores.oferecer(contagens, nome)
+                if coletados is not None:
+                    chave = contagens.tobytes()
+                    if chave in coletados:
+                        repetidos += 1
+                    else:
+                        coletados[chave] = (contagens.copy(), nome)
             
-            # Para cada item, encontra a quantidade que minimiza desperdício
-            for item in itens_disponiveis:
-                max_qty = int(espaco_restante / item.desenvolvimento)
-                
-                if max_qty > 0:
-                    falta, pode_estocar = item.quantidade_necessaria
-                    qty_limite = min(max_qty, falta + pode_estocar, 30)
-                    
-                    for qty in range(1, qty_limite + 1):
-                        espaco_usado = qty * item.desenvolvimento
-                        desperdicio_temp = espaco_restante - espaco_usado
-                        
-                        if desperdicio_temp < menor_desperdicio and desperdicio_temp >= 0:
-                            menor_desperdicio = desperdicio_temp
-                            melhor_item = item
-                            melhor_qty = qty
+            estrategias[nome] = {
+                'tempo_s': time.perf_counter() - inicio_estrategia,
+                'candidatos': candidatos,
+                'duplicados': repetidos if pareto else melhores.duplicados - duplicados,
+                'no_top': 0
+            }
+            if progresso is not None:
+                parcial = _fronte_coletados(grupo, coletados)[0] if pareto else melhores.ordenados()
+                progresso(nome, grupo.padroes(parcial))
+        
+        if 'multipartida' in situacoes:
+            estrategias['multipartida'].update(situacoes['multipartida'])
+        if 'branch_bound' in situacoes:
+            busca = situacoes['branch_bound']
+            estrategias['branch_bound'].update(
+                nos=busca['nos'], tabela=busca['tabela'], completo=busca['completo'],
+                otimo_provado=busca['completo'] and busca['exata']
+            )
+        
+        # Duplicatas e excedentes já foram descartados no heap (ou na coleta)
+        if pareto:
+            resultado, origens = _fronte_coletados(grupo, coletados)
+        else:
+            resultado, origens = melhores.ordenados(), melhores.origens()
+        
+        for origem in origens:
+            estrategias[origem]['no_top'] += 1
+        for estrategia in estrategias.values():
+            estrategia['taxa_duplicados'] = (
+                estrategia['duplicados'] / estrategia['candidatos'] if estrategia['candidatos'] else 0.0
+            )
+        
+        return resultado, estrategias
+    
+    def _estrategias(self, grupo: _GrupoVetorizado, top_n: int, melhores: _MelhoresPadroes,
+                     tabela: Optional[Callable[[], _TabelaMochila]] = None,
+                     limite_tempo: Optional[float] = None,
+                     situacoes: Optional[dict] = None,
+                     pareto: bool = False) -> Tuple[Tuple[str, Iterator[np.ndarray]], ...]:
+        """Geradores de padrões, na ordem em que alimentam o heap, com seus nomes.
+        
+        A busca multipartida e o branch-and-bound registram suas medidas em
+        `situacoes[nome]`. Com `limite_tempo`, o branch-and-bound substitui
+        a mochila (cuja tabela não tem como parar no meio). Com `pareto`, a
+        mochila não poda pelo heap e entram os padrões de um item só. A
+        multipartida fica de fora numa grade exata sem prazo (ver
+        `gerar_padroes_otimizados`).
+        """
+        situacoes = situacoes if situacoes is not None else {}
+        
+        # Gera múltiplos padrões usando diferentes estratégias; as três
+        # construções gulosas são determinísticas, um padrão cada
+        heuristicas = (
+            # Estratégia 1: First-Fit Decreasing - Maior primeiro
+            ('ffd', self._gerar_padroes_ffd(grupo)),
             
-            if melhor_item is None:
-                break
+            # Estratégia 2: Prioridade Alta primeiro
+            ('prioridade', self._gerar_padroes_prioridade(grupo)),
             
-            combinacao.append((melhor_item, melhor_qty))
-            espaco_restante -= melhor_qty * melhor_item.desenvolvimento
-            score_prioridade += melhor_item.prioridade * melhor_qty
-            itens_disponiveis.remove(melhor_item)
+            # Estratégia 3: Best-Fit - Menor desperdício
+            ('best_fit', self._gerar_padroes_best_fit(grupo)),
+        )
         
-        if not combinacao:
-            return None
+        # Estratégia 4: Multipartida - construções aleatórias + busca local
+        if self.partidas > 0 and (pareto or limite_tempo is not None or not grupo.grade_exata()):
+            heuristicas += (
+                ('multipartida', self._gerar_padroes_multipartida(
+                    grupo, top_n, limite_tempo, situacoes.setdefault('multipartida', {})
+                )),
+            )
         
-        desperdicio = espaco_restante
-        utilizacao = ((self.largura_chapa - desperdicio) / self.largura_chapa) * 100
+        if pareto:
+            # Ponta de poucos itens distintos da fronteira
+            heuristicas += (('homogeneos', self._gerar_padroes_homogeneos(grupo)),)
         
-        return PadraoCorte(
-            combinacao=combinacao,
-            desperdicio=desperdicio,
-            utilizacao_percentual=utilizacao,
-            score_prioridade=score_prioridade,
-            largura_chapa=self.largura_chapa
+        if limite_tempo is not None:
+            return heuristicas + (
+                ('branch_bound', self._gerar_padroes_branch_bound(
+                    grupo, melhores, limite_tempo, situacoes.setdefault('branch_bound', {})
+                )),
+            )
+        
+        return heuristicas + (
+            # Estratégia 5: Mochila limitada - padrões maximais exatos (a
+            # fronteira precisa das folhas que o heap cortaria)
+            ('mochila', self._gerar_padroes_mochila(
+                grupo, max_padroes=top_n, melhores=None if pareto else melhores, tabela=tabela
+            )),
         )
     
-    def _criar_padrao_simples(self, item: Item, quantidade: int) -> PadraoCorte:
-        """Cria padrão com apenas um tipo de item"""
-        tamanho_total = quantidade * item.desenvolvimento
+    def _gerar_padroes_ffd(self, grupo: _GrupoVetorizado) -> Iterator[np.ndarray]:
+        """First-Fit Decreasing: ordena por tamanho e tenta encaixar"""
+        ordem = np.argsort(-grupo.tamanhos, kind='stable')
         
-        if tamanho_total > self.largura_chapa:
-            return None
+        padrao = self._construir_padrao_greedy(grupo, ordem)
+        if padrao is not None:
+            yield padrao
+    
+    def _gerar_padroes_prioridade(self, grupo: _GrupoVetorizado) -> Iterator[np.ndarray]:
+        """Prioriza itens com maior necessidade"""
+        # Ordena por prioridade e depois por tamanho
+        ordem = np.lexsort((-grupo.tamanhos, -grupo.prioridades))
         
-        desperdicio = self.largura_chapa - tamanho_total
-        utilizacao = (tamanho_total / self.largura_chapa) * 100
-        score_prioridade = item.prioridade * quantidade
+        padrao = self._construir_padrao_greedy(grupo, ordem)
+        if padrao is not None:
+            yield padrao
+    
+    def _gerar_padroes_best_fit(self, grupo: _GrupoVetorizado) -> Iterator[np.ndarray]:
+        """Best-Fit: tenta minimizar desperdício em cada passo"""
+        padrao = self._construir_padrao_best_fit(grupo)
+        if padrao is not None:
+            yield padrao
+    
+    def _gerar_padroes_homogeneos(self, grupo: _GrupoVetorizado) -> Iterator[np.ndarray]:
+        """Cada item sozinho com tudo o que cabe, e o mesmo padrão completado com os maiores que cabem"""
+        for j in np.flatnonzero(grupo.max_qty > 0).tolist():
+            acrescentados = np.zeros(len(grupo), dtype=np.int64)
+            acrescentados[j] = grupo.max_qty[j]
+            yield grupo.base + acrescentados
+            
+            sobra = grupo.livre - int(acrescentados @ grupo.ocupados)
+            if _completar(grupo, acrescentados, sobra) != sobra:
+                yield grupo.base + acrescentados
+    
+    def _gerar_padroes_multipartida(self, grupo: _GrupoVetorizado, top_n: int,
+                                    limite_tempo: Optional[float], situacao: dict) -> Iterator[np.ndarray]:
+        """Busca multipartida (GRASP + recozimento), com as partidas divididas entre processos.
         
-        return PadraoCorte(
-            combinacao=[(item, quantidade)],
-            desperdicio=desperdicio,
-            utilizacao_percentual=utilizacao,
-            score_prioridade=score_prioridade,
-            largura_chapa=self.largura_chapa
+        Cada processo devolve o seu top N com as etiquetas (partida,
+        movimento); oferecidos ao heap nessa ordem, dão o mesmo top N de
+        uma execução serial. Os processos são os do pool do módulo,
+        criado na primeira busca e reaproveitado depois; se ele quebrar, a
+        busca roda aqui mesmo. Com `limite_tempo`, usa no máximo
+        `_FRACAO_PRAZO_MULTIPARTIDA` do tempo restante. `situacao` recebe
+        as partidas feitas, os movimentos aceitos, os processos e a semente.
+        """
+        prazo_s = None
+        if limite_tempo is not None:
+            prazo_s = max(limite_tempo - time.perf_counter(), 0.0) * _FRACAO_PRAZO_MULTIPARTIDA
+        
+        partidas = range(self.partidas)
+        processos = max(1, min(self.processos, len(partidas)))
+        blocos = None
+        if processos > 1:
+            pool = _obter_pool(processos)
+            try:
+                futuros = [
+                    pool.submit(_busca_multipartida, grupo, partidas[i::processos], self.semente, top_n, prazo_s)
+                    for i in range(processos)
+                ]
+                blocos = [futuro.result() for futuro in futuros]
+            except BrokenProcessPool:
+                _descartar_pool(pool)
+                processos = 1
+        if blocos is None:
+            blocos = [_busca_multipartida(grupo, partidas, self.semente, top_n, prazo_s)]
+        
+        situacao.update(
+            partidas=sum(feitas for _, feitas, _ in blocos),
+            movimentos=sum(movimentos for _, _, movimentos in blocos),
+            processos=processos,
+            semente=self.semente
         )
+        for _, contagens in sorted((entrada for melhores, _, _ in blocos for entrada in melhores),
+                                   key=lambda entrada: entrada[0]):
+            yield contagens
     
-    def _gerar_combinacoes_dois_itens(self, item1: Item, item2: Item) -> List[PadraoCorte]:
-        """Gera combinações de dois itens diferentes"""
-        padroes = []
+    def _gerar_padroes_mochila(self, grupo: _GrupoVetorizado, max_padroes: int,
+                               melhores: Optional[_MelhoresPadroes] = None,
+                               tabela: Optional[Callable[[], _TabelaMochila]] = None) -> Iterator[np.ndarray]:
+        """Mochila limitada: enumera os padrões maximais de menor desperdício.
         
-        for qty1 in range(1, 15):
-            espaco_usado1 = qty1 * item1.desenvolvimento
-            if espaco_usado1 >= self.largura_chapa:
-                break
+        Os tamanhos são levados para uma grade inteira e a tabela da
+        programação dinâmica dá, para cada nó, o melhor padrão maximal
+        ainda alcançável. A busca avança item a item sobre toda a fronteira
+        de uma vez (arrays) e mantém só os `max_padroes` nós de melhor
+        limite, então a fronteira nunca passa de `max_padroes` linhas. Com
+        `melhores`, os nós que não alcançam o pior desperdício já mantido
+        no heap são cortados em cada nível. `tabela` devolve uma tabela já
+        montada para uma largura maior do mesmo grupo (varredura de larguras).
+        """
+        if not (grupo.max_qty > 0).any() or max_padroes <= 0:
+            return
+        
+        tabela = tabela() if tabela is not None else _TabelaMochila(grupo)
+        indices, tamanhos, unidade = tabela.indices, tabela.tamanhos, tabela.unidade
+        tabela_preenchimento, tabela_score = tabela.preenchimento, tabela.score
+        capacidade = tabela.capacidade(grupo.livre)
+        limites = np.minimum(grupo.max_qty[indices], capacidade // tamanhos)
+        prioridades = grupo.prioridades[indices]
+        
+        # Chave lexicográfica (preenchimento, score) num único inteiro
+        escala = int(prioridades @ limites) + 1
+        
+        restante = np.array([capacidade], dtype=np.int64)
+        score = np.zeros(1, dtype=np.int64)
+        menor_livre = np.array([capacidade + 1], dtype=np.int64)  # menor item anterior abaixo do limite
+        contagens = np.zeros((1, indices.size), dtype=np.int64)
+        
+        for i in range(indices.size):
+            # Grade de quantidades: uma linha por nó, uma coluna por quantidade possível
+            quantidades = np.arange(limites[i] + 1)
+            cabe = quantidades[None, :] <= np.minimum(limites[i], restante // tamanhos[i])[:, None]
+            pai, qty = np.nonzero(cabe)
             
-            espaco_restante = self.largura_chapa - espaco_usado1
-            max_qty2 = int(espaco_restante / item2.desenvolvimento)
+            restante = restante[pai] - qty * tamanhos[i]
+            score = score[pai] + qty * prioridades[i]
+            menor_livre = np.where(qty == limites[i], menor_livre[pai], np.minimum(menor_livre[pai], tamanhos[i]))
+            preenchimento = tabela_preenchimento[i + 1][restante]
             
-            for qty2 in range(1, min(max_qty2 + 1, 15)):
-                espaco_usado2 = qty2 * item2.desenvolvimento
-                desperdicio = espaco_restante - espaco_usado2
-                
-                if desperdicio >= 0:
-                    utilizacao = ((espaco_usado1 + espaco_usado2) / self.largura_chapa) * 100
-                    score_prioridade = (item1.prioridade * qty1) + (item2.prioridade * qty2)
-                    
-                    padroes.append(PadraoCorte(
-                        combinacao=[(item1, qty1), (item2, qty2)],
-                        desperdicio=desperdicio,
-                        utilizacao_percentual=utilizacao,
-                        score_prioridade=score_prioridade,
-                        largura_chapa=self.largura_chapa
-                    ))
+            # Um item anterior abaixo do limite caberia em qualquer sobra: não é maximal
+            manter = menor_livre > restante - preenchimento
+            
+            # Ramos que não chegam ao pior desperdício do heap não entram no top
+            if melhores is not None and melhores.cheio:
+                minimo = -(-(grupo.livre - melhores.pior_sobra) // unidade)
+                manter &= capacidade - restante + preenchimento >= minimo
+            
+            selecionados = np.flatnonzero(manter)
+            
+            # O limite da tabela é exato e atingível por um padrão maximal distinto
+            # para cada nó, então bastam os `max_padroes` nós de melhor limite
+            if selecionados.size > max_padroes:
+                limite = (capacidade - restante[selecionados] + preenchimento[selecionados]) * escala \
+                    + score[selecionados] + tabela_score[i + 1][restante[selecionados]]
+                selecionados = selecionados[np.argpartition(-limite, max_padroes - 1)[:max_padroes]]
+            
+            pai, qty = pai[selecionados], qty[selecionados]
+            restante, score, menor_livre = restante[selecionados], score[selecionados], menor_livre[selecionados]
+            contagens = contagens[pai]
+            contagens[:, i] = qty
         
-        return padroes
+        # Folhas restantes são padrões maximais; entrega do melhor para o pior
+        chave = (capacidade - restante) * escala + score
+        padrao = grupo.base.copy()
+        for folha in np.argsort(-chave, kind='stable')[:max_padroes]:
+            padrao[indices] = grupo.base[indices] + contagens[folha]
+            yield padrao.copy()
     
-    def _gerar_combinacao_tres_itens(self, itens: List[Item]) -> List[PadraoCorte]:
-        """Gera combinações de três itens"""
-        padroes = []
+    def _gerar_padroes_branch_bound(self, grupo: _GrupoVetorizado, melhores: _MelhoresPadroes,
+                                    limite_tempo: float, situacao: dict) -> Iterator[np.ndarray]:
+        """Branch-and-bound em profundidade com prazo: padrões maximais que ainda podem entrar no top.
         
-        if len(itens) < 3:
-            return padroes
+        Cada nível fixa a quantidade de um item (maiores primeiro, da maior
+        quantidade para zero, então os primeiros padrões já enchem a chapa).
+        O preenchimento de um nó é limitado pela tabela da mochila, quando
+        o custo estimado dela cabe no prazo, ou senão pelos bitsets de somas
+        atingíveis (mesmo limite, sem o score); com o heap cheio, o nó é
+        podado se esse limite não alcança o pior padrão mantido (ou só
+        empata com ele, sem score para passar). Também poda os nós em que
+        um item anterior abaixo do limite caberia em qualquer sobra.
         
-        item1, item2, item3 = itens[0], itens[1], itens[2]
+        Para quando `time.perf_counter()` passa de `limite_tempo`. Ao sair,
+        `situacao` tem `nos` visitados, `tabela` (se a usou) e `completo`:
+        a busca terminou, então nenhum padrão fora do heap é melhor que o
+        pior dele (na grade; com `exata`, a grade representa as medidas sem
+        arredondamento).
+        """
+        situacao.update(completo=False, exata=True, tabela=False, nos=0)
+        if not (grupo.max_qty > 0).any():
+            situacao['completo'] = True
+            return
         
-        for qty1 in range(1, 8):
-            espaco1 = qty1 * item1.desenvolvimento
-            if espaco1 >= self.largura_chapa:
-                break
-            
-            for qty2 in range(1, 8):
-                espaco2 = espaco1 + qty2 * item2.desenvolvimento
-                if espaco2 >= self.largura_chapa:
-                    break
+        # Maiores primeiro, na mesma ordem e grade da tabela da mochila
+        alcancaveis = grupo.alcancaveis()
+        indices, tamanhos, limites = alcancaveis.indices, alcancaveis.tamanhos, alcancaveis.limites
+        capacidade, unidade = alcancaveis.capacidade, alcancaveis.unidade
+        situacao['exata'] = alcancaveis.exata
+        
+        tabela = None
+        custo = sum(limites) * (capacidade + 1) * _SEGUNDOS_POR_CELULA
+        if time.perf_counter() + custo < limite_tempo:
+            tabela = _TabelaMochila(grupo)
+            situacao['tabela'] = True
+        prioridades = grupo.prioridades[indices].tolist()
+        n = len(tamanhos)
+        
+        # Sufixos: score máximo e maior score por passo da grade
+        score_maximo, densidade = [0] * (n + 1), [0.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            score_maximo[i] = score_maximo[i + 1] + prioridades[i] * limites[i]
+            densidade[i] = max(densidade[i + 1], prioridades[i] / tamanhos[i]) if limites[i] else densidade[i + 1]
+        
+        # Estado por nível: sobra, score, menor item anterior abaixo do limite, quantidade
+        restante, score, menor_livre = [0] * (n + 1), [0] * (n + 1), [0] * (n + 1)
+        quantidades = [0] * n
+        restante[0], menor_livre[0] = capacidade, capacidade + 1
+        score[0] = int(grupo.base @ grupo.prioridades)  # o heap compara o padrão inteiro
+        padrao = grupo.base.copy()
+        base = grupo.base[indices]
+        
+        nos = 0
+        i, descendo = 0, True
+        while i >= 0:
+            if descendo:
+                nos += 1
+                if nos & 255 == 0 and time.perf_counter() > limite_tempo:
+                    situacao['nos'] = nos
+                    return
+                
+                if i == n:
+                    if menor_livre[n] > restante[n]:
+                        padrao[indices] = base + quantidades
+                        yield padrao.copy()
+                    i, descendo = i - 1, False
+                    continue
+                
+                if tabela is not None:
+                    preenchimento = int(tabela.preenchimento[i, restante[i]])
+                    score_restante = int(tabela.score[i, restante[i]])
+                else:
+                    preenchimento = alcancaveis.preenchimento(i, restante[i])
+                    score_restante = min(score_maximo[i], int(preenchimento * densidade[i] + 1e-9))
+                podar = menor_livre[i] <= restante[i] - preenchimento
                 
-                espaco_restante = self.largura_chapa - espaco2
-                max_qty3 = int(espaco_restante / item3.desenvolvimento)
+                if not podar and melhores.cheio:
+                    minimo = -(-(grupo.livre - melhores.pior_sobra) // unidade)
+                    alcance = capacidade - restante[i] + preenchimento
+                    podar = alcance < minimo or (
+                        situacao['exata'] and alcance == minimo
+                        and score[i] + score_restante <= melhores.pior_score
+                    )
                 
-                for qty3 in range(1, min(max_qty3 + 1, 8)):
-                    espaco3 = qty3 * item3.desenvolvimento
-                    desperdicio = espaco_restante - espaco3
-                    
-                    if desperdicio >= 0:
-                        utilizacao = ((espaco2 + espaco3) / self.largura_chapa) * 100
-                        score_prioridade = (item1.prioridade * qty1 + 
-                                          item2.prioridade * qty2 + 
-                                          item3.prioridade * qty3)
-                        
-                        padroes.append(PadraoCorte(
-                            combinacao=[(item1, qty1), (item2, qty2), (item3, qty3)],
-                            desperdicio=desperdicio,
-                            utilizacao_percentual=utilizacao,
-                            score_prioridade=score_prioridade,
-                            largura_chapa=self.largura_chapa
-                        ))
+                if podar:
+                    i, descendo = i - 1, False
+                    continue
+                
+                quantidades[i] = min(limites[i], restante[i] // tamanhos[i])
+            else:
+                quantidades[i] -= 1
+                if quantidades[i] < 0:
+                    quantidades[i] = 0
+                    i -= 1
+                    continue
+            
+            q = quantidades[i]
+            restante[i + 1] = restante[i] - q * tamanhos[i]
+            score[i + 1] = score[i] + q * prioridades[i]
+            menor_livre[i + 1] = menor_livre[i] if q == limites[i] else min(menor_livre[i], tamanhos[i])
+            i, descendo = i + 1, True
         
-        return padroes
+        situacao.update(completo=True, nos=nos)
+    
+    def _construir_padrao_greedy(self, grupo: _GrupoVetorizado, ordem: np.ndarray) -> np.ndarray:
+        """Constrói padrão usando abordagem greedy"""
+        espaco_restante = grupo.livre
+        contagens = grupo.base.copy()
+        ocupados = grupo.ocupados.tolist()
+        max_qty = grupo.max_qty.tolist()
+        
+        for j in ordem.tolist():
+            if max_qty[j] <= 0:
+                continue
+            
+            # Limita pela necessidade do item
+            qty_desejada = min(espaco_restante // ocupados[j], max_qty[j], 50)
+            
+            if qty_desejada > 0:
+                contagens[j] += qty_desejada
+                espaco_restante -= qty_desejada * ocupados[j]
+        
+        if not contagens.any():
+            return None
+        
+        return contagens
     
-    def _remover_duplicatas(self, padroes: List[PadraoCorte]) -> List[PadraoCorte]:
-        """Remove padrões duplicados"""
-        padroes_unicos = []
-        assinaturas_vistas = set()
+    def _construir_padrao_best_fit(self, grupo: _GrupoVetorizado) -> np.ndarray:
+        """Constrói padrão tentando minimizar desperdício em cada passo.
         
-        for padrao in padroes:
-            # Cria assinatura única do padrão
-            assinatura = tuple(sorted([
-                (item.item_code, qty) for item, qty in padrao.combinacao
-            ]))
+        Para cada item a maior quantidade que cabe é a de menor sobra, então
+        cada passo avalia todos os itens de uma vez e escolhe o de menor
+        desperdício.
+        """
+        espaco_restante = grupo.livre
+        contagens = grupo.base.copy()
+        disponiveis = grupo.max_qty > 0
+        limite = np.minimum(grupo.max_qty, 30)
+        divisor = np.where(disponiveis, grupo.ocupados, 1)
+        
+        while disponiveis.any() and espaco_restante > 0:
+            qty = np.where(disponiveis, np.minimum(limite, espaco_restante // divisor), 0)
+            desperdicio = np.where(qty > 0, espaco_restante - qty * grupo.ocupados, np.iinfo(np.int64).max)
+            
+            melhor = int(np.argmin(desperdicio))
+            if qty[melhor] <= 0:
+                break
             
-            if assinatura not in assinaturas_vistas:
-                assinaturas_vistas.add(assinatura)
-                padroes_unicos.append(padrao)
+            contagens[melhor] += qty[melhor]
+            espaco_restante -= int(qty[melhor] * grupo.ocupados[melhor])
+            disponiveis[melhor] = False
         
-        return padroes_unicos
+        if not contagens.any():
+            return None
+        
+        return contagens
     
-    def _ordenar_padroes(self, padroes: List[PadraoCorte]) -> List[PadraoCorte]:
-        """Ordena padrões por desperdício (crescente) e prioridade (decrescente)"""
-        return sorted(padroes, key=lambda p: (p.desperdicio, -p.score_prioridade))
+    def _criar_padrao(self, combinacao: List[Tuple[Item, int]]) -> PadraoCorte:
+        """Monta o padrão calculando desperdício, utilização, prioridade e perda nos cortes"""
+        largura = int(_para_unidades(self.largura_chapa))
+        tamanho_total = sum(int(_para_unidades(item.desenvolvimento)) * qty for item, qty in combinacao)
+        perda = max(sum(qty for _, qty in combinacao) - 1, 0) * int(_para_unidades(self.margem_corte))
+        score_prioridade = sum(item.prioridade * qty for item, qty in combinacao)
+        
+        return PadraoCorte(
+            combinacao=combinacao,
+            desperdicio=(largura - tamanho_total - perda) / _UNIDADES_POR_MM,
+            utilizacao_percentual=tamanho_total / largura * 100,
+            score_prioridade=score_prioridade,
+            largura_chapa=self.largura_chapa,
+            perda_corte=perda / _UNIDADES_POR_MM
+        )
@@ -0,0 +1,214 @@
+# app/planejador.py
+import math
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .models import Item, PlanoProducao
+from .optimizer import OtimizadorCorte1D, _GrupoVetorizado, _converter_para_grade, _para_unidades
+
+# Tolerância numérica do simplex e do custo reduzido
+_EPSILON = 1e-9
+
+# Limites de segurança das iterações
+_MAX_COLUNAS_GERADAS = 200
+_MAX_PIVOS = 5000
+
+
+class PlanejadorProducao:
+    """Planeja a produção de um grupo pelo problema de corte de estoque.
+    
+    Geração de colunas (Gilmore-Gomory): o mestre é uma relaxação linear
+    que decide quantas chapas de cada padrão rodar para cobrir a falta
+    (`demanda - estoque_atual`) de todos os itens; o subproblema é uma
+    mochila limitada que gera o padrão de menor custo reduzido. No fim a
+    solução é arredondada para baixo e a sobra de demanda é coberta por
+    padrões de preenchimento máximo. Cada peça ocupa seu tamanho mais a
+    `margem_corte`, como no otimizador.
+    """
+    
+    def __init__(self, largura_chapa: float, margem_corte: float = 0.0):
+        self.largura_chapa = largura_chapa
+        self.margem_corte = margem_corte
+        self.otimizador = OtimizadorCorte1D(largura_chapa, margem_corte=margem_corte)
+    
+    def planejar(self, itens: List[Item]) -> PlanoProducao:
+        """Monta o plano de produção que cobre a falta de todos os itens"""
+        itens_demanda = [
+            item for item in itens
+            if item.quantidade_necessaria[0] > 0 and 0 < item.desenvolvimento <= self.largura_chapa
+        ]
+        
+        if not itens_demanda:
+            return PlanoProducao(padroes=[], total_chapas=0, limite_inferior=0, producao={})
+        
+        demanda = np.array([item.quantidade_necessaria[0] for item in itens_demanda], dtype=float)
+        margem = int(_para_unidades(self.margem_corte))
+        tamanhos, capacidade, _ = _converter_para_grade(
+            (_para_unidades([item.desenvolvimento for item in itens_demanda]) + margem).tolist(),
+            int(_para_unidades(self.largura_chapa)) + margem
+        )
+        limites = [min(int(d), capacidade // t) for d, t in zip(demanda, tamanhos)]
+        
+        colunas = self._colunas_iniciais(itens_demanda, tamanhos, limites, capacidade)
+        m = len(itens_demanda)
+        base = list(range(m, 2 * m))  # Padrões homogêneos formam a base inicial
+        
+        for _ in range(_MAX_COLUNAS_GERADAS):
+            base, x_base, duais = _resolver_mestre(np.array(colunas, dtype=float).T, demanda, base)
+            
+            # Subproblema: padrão que maximiza o valor dual dentro da chapa
+            nova_coluna = _mochila_valores(tamanhos, limites, duais, capacidade)
+            if 1.0 - float(np.dot(duais, nova_coluna)) >= -_EPSILON or nova_coluna in colunas:
+                break
+            colunas.append(nova_coluna)
+        
+        # Índices abaixo de m são folgas; os demais apontam para colunas
+        solucao = [(indice - m, valor) for indice, valor in zip(base, x_base) if indice >= m]
+        limite_inferior = math.ceil(sum(valor for _, valor in solucao) - 1e-6)
+        
+        # Arredondamento: parte inteira do mestre + cobertura da demanda residual
+        contagem = Counter()
+        residual = demanda.copy()
+        for indice, valor in solucao:
+            chapas = int(math.floor(valor + 1e-6))
+            if chapas > 0:
+                contagem[tuple(colunas[indice])] += chapas
+                residual -= chapas * np.array(colunas[indice])
+        
+        for coluna, chapas in self._cobrir_residual(tamanhos, capacidade, np.maximum(residual, 0)):
+            contagem[coluna] += chapas
+        
+        return self._montar_plano(itens_demanda, contagem, limite_inferior)
+    
+    def _colunas_iniciais(self, itens: List[Item], tamanhos: List[int], limites: List[int],
+                          capacidade: int) -> List[List[int]]:
+        """Padrões homogêneos (base inicial viável) mais os padrões FFD/best-fit"""
+        colunas = []
+        for i, limite in enumerate(limites):
+            coluna = [0] * len(itens)
+            coluna[i] = max(limite, 1)
+            colunas.append(coluna)
+        
+        grupo = _GrupoVetorizado(itens, self.largura_chapa, margem_corte=self.margem_corte)
+        sementes = [
+            *self.otimizador._gerar_padroes_ffd(grupo),
+            *self.otimizador._gerar_padroes_prioridade(grupo),
+            *self.otimizador._gerar_padroes_best_fit(grupo)
+        ]
+        
+        for linha in sementes:
+            coluna = np.minimum(linha, limites).tolist()
+            if sum(t * q for t, q in zip(tamanhos, coluna)) <= capacidade and coluna not in colunas:
+                colunas.append(coluna)
+        
+        return colunas
+    
+    def _cobrir_residual(self, tamanhos: List[int], capacidade: int,
+                         residual: np.ndarray) -> List[Tuple[Tuple[int, ...], int]]:
+        """Cobre a demanda residual com padrões de preenchimento máximo"""
+        padroes = []
+        residual = residual.astype(int)
+        
+        while residual.sum() > 0:
+            limites = [min(int(r), capacidade // t) for r, t in zip(residual, tamanhos)]
+            coluna = np.array(_mochila_valores(tamanhos, limites, np.array(tamanhos, dtype=float), capacidade))
+            
+            # Repete o padrão enquanto todas as peças ainda forem necessárias
+            usados = coluna > 0
+            if not usados.any():
+                break
+            chapas = max(1, int((residual[usados] // coluna[usados]).min()))
+            padroes.append((tuple(int(q) for q in coluna), chapas))
+            residual = np.maximum(residual - chapas * coluna, 0)
+        
+        return padroes
+    
+    def _montar_plano(self, itens: List[Item], contagem: Counter, limite_inferior: int) -> PlanoProducao:
+        """Converte as colunas inteiras em padrões de corte com número de chapas"""
+        padroes = []
+        producao: Dict[str, int] = {item.item_code: 0 for item in itens}
+        
+        for coluna, chapas in contagem.most_common():
+            combinacao = [(item, qty) for item, qty in zip(itens, coluna) if qty > 0]
+            padroes.append((self.otimizador._criar_padrao(combinacao), chapas))
+            for item, qty in combinacao:
+                producao[item.item_code] += qty * chapas
+        
+        return PlanoProducao(
+            padroes=padroes,
+            total_chapas=sum(chapas for _, chapas in padroes),
+            limite_inferior=limite_inferior,
+            producao=producao
+        )
+
+
+def _resolver_mestre(colunas: np.ndarray, demanda: np.ndarray,
+                     base: List[int]) -> Tuple[List[int], np.ndarray, np.ndarray]:
+    """Simplex revisado para min 1·x sujeito a A·x >= d, x >= 0.
+    
+    As folgas entram como colunas `-I` antes dos padrões, para que os
+    índices da base continuem válidos quando novas colunas são anexadas.
+    Parte de uma base viável (a do passo anterior da geração de colunas)
+    e devolve a base ótima, os valores básicos e os preços duais.
+    """
+    m, n_padroes = colunas.shape
+    matriz = np.hstack([-np.eye(m), colunas])
+    custos = np.concatenate([np.zeros(m), np.ones(n_padroes)])
+    degenerado = False
+    
+    for _ in range(_MAX_PIVOS):
+        matriz_base = matriz[:, base]
+        x_base = np.linalg.solve(matriz_base, demanda)
+        duais = np.linalg.solve(matriz_base.T, custos[base])
+        reduzidos = custos - duais @ matriz
+        reduzidos[base] = 0.0
+        
+        candidatos = np.flatnonzero(reduzidos < -_EPSILON)
+        if candidatos.size == 0:
+            return base, x_base, duais
+        
+        # Regra de Bland após pivô degenerado evita ciclagem
+        entra = int(candidatos[0]) if degenerado else int(candidatos[np.argmin(reduzidos[candidatos])])
+        direcao = np.linalg.solve(matriz_base, matriz[:, entra])
+        
+        positivos = direcao > _EPSILON
+        if not positivos.any():
+            return base, x_base, duais
+        
+        razoes = np.full(m, np.inf)
+        razoes[positivos] = x_base[positivos] / direcao[positivos]
+        sai = int(np.argmin(razoes))
+        degenerado = razoes[sai] < _EPSILON
+        base = base[:sai] + [entra] + base[sai + 1:]
+    
+    return base, x_base, duais
+
+
+def _mochila_valores(tamanhos: List[int], limites: List[int], valores: np.ndarray,
+                     capacidade: int) -> List[int]:
+    """Mochila limitada com valores reais; devolve as quantidades do melhor padrão"""
+    n = len(tamanhos)
+    melhor = np.zeros(capacidade + 1)
+    escolhas = np.zeros((n, capacidade + 1), dtype=np.int32)
+    
+    for i in range(n):
+        if valores[i] <= _EPSILON:
+            continue
+        anterior = melhor.copy()
+        for qty in range(1, limites[i] + 1):
+            deslocamento = qty * tamanhos[i]
+            candidato = anterior[:capacidade + 1 - deslocamento] + qty * valores[i]
+            melhora = candidato > melhor[deslocamento:] + _EPSILON
+            np.copyto(melhor[deslocamento:], candidato, where=melhora)
+            np.copyto(escolhas[i, deslocamento:], qty, where=melhora)
+    
+    # Reconstrói o padrão a partir da capacidade cheia
+    quantidades = [0] * n
+    restante = capacidade
+    for i in range(n - 1, -1, -1):
+        quantidades[i] = int(escolhas[i, restante])
+        restante -= quantidades[i] * tamanhos[i]
+    
+    return quantidades
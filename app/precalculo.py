@@ -0,0 +1,226 @@
+# app/precalculo.py
+import json
+import os
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from . import database
+from .models import Item, PadraoCorte
+from .optimizer import _PARTIDAS, OtimizadorCorte1D, _GrupoVetorizado, impressao_perfil
+
+# Padrões guardados por item (o mesmo top N da página de resultados)
+TOP_N = 10
+
+
+def _codificar(itens: List[Item], padroes: List[PadraoCorte]) -> bytes:
+    """Padrões como matriz de quantidades (uint32, colunas na ordem de `itens`) comprimida"""
+    posicao = {item.item_code: j for j, item in enumerate(itens)}
+    contagens = np.zeros((len(padroes), len(itens)), dtype=np.uint32)
+    for i, padrao in enumerate(padroes):
+        for item, quantidade in padrao.combinacao:
+            contagens[i, posicao[item.item_code]] = quantidade
+    return zlib.compress(contagens.tobytes())
+
+
+def precalcular_grupo(itens: List[Item], largura_util: float, quantidade_minima: int = 1,
+                      margem_corte: float = 0.0, semente: int = 0,
+                      partidas: int = _PARTIDAS) -> List[Tuple[str, bytes]]:
+    """Top N ancorado em cada item do grupo: (item_code, padrões codificados) por item.
+    
+    `semente` e `partidas` são as da busca multipartida das requisições
+    (BUSCA_SEMENTE e BUSCA_PARTIDAS), para o resultado ser o mesmo.
+    """
+    otimizador = OtimizadorCorte1D(largura_util, margem_corte=margem_corte, semente=semente, partidas=partidas)
+    linhas = []
+    
+    for item in itens:
+        padroes = otimizador.gerar_padroes_otimizados(
+            itens, top_n=TOP_N, item_obrigatorio=item.item_code, quantidade_minima=quantidade_minima
+        )
+        linhas.append((item.item_code, _codificar(itens, padroes)))
+    
+    return linhas
+
+
+def _precalcular_grupo_processo(db_path: str, espessura: float, largura: float, largura_util: float,
+                                quantidade_minima: int, margem_corte: float, semente: int, partidas: int) -> dict:
+    """Otimiza um grupo no processo de trabalho (sem gravar)"""
+    inicio = time.perf_counter()
+    itens = database.get_items_by_dimensions(db_path, espessura, largura)
+    
+    return {
+        'impressao': impressao_perfil(itens, largura_util, margem_corte, semente, partidas),
+        'itens': [item.item_code for item in itens],
+        'linhas': precalcular_grupo(itens, largura_util, quantidade_minima, margem_corte, semente, partidas),
+        'tempo_s': time.perf_counter() - inicio
+    }
+
+
+def grupos_desatualizados(db_path: str, largura_util: float, quantidade_minima: int = 1,
+                          grupos: Optional[List[Tuple[float, float]]] = None,
+                          margem_corte: float = 0.0, semente: int = 0,
+                          partidas: int = _PARTIDAS) -> List[Tuple[float, float]]:
+    """Grupos sem padrões guardados ou cujo perfil (medidas, margem, limites, prioridades, busca) mudou.
+    
+    Sem a tabela de padrões (banco somente leitura quando foi preparado),
+    todos os grupos estão desatualizados.
+    """
+    existentes = [(esp, larg) for esp, larg, _ in database.get_dimension_groups(db_path)]
+    if grupos is not None:
+        existentes = [grupo for grupo in existentes if grupo in grupos]
+    
+    guardados = {}
+    try:
+        linhas = database.get_db_connection(db_path).execute(
+            'SELECT espessura, largura, impressao, COUNT(*) AS total FROM tbl_padroes_precalculados '
+            'WHERE largura_util = ? AND quantidade_minima = ? GROUP BY espessura, largura, impressao',
+            (largura_util, quantidade_minima)
+        ).fetchall()
+    except sqlite3.OperationalError:
+        linhas = []
+    for row in linhas:
+        guardados.setdefault((row['espessura'], row['largura']), []).append((row['impressao'], row['total']))
+    
+    desatualizados = []
+    for espessura, largura in existentes:
+        itens = database.get_items_by_dimensions(db_path, espessura, largura)
+        impressao = impressao_perfil(itens, largura_util, margem_corte, semente, partidas)
+        if guardados.get((espessura, largura)) != [(impressao, len(itens))]:
+            desatualizados.append((espessura, largura))
+    
+    return desatualizados
+
+
+def atualizar_padroes(db_path: str, largura_util: float, quantidade_minima: int = 1,
+                      grupos: Optional[List[Tuple[float, float]]] = None, forcar: bool = False,
+                      processos: Optional[int] = None, margem_corte: float = 0.0,
+                      semente: int = 0, partidas: int = _PARTIDAS) -> Iterator[dict]:
+    """Recalcula e grava os padrões dos grupos desatualizados (ou todos, com `forcar`).
+    
+    O cálculo roda num pool de processos, um grupo por tarefa; só o processo
+    principal grava, um grupo por transação, então uma interrupção deixa
+    os grupos já gravados válidos. Sem `grupos`, também apaga os padrões de
+    grupos que não existem mais no catálogo. Os padrões guardados com outra
+    `margem_corte`, `semente` ou `partidas` contam como desatualizados.
+    
+    Sem a tabela de padrões (ou com o banco somente leitura), entrega um
+    único resultado com `erro` e não calcula nada; um grupo que não
+    consegue ser gravado (ex.: banco ocupado) vira um resultado com `erro`.
+    """
+    conn = database.get_db_connection(db_path)
+    
+    try:
+        with conn:
+            if grupos is None:
+                conn.execute(
+                    'DELETE FROM tbl_padroes_precalculados WHERE largura_util = ? AND NOT EXISTS ('
+                    'SELECT 1 FROM tbl_demanda d WHERE d.espessura = tbl_padroes_precalculados.espessura '
+                    'AND d.largura = tbl_padroes_precalculados.largura)',
+                    (largura_util,)
+                )
+            else:
+                conn.execute('SELECT 1 FROM tbl_padroes_precalculados LIMIT 1')
+    except sqlite3.OperationalError as erro:
+        yield {'largura_util': largura_util, 'erro': f'Padrões pré-calculados indisponíveis: {erro}'}
+        return
+    
+    if forcar:
+        existentes = [(esp, larg) for esp, larg, _ in database.get_dimension_groups(db_path)]
+        selecionados = [grupo for grupo in existentes if grupos is None or grupo in grupos]
+    else:
+        selecionados = grupos_desatualizados(
+            db_path, largura_util, quantidade_minima, grupos, margem_corte, semente, partidas
+        )
+    
+    if not selecionados:
+        return
+    
+    processos = max(1, min(processos or os.cpu_count() or 1, len(selecionados)))
+    
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {
+            executor.submit(
+                _precalcular_grupo_processo, db_path, esp, larg, largura_util, quantidade_minima, margem_corte,
+                semente, partidas
+            ): (esp, larg)
+            for esp, larg in selecionados
+        }
+        
+        for futuro in as_completed(futuros):
+            espessura, largura = futuros[futuro]
+            try:
+                resultado = futuro.result()
+            except Exception as erro:
+                yield {'espessura': espessura, 'largura': largura, 'largura_util': largura_util, 'erro': str(erro)}
+                continue
+            
+            itens = json.dumps(resultado['itens'])
+            calculado_em = time.time()
+            try:
+                with conn:
+                    conn.execute(
+                        'DELETE FROM tbl_padroes_precalculados WHERE espessura = ? AND largura = ? '
+                        'AND largura_util = ? AND quantidade_minima = ?',
+                        (espessura, largura, largura_util, quantidade_minima)
+                    )
+                    conn.executemany(
+                        'INSERT INTO tbl_padroes_precalculados (espessura, largura, largura_util, quantidade_minima, '
+                        'item_code, impressao, itens, padroes, calculado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        [
+                            (espessura, largura, largura_util, quantidade_minima, item_code,
+                             resultado['impressao'], itens, dados, calculado_em)
+                            for item_code, dados in resultado['linhas']
+                        ]
+                    )
+            except sqlite3.OperationalError as erro:
+                yield {'espessura': espessura, 'largura': largura, 'largura_util': largura_util, 'erro': str(erro)}
+                continue
+            
+            yield {
+                'espessura': espessura,
+                'largura': largura,
+                'largura_util': largura_util,
+                'itens': len(resultado['itens']),
+                'tempo_s': resultado['tempo_s']
+            }
+
+
+def carregar_padroes(db_path: str, itens: List[Item], largura_util: float, item_code: str,
+                     quantidade_minima: int = 1, margem_corte: float = 0.0, semente: int = 0,
+                     partidas: int = _PARTIDAS) -> Optional[List[PadraoCorte]]:
+    """Top N ancorado guardado, remontado com os itens atuais (uma leitura indexada).
+    
+    Devolve None se o item não tem padrões guardados ou se o perfil do
+    grupo (ou a margem de corte, ou a semente e as partidas da busca)
+    mudou desde o cálculo (aí quem chama otimiza normalmente). Estoque e
+    demanda podem ter mudado: desperdício e score saem dos itens atuais.
+    """
+    if not itens:
+        return None
+    
+    try:
+        row = database.get_db_connection(db_path).execute(
+            'SELECT impressao, itens, padroes FROM tbl_padroes_precalculados '
+            'WHERE espessura = ? AND largura = ? AND largura_util = ? AND quantidade_minima = ? AND item_code = ?',
+            (itens[0].espessura, itens[0].largura, largura_util, quantidade_minima, item_code)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        # Sem a tabela (banco somente leitura quando foi preparado)
+        return None
+    
+    if row is None or row['impressao'] != impressao_perfil(itens, largura_util, margem_corte, semente, partidas):
+        return None
+    
+    # Colunas guardadas -> posição do item no grupo atual (a ordem pode variar)
+    codigos = json.loads(row['itens'])
+    posicao = {item.item_code: j for j, item in enumerate(itens)}
+    guardados = np.frombuffer(zlib.decompress(row['padroes']), dtype=np.uint32).reshape(-1, len(codigos))
+    contagens = np.zeros((len(guardados), len(itens)), dtype=np.int64)
+    contagens[:, [posicao[codigo] for codigo in codigos]] = guardados
+    
+    return _GrupoVetorizado(itens, largura_util, margem_corte=margem_corte).padroes(contagens)
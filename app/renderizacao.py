@@ -0,0 +1,172 @@
+# app/renderizacao.py
+import gzip
+import hashlib
+import os
+import threading
+from dataclasses import astuple
+from types import SimpleNamespace
+from typing import Dict, Iterable, Tuple
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # Opcional: sem o pacote, só gzip
+    brotli = None
+
+from .cache import CacheOtimizacao
+
+# Tipos de conteúdo que vale a pena comprimir
+_COMPRESSIVEIS = {
+    'application/json', 'application/javascript', 'text/javascript', 'text/css',
+    'text/html', 'text/plain', 'image/svg+xml'
+}
+
+# Nível do gzip e qualidade do brotli (equilíbrio entre CPU e tamanho)
+_NIVEL_GZIP = 6
+_QUALIDADE_BROTLI = 5
+
+# Impressão do conteúdo dos arquivos estáticos: nome -> (mtime, tamanho, hash)
+_impressoes: Dict[str, Tuple[float, int, str]] = {}
+_lock = threading.Lock()
+
+
+def _cache_fragmentos() -> CacheOtimizacao:
+    return current_app.extensions['cache_fragmentos']
+
+
+def _renderizar_macro(nome: str, chave: tuple, *args):
+    """Macro de _components.html renderizada uma vez por `chave` (LRU em memória)"""
+    macro = getattr(current_app.jinja_env.get_template('_components.html').module, nome)
+    return _cache_fragmentos().obter_ou_calcular((nome,) + chave, lambda: macro(*args))
+
+
+def cartao_padrao(padrao, loop):
+    """`pattern_card` em cache; a chave leva tudo o que o cartão mostra"""
+    chave = (
+        loop.index, padrao.desperdicio, padrao.perda_corte, padrao.utilizacao_percentual,
+        padrao.score_prioridade,
+        tuple(
+            (item.item_code, item.item_name, item.desenvolvimento, item.prioridade, quantidade)
+            for item, quantidade in padrao.combinacao
+        )
+    )
+    return _renderizar_macro('pattern_card', chave, padrao, loop)
+
+
+def cartao_item(item):
+    """`item_card` em cache, pela linha inteira do item"""
+    return _renderizar_macro('item_card', astuple(item), item)
+
+
+def fragmento_padroes(padroes: Iterable) -> str:
+    """Cartões dos padrões em sequência, numerados como no `{% for %}` do results.html"""
+    return ''.join(
+        cartao_padrao(padrao, SimpleNamespace(index=posicao)) for posicao, padrao in enumerate(padroes, 1)
+    )
+
+
+def fragmento_itens(itens: Iterable) -> str:
+    """Cartões dos itens em sequência (uma página da busca)"""
+    return ''.join(cartao_item(item) for item in itens)
+
+
+def fragmento_depuracao(estatisticas) -> str:
+    """`debug_panel` sem cache: as estatísticas mudam a cada execução"""
+    macro = current_app.jinja_env.get_template('_components.html').module.debug_panel
+    return str(macro(estatisticas))
+
+
+def impressao_estatico(filename: str) -> str:
+    """Hash do conteúdo de um arquivo estático (recalculado se o arquivo mudar)"""
+    caminho = os.path.join(current_app.static_folder, filename)
+    try:
+        estado = os.stat(caminho)
+    except OSError:
+        return ''
+    
+    with _lock:
+        guardada = _impressoes.get(caminho)
+    if guardada and guardada[:2] == (estado.st_mtime, estado.st_size):
+        return guardada[2]
+    
+    with open(caminho, 'rb') as arquivo:
+        impressao = hashlib.sha1(arquivo.read()).hexdigest()[:12]
+    with _lock:
+        _impressoes[caminho] = (estado.st_mtime, estado.st_size, impressao)
+    return impressao
+
+
+def _comprimir(resposta, min_bytes: int):
+    """Comprime a resposta com brotli ou gzip, conforme o Accept-Encoding"""
+    # Arquivos (send_file) também contam como fluxo, mas têm tamanho conhecido
+    em_fluxo = resposta.is_streamed and not resposta.direct_passthrough
+    if (resposta.mimetype not in _COMPRESSIVEIS or em_fluxo
+            or not 200 <= resposta.status_code < 300 or resposta.status_code in (204, 206)
+            or 'Content-Encoding' in resposta.headers):
+        return
+    
+    # A representação muda com o Accept-Encoding, tenha comprimido ou não
+    resposta.vary.add('Accept-Encoding')
+    
+    codificacao = request.accept_encodings.best_match(['br', 'gzip'] if brotli else ['gzip'])
+    if codificacao is None:
+        return
+    
+    # Arquivos estáticos chegam como arquivo aberto (send_file); lê para comprimir
+    resposta.direct_passthrough = False
+    dados = resposta.get_data()
+    if len(dados) < min_bytes:
+        return
+    
+    if codificacao == 'br':
+        comprimidos = brotli.compress(dados, quality=_QUALIDADE_BROTLI)
+    else:
+        comprimidos = gzip.compress(dados, compresslevel=_NIVEL_GZIP, mtime=0)
+    
+    resposta.set_data(comprimidos)
+    resposta.headers['Content-Encoding'] = codificacao
+    
+    # Mesmo conteúdo, bytes diferentes: o ETag deixa de ser forte
+    etag, fraco = resposta.get_etag()
+    if etag and not fraco:
+        resposta.set_etag(etag, weak=True)
+
+
+def registrar_renderizacao(app):
+    """Cache de fragmentos, URLs estáticas com hash e compressão das respostas.
+    
+    `url_for('static', ...)` ganha `?v=<hash do conteúdo>`; pedidos com o
+    hash atual saem com Cache-Control de longa duração (`immutable`), e um
+    arquivo alterado muda a URL. Respostas de texto/JSON a partir de
+    COMPRESSAO_MIN_BYTES são comprimidas (brotli se o pacote estiver
+    instalado, senão gzip); respostas em fluxo (SSE, NDJSON) não.
+    """
+    app.extensions['cache_fragmentos'] = CacheOtimizacao(
+        None,
+        max_itens=app.config['FRAGMENTOS_MAX_ITENS'],
+        max_bytes=int(app.config['FRAGMENTOS_MAX_MB'] * 1024 * 1024)
+    )
+    app.jinja_env.globals.update(cartao_padrao=cartao_padrao, cartao_item=cartao_item)
+    
+    @app.url_defaults
+    def _versionar_estatico(endpoint, valores):
+        if endpoint == 'static' and 'filename' in valores and 'v' not in valores:
+            impressao = impressao_estatico(valores['filename'])
+            if impressao:
+                valores['v'] = impressao
+    
+    @app.after_request
+    def _finalizar_resposta(resposta):
+        if request.endpoint == 'static' and resposta.status_code in (200, 304):
+            versao = request.args.get('v')
+            if versao and versao == impressao_estatico(request.view_args['filename']):
+                resposta.cache_control.public = True
+                resposta.cache_control.max_age = app.config['ESTATICOS_MAX_AGE']
+                resposta.cache_control.immutable = True
+                resposta.cache_control.no_cache = None
+        
+        min_bytes = app.config['COMPRESSAO_MIN_BYTES']
+        if min_bytes >= 0:
+            _comprimir(resposta, min_bytes)
+        return resposta
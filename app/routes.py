@@ -1,45 +1,247 @@
 # app/routes.py
+import hashlib
+import io
+import json
+import math
+from datetime import datetime, timezone
 from flask import (
-    Blueprint, render_template, request, jsonify, current_app, abort
+    Blueprint, render_template, request, jsonify, current_app, abort,
+    Response, stream_with_context, url_for
 )
-from collections import defaultdict
-from . import database
-from .optimizer import OtimizadorCorte1D
+from . import database, intercambio, metricas, precalculo
+from .cache import impressao_digital
+from .lote import otimizar_lote, planejar_lote
+from .optimizer import OtimizadorCorte1D, recomendar_largura
+from .planejador import PlanejadorProducao
+from .renderizacao import fragmento_depuracao, fragmento_itens, fragmento_padroes
 
 # Cria um Blueprint. Todas as rotas serão registradas nele.
 bp = Blueprint('main', __name__)
 
-@bp.route('/')
-def index():
-    """Página inicial com lista de itens"""
-    db_path = current_app.config['DATABASE_PATH']
-    items = database.get_all_items(db_path)
+
+def _largura_da_requisicao(parametros=None):
+    """Lê largura bruta e refilo da URL (ou de `parametros`); devolve (bruta, refilo, utilizável)"""
+    default_largura = current_app.config['LARGURA_CHAPA_PADRAO']
+    parametros = request.args if parametros is None else parametros
     
-    # --- INÍCIO DA MODIFICAÇÃO ---
+    try:
+        largura_bruta = float(parametros.get('largura', default_largura))
+        refilo = float(parametros.get('refilo', 0))
+    except (TypeError, ValueError):
+        largura_bruta = default_largura
+        refilo = 0
+    
+    return largura_bruta, refilo, largura_bruta - refilo
+
+
+def _erro_largura(largura_bruta, refilo):
+    """Mensagem de erro se a largura ou o refilo não servem para otimizar; None se servem"""
+    if not (math.isfinite(largura_bruta) and math.isfinite(refilo)):
+        return 'Largura e refilo devem ser números finitos.'
+    maxima = current_app.config['LARGURA_CHAPA_MAXIMA']
+    if max(largura_bruta, largura_bruta - refilo) > maxima:
+        return f'A largura da chapa não pode passar de {maxima:g} mm.'
+    if largura_bruta - refilo <= 0:
+        return 'Refilo não pode ser maior que a largura da chapa.'
+    return None
+
+
+def _larguras_da_requisicao():
+    """Lê várias larguras brutas e refilos da URL; devolve [(bruta, refilo, utilizável), ...].
+    
+    `largura` e `refilo` podem vir repetidos ou separados por vírgula. Sem
+    `largura`, usa LARGURAS_CHAPA da configuração. Um refilo vale para
+    todas as larguras; com vários, cada um é o da largura na mesma posição.
+    Levanta ValueError se algum valor é inválido.
+    """
+    def lista(nome):
+        return [
+            float(valor)
+            for parametro in request.args.getlist(nome)
+            for valor in parametro.split(',') if valor.strip()
+        ]
+    
+    try:
+        larguras = lista('largura') or list(current_app.config['LARGURAS_CHAPA'])
+        refilos = lista('refilo') or [0.0]
+    except ValueError:
+        raise ValueError('Larguras e refilos devem ser números.') from None
+    
+    if len(refilos) == 1:
+        refilos = refilos * len(larguras)
+    if len(refilos) != len(larguras):
+        raise ValueError('Informe um refilo para todas as larguras ou um para cada largura.')
+    if len(larguras) > current_app.config['VARREDURA_MAX_LARGURAS']:
+        raise ValueError(f"No máximo {current_app.config['VARREDURA_MAX_LARGURAS']} larguras por consulta.")
+    for largura, refilo in zip(larguras, refilos):
+        erro = _erro_largura(largura, refilo)
+        if erro:
+            raise ValueError(erro)
+    
+    return [(largura, refilo, largura - refilo) for largura, refilo in zip(larguras, refilos)]
+
+
+def _quantidade_minima(parametros=None):
+    """Lê `qtd_minima` (peças do item selecionado por padrão), entre 1 e QTD_MINIMA_MAXIMA"""
+    parametros = request.args if parametros is None else parametros
+    try:
+        quantidade = int(parametros.get('qtd_minima', 1))
+    except (TypeError, ValueError, OverflowError):
+        return 1
+    return min(max(quantidade, 1), current_app.config['QTD_MINIMA_MAXIMA'])
+
+
+def _prazo_ms(parametros=None):
+    """Lê `prazo_ms` (modo branch-and-bound com prazo), limitado a PRAZO_MAX_MS; None sem prazo"""
+    parametros = request.args if parametros is None else parametros
+    try:
+        prazo = float(parametros.get('prazo_ms') or 0)
+    except (TypeError, ValueError):
+        return None
+    if not prazo > 0:
+        return None
+    return min(prazo, current_app.config['PRAZO_MAX_MS'])
+
+
+def _pareto(parametros=None):
+    """Lê `ordem`: True para a fronteira de Pareto no lugar do top 10"""
+    parametros = request.args if parametros is None else parametros
+    return parametros.get('ordem') == 'pareto'
 
-    # 1. Ordena os itens por prioridade (maior primeiro)
-    # A propriedade .prioridade é definida em models.py (10 para alta, 1 para baixa)
-    items_ordenados = sorted(items, key=lambda item: item.prioridade, reverse=True)
+
+def _chave_padroes(largura_utilizavel, codigo, quantidade_minima, itens_grupo, pareto=False):
+    """Chave do cache para a busca ancorada (top 10 ou fronteira de Pareto) de um item"""
+    return (
+        'fronte' if pareto else 'padroes', largura_utilizavel, 10, codigo, quantidade_minima,
+        impressao_digital(itens_grupo)
+    )
+
+
+def _padroes_ancorados(db_path, otimizador, itens_grupo, codigo, quantidade_minima, progresso=None,
+                       prazo_ms=None, pareto=False):
+    """Top 10 ancorado: dos padrões pré-calculados se o grupo não mudou, senão otimiza.
+    
+    Com `prazo_ms`, sempre otimiza (branch-and-bound com prazo). Com
+    `pareto`, devolve a fronteira de Pareto (que não é pré-calculada).
+    """
+    if pareto:
+        return otimizador.gerar_fronte_pareto(
+            itens_grupo, item_obrigatorio=codigo, quantidade_minima=quantidade_minima,
+            progresso=progresso, prazo_ms=prazo_ms
+        )
     
-    # 2. Extrai espessuras únicas para o filtro
-    espessuras_unicas = sorted(list(set(item.espessura for item in items)))
+    if prazo_ms is None:
+        padroes = precalculo.carregar_padroes(
+            db_path, itens_grupo, otimizador.largura_chapa, codigo, quantidade_minima, otimizador.margem_corte,
+            otimizador.semente, otimizador.partidas
+        )
+        if padroes is not None:
+            return padroes
+    
+    return otimizador.gerar_padroes_otimizados(
+        itens_grupo, top_n=10,
+        item_obrigatorio=codigo, quantidade_minima=quantidade_minima,
+        progresso=progresso, prazo_ms=prazo_ms
+    )
+
+
+def _cache():
+    """Cache de resultados do otimizador registrado na aplicação"""
+    return current_app.extensions['cache_otimizacao']
+
+
+def _cache_perfis():
+    """Cache do otimizador por perfil de demanda (sobrevive a gravações no banco)"""
+    return current_app.extensions['cache_perfis']
+
+
+def _otimizador(largura_chapa):
+    """Otimizador com o cache de perfis, a margem de corte e a busca multipartida da configuração"""
+    return OtimizadorCorte1D(
+        largura_chapa,
+        cache_perfis=_cache_perfis(),
+        margem_corte=current_app.config['MARGEM_CORTE'],
+        semente=current_app.config['BUSCA_SEMENTE'],
+        partidas=current_app.config['BUSCA_PARTIDAS'],
+        processos=current_app.config['BUSCA_PROCESSOS']
+    )
+
 
-    # --- FIM DA MODIFICAÇÃO ---
+def _tarefas():
+    """Pool de tarefas de otimização em segundo plano"""
+    return current_app.extensions['tarefas']
 
-    # Agrupa por dimensões para visualização (mantido se você usar em outro lugar)
-    grupos = defaultdict(list)
-    for item in items:
-        chave = (item.espessura, item.largura)
-        grupos[chave].append(item)
+
+@bp.route('/')
+def index():
+    """Página inicial com a primeira página de itens (o resto vem de /api/itens)"""
+    db_path = current_app.config['DATABASE_PATH']
+    por_pagina = current_app.config['ITENS_POR_PAGINA']
+    
+    # Itens já vêm do SQL ordenados por prioridade (maior primeiro); as
+    # próximas páginas e os filtros são buscados pelo index.js
+    items, total = database.buscar_itens(db_path, pagina=1, por_pagina=por_pagina)
+    
+    # Espessuras únicas para o filtro
+    espessuras_unicas = database.get_espessuras(db_path)
     
     return render_template(
         'index.html', 
-        items=items_ordenados,  # Passa a lista ordenada
+        items=items,
+        total_itens=total,
+        por_pagina=por_pagina,
         espessuras=espessuras_unicas, # Passa a lista de espessuras
-        largura_chapa=current_app.config['LARGURA_CHAPA_PADRAO'],
-        grupos=grupos
+        largura_chapa=current_app.config['LARGURA_CHAPA_PADRAO']
     )
 
+
+@bp.route('/api/itens')
+def listar_itens():
+    """Busca paginada de itens por código/nome (`q`) e `espessura`.
+    
+    Devolve os itens e o `html` dos cartões (macro item_card).
+    Responde com ETag e Last-Modified derivados da versão de tbl_demanda;
+    um GET condicional sem mudança no banco recebe 304 sem tocar na consulta.
+    """
+    db_path = current_app.config['DATABASE_PATH']
+    busca = request.args.get('q', '').strip()
+    
+    try:
+        espessura = float(request.args['espessura']) if request.args.get('espessura') else None
+        pagina = max(int(request.args.get('pagina', 1)), 1)
+        por_pagina = int(request.args.get('por_pagina', current_app.config['ITENS_POR_PAGINA']))
+    except ValueError:
+        return jsonify({'error': 'Parâmetros inválidos'}), 400
+    por_pagina = min(max(por_pagina, 1), current_app.config['ITENS_POR_PAGINA_MAX'])
+    
+    versao, alterado_em = database.versao_tabela(db_path)
+    etag = hashlib.sha1(repr((versao, busca, espessura, pagina, por_pagina)).encode('utf-8')).hexdigest()
+    ultima_alteracao = datetime.fromtimestamp(int(alterado_em), tz=timezone.utc)
+    
+    # If-None-Match tem precedência sobre If-Modified-Since (RFC 9110)
+    if request.if_none_match:
+        inalterado = request.if_none_match.contains_weak(etag)  # O ETag vira fraco com a compressão
+    else:
+        inalterado = request.if_modified_since is not None and request.if_modified_since >= ultima_alteracao
+    
+    if inalterado:
+        resposta = Response(status=304)
+    else:
+        itens, total = database.buscar_itens(db_path, busca, espessura, pagina, por_pagina)
+        resposta = jsonify({
+            'itens': [item.para_dict() for item in itens],
+            'html': fragmento_itens(itens),  # Cartões da macro item_card, prontos para inserir
+            'total': total,
+            'pagina': pagina,
+            'por_pagina': por_pagina,
+            'paginas': -(-total // por_pagina)
+        })
+    
+    resposta.set_etag(etag)
+    resposta.last_modified = ultima_alteracao
+    resposta.cache_control.no_cache = True  # Sempre revalida com o ETag
+    return resposta
+
 @bp.route('/api/config', methods=['GET', 'POST'])
 def config():
     # ... (resto do arquivo sem modificação) ...
@@ -74,22 +276,14 @@ def otimizar(item_code):
     
     # Pega configurações padrão do app
     db_path = current_app.config['DATABASE_PATH']
-    default_largura = current_app.config['LARGURA_CHAPA_PADRAO']
-
-    # Pega valores da URL (query parameters)
-    try:
-        largura_bruta = float(request.args.get('largura', default_largura))
-        refilo = float(request.args.get('refilo', 0))
-    except ValueError:
-        largura_bruta = default_largura
-        refilo = 0
 
-    # Calcula a largura utilizável
-    largura_utilizavel = largura_bruta - refilo
+    # Pega valores da URL (query parameters) e calcula a largura utilizável
+    largura_bruta, refilo, largura_utilizavel = _largura_da_requisicao()
+    
+    erro = _erro_largura(largura_bruta, refilo)
+    if erro:
+        return abort(400, erro)
     
-    if largura_utilizavel <= 0:
-        return abort(400, "Refilo não pode ser maior que a largura da chapa.")
-
     # Busca o item selecionado
     item_selecionado = database.get_item_by_code(db_path, item_code)
     
@@ -106,38 +300,410 @@ def otimizar(item_code):
     # --- INÍCIO DA NOVA LÓGICA ---
 
     # 1. Cria o otimizador com a largura utilizável
-    otimizador = OtimizadorCorte1D(largura_utilizavel)
-    
-    # 2. Pede ao otimizador uma lista maior de padrões (ex: 100).
-    #    Eles já vêm ordenados por desperdício e prioridade.
-    todos_padroes = otimizador.gerar_padroes_otimizados(itens_grupo, top_n=100)
+    otimizador = _otimizador(largura_utilizavel)
     
-    # 3. Filtra a lista para manter apenas padrões que contêm o item selecionado
-    padroes_filtrados = []
+    # 2. Busca ancorada: só padrões com pelo menos `qtd_minima` peças do
+    #    item selecionado, já ordenados por desperdício e prioridade.
+    #    O cache evita rodar de novo para o mesmo grupo e largura.
+    quantidade_minima = _quantidade_minima()
     codigo_selecionado = item_selecionado.item_code
+    pareto = _pareto()
+    chave = _chave_padroes(largura_utilizavel, codigo_selecionado, quantidade_minima, itens_grupo, pareto)
     
-    for padrao in todos_padroes:
-        # Verifica se o item_code está na combinação do padrão
-        item_encontrado = False
-        for item, qty in padrao.combinacao:
-            if item.item_code == codigo_selecionado:
-                item_encontrado = True
-                break  # Encontrou, pode parar de checar esta combinação
-        
-        if item_encontrado:
-            padroes_filtrados.append(padrao)
-
-    # 4. Pega os "Top 10" da lista já filtrada e ordenada
-    top_padroes_finais = padroes_filtrados[:10]
+    # 3. Fora do cache, tenta os padrões pré-calculados (uma leitura
+    #    indexada); sem eles, a página sai na hora e o results.js acompanha
+    #    uma tarefa em segundo plano. `?sincrono=1` calcula na requisição.
+    #    `?prazo_ms=` também calcula na requisição, com o branch-and-bound
+    #    limitado ao prazo (sem o cache: o resultado depende do tempo).
+    #    `?ordem=pareto` troca o top 10 pela fronteira de Pareto.
+    #    As medidas do otimizador só existem se ele rodou nesta requisição.
+    prazo_ms = _prazo_ms()
+    if prazo_ms is not None:
+        top_padroes_finais = _padroes_ancorados(
+            db_path, otimizador, itens_grupo, codigo_selecionado, quantidade_minima,
+            prazo_ms=prazo_ms, pareto=pareto
+        )
+    elif request.args.get('sincrono'):
+        top_padroes_finais = _cache().obter_ou_calcular(
+            chave,
+            lambda: _padroes_ancorados(
+                db_path, otimizador, itens_grupo, codigo_selecionado, quantidade_minima, pareto=pareto
+            )
+        )
+    else:
+        top_padroes_finais = _cache().consultar(chave)
+        if top_padroes_finais is None and not pareto:
+            top_padroes_finais = precalculo.carregar_padroes(
+                db_path, itens_grupo, largura_utilizavel, codigo_selecionado, quantidade_minima,
+                otimizador.margem_corte, otimizador.semente, otimizador.partidas
+            )
+            if top_padroes_finais is not None:
+                _cache().guardar(chave, top_padroes_finais)
     
     # --- FIM DA NOVA LÓGICA ---
 
     return render_template(
         'results.html',
         item_selecionado=item_selecionado,
-        padroes=top_padroes_finais, # Passa a lista filtrada
+        padroes=top_padroes_finais, # Padrões que contêm o item selecionado (None = tarefa)
+        estatisticas=otimizador.estatisticas,
+        depuracao=current_app.debug or bool(request.args.get('debug')),
         largura_chapa_bruta=largura_bruta,
         refilo=refilo,
         largura_chapa_utilizavel=largura_utilizavel,
+        margem_corte=otimizador.margem_corte,
+        quantidade_minima=quantidade_minima,
+        pareto=pareto,
         total_itens_grupo=len(itens_grupo)
-    )
\ No newline at end of file
+    )
+
+
+@bp.route('/api/tarefas', methods=['POST'])
+def criar_tarefa():
+    """Agenda a busca ancorada de um item no pool e devolve o id da tarefa.
+    
+    Corpo JSON: {"item_code": ..., "largura": ..., "refilo": ..., "qtd_minima": ...,
+    "prazo_ms": ..., "ordem": ...} (os campos opcionais também podem vir na
+    URL). Com `prazo_ms`, usa o branch-and-bound com prazo e não passa pelo
+    cache. Com `"ordem": "pareto"`, devolve a fronteira de Pareto no lugar
+    do top 10. Os eventos trazem, além dos dados, o `html` dos cartões
+    renderizado com as macros de _components.html.
+    """
+    db_path = current_app.config['DATABASE_PATH']
+    corpo = request.get_json(silent=True) or {}
+    if not isinstance(corpo, dict):
+        return jsonify({'error': 'O corpo JSON deve ser um objeto'}), 400
+    parametros = {**request.args.to_dict(), **corpo}
+    largura_bruta, refilo, largura_utilizavel = _largura_da_requisicao(parametros)
+    
+    erro = _erro_largura(largura_bruta, refilo)
+    if erro:
+        return jsonify({'error': erro}), 400
+    
+    item_selecionado = database.get_item_by_code(db_path, str(parametros.get('item_code', '')))
+    
+    if not item_selecionado:
+        return jsonify({'error': 'Item não encontrado'}), 404
+    
+    itens_grupo = database.get_items_by_dimensions(
+        db_path,
+        item_selecionado.espessura,
+        item_selecionado.largura
+    )
+    
+    quantidade_minima = _quantidade_minima(parametros)
+    prazo_ms = _prazo_ms(parametros)
+    pareto = _pareto(parametros)
+    codigo_selecionado = item_selecionado.item_code
+    chave = _chave_padroes(largura_utilizavel, codigo_selecionado, quantidade_minima, itens_grupo, pareto)
+    cache = _cache()
+    otimizador = _otimizador(largura_utilizavel)
+    app = current_app._get_current_object()
+    
+    def executar(tarefa):
+        # Roda numa thread do pool: nada de `current_app`/`request` aqui, exceto
+        # dentro de `app.app_context()` para renderizar os cartões
+        def progresso(estrategia, padroes):
+            with app.app_context():
+                html = fragmento_padroes(padroes)
+            tarefa.publicar('parcial', {
+                'estrategia': estrategia,
+                'padroes': [padrao.para_dict() for padrao in padroes],
+                'html': html
+            })
+        
+        if prazo_ms is not None:
+            padroes = _padroes_ancorados(
+                db_path, otimizador, itens_grupo, codigo_selecionado, quantidade_minima, progresso, prazo_ms, pareto
+            )
+        else:
+            padroes = cache.obter_ou_calcular(
+                chave,
+                lambda: _padroes_ancorados(
+                    db_path, otimizador, itens_grupo, codigo_selecionado, quantidade_minima, progresso,
+                    pareto=pareto
+                )
+            )
+        with app.app_context():
+            html = fragmento_padroes(padroes)
+            html_depuracao = fragmento_depuracao(otimizador.estatisticas)
+        return {
+            'padroes': [padrao.para_dict() for padrao in padroes],
+            'html': html,  # Cartões da macro pattern_card, prontos para inserir
+            'estatisticas': otimizador.estatisticas,  # None quando o otimizador não rodou
+            'html_depuracao': html_depuracao
+        }
+    
+    tarefa = _tarefas().submeter(executar)
+    
+    return jsonify({
+        'id': tarefa.id,
+        'estado': tarefa.estado,
+        'url': url_for('main.consultar_tarefa', tarefa_id=tarefa.id),
+        'eventos': url_for('main.eventos_tarefa', tarefa_id=tarefa.id)
+    }), 202
+
+
+@bp.route('/api/tarefas/<tarefa_id>')
+def consultar_tarefa(tarefa_id):
+    """Estado e resultado (quando terminada) de uma tarefa"""
+    tarefa = _tarefas().obter(tarefa_id)
+    if tarefa is None:
+        return jsonify({'error': 'Tarefa não encontrada'}), 404
+    return jsonify(tarefa.resumo())
+
+
+@bp.route('/api/tarefas/<tarefa_id>/eventos')
+def eventos_tarefa(tarefa_id):
+    """Progresso da tarefa como Server-Sent Events (parcial, concluida/erro).
+    
+    Cada evento leva um `id`; numa reconexão o navegador manda
+    `Last-Event-ID` e o fluxo continua do evento seguinte.
+    """
+    tarefa = _tarefas().obter(tarefa_id)
+    if tarefa is None:
+        return jsonify({'error': 'Tarefa não encontrada'}), 404
+    
+    try:
+        inicio = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        inicio = 0
+    
+    def fluxo(indice):
+        while True:
+            novos, terminada = tarefa.eventos_desde(indice, timeout=15)
+            if not novos:
+                if terminada:
+                    return
+                yield ': aguardando\n\n'  # Comentário SSE mantém a conexão viva
+                continue
+            
+            for numero, tipo, dados in novos:
+                yield f'id: {numero}\nevent: {tipo}\ndata: {json.dumps(dados, ensure_ascii=False)}\n\n'
+            indice = novos[-1][0] + 1
+    
+    return Response(
+        stream_with_context(fluxo(inicio)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@bp.route('/api/planejar/<item_code>')
+def planejar(item_code):
+    """Plano de produção (chapas por padrão) que cobre a falta do grupo do item"""
+    db_path = current_app.config['DATABASE_PATH']
+    largura_bruta, refilo, largura_utilizavel = _largura_da_requisicao()
+    
+    erro = _erro_largura(largura_bruta, refilo)
+    if erro:
+        return jsonify({'error': erro}), 400
+    
+    item_selecionado = database.get_item_by_code(db_path, item_code)
+    
+    if not item_selecionado:
+        return jsonify({'error': 'Item não encontrado'}), 404
+    
+    itens_grupo = database.get_items_by_dimensions(
+        db_path,
+        item_selecionado.espessura,
+        item_selecionado.largura
+    )
+    
+    plano = _cache().obter_ou_calcular(
+        ('plano', largura_utilizavel, impressao_digital(itens_grupo)),
+        lambda: PlanejadorProducao(largura_utilizavel, current_app.config['MARGEM_CORTE']).planejar(itens_grupo)
+    )
+    
+    return jsonify({
+        'largura_chapa_utilizavel': largura_utilizavel,
+        'total_chapas': plano.total_chapas,
+        'limite_inferior': plano.limite_inferior,
+        'producao': plano.producao,
+        'padroes': [
+            dict(padrao.para_dict(), chapas=chapas)
+            for padrao, chapas in plano.padroes
+        ]
+    })
+
+
+@bp.route('/metrics')
+def metrics():
+    """Métricas do processo no formato de texto do Prometheus"""
+    return Response(metricas.REGISTRO.exportar(), mimetype='text/plain; version=0.0.4')
+
+
+@bp.route('/api/cache')
+def cache_estatisticas():
+    """Acertos, falhas e ocupação dos caches de otimizações, de perfis e de cartões renderizados"""
+    return jsonify(dict(
+        _cache().estatisticas(),
+        perfis=_cache_perfis().estatisticas(),
+        fragmentos=current_app.extensions['cache_fragmentos'].estatisticas()
+    ))
+
+
+@bp.route('/api/otimizar/larguras/<item_code>')
+def otimizar_larguras(item_code):
+    """Top 10 ancorado no item para cada largura de chapa, com a largura recomendada"""
+    db_path = current_app.config['DATABASE_PATH']
+    
+    try:
+        larguras = _larguras_da_requisicao()
+    except ValueError as erro:
+        return jsonify({'error': str(erro)}), 400
+    
+    item_selecionado = database.get_item_by_code(db_path, item_code)
+    
+    if not item_selecionado:
+        return jsonify({'error': 'Item não encontrado'}), 404
+    
+    itens_grupo = database.get_items_by_dimensions(
+        db_path,
+        item_selecionado.espessura,
+        item_selecionado.largura
+    )
+    quantidade_minima = _quantidade_minima()
+    
+    # Uma chamada para todas as larguras: a tabela da mochila é dividida entre elas
+    otimizador = _otimizador(current_app.config['LARGURA_CHAPA_PADRAO'])
+    resultados = otimizador.varrer_larguras(
+        itens_grupo,
+        [largura_utilizavel for _, _, largura_utilizavel in larguras],
+        top_n=10,
+        item_obrigatorio=item_selecionado.item_code,
+        quantidade_minima=quantidade_minima
+    )
+    recomendada = recomendar_largura(resultados)
+    
+    resposta = {
+        'item_code': item_selecionado.item_code,
+        'qtd_minima': quantidade_minima,
+        'larguras': [
+            {
+                'largura_bruta': largura_bruta,
+                'refilo': refilo,
+                'largura_chapa_utilizavel': largura_utilizavel,
+                'recomendada': largura_utilizavel == recomendada,
+                'padroes': [padrao.para_dict() for padrao in resultados[largura_utilizavel]]
+            }
+            for largura_bruta, refilo, largura_utilizavel in larguras
+        ],
+        'recomendada': next(
+            (
+                {'largura_bruta': largura_bruta, 'refilo': refilo, 'largura_chapa_utilizavel': largura_utilizavel}
+                for largura_bruta, refilo, largura_utilizavel in larguras if largura_utilizavel == recomendada
+            ),
+            None
+        )
+    }
+    if current_app.debug or request.args.get('debug'):
+        resposta['estatisticas'] = otimizador.estatisticas
+    
+    return jsonify(resposta)
+
+
+@bp.route('/api/otimizar/lote', methods=['GET', 'POST'])
+def otimizar_lote_api():
+    """Otimiza vários grupos em paralelo, um JSON por linha à medida que terminam"""
+    db_path = current_app.config['DATABASE_PATH']
+    largura_bruta, refilo, largura_utilizavel = _largura_da_requisicao()
+    
+    erro = _erro_largura(largura_bruta, refilo)
+    if erro:
+        return jsonify({'error': erro}), 400
+    
+    # Grupos no corpo JSON ({"grupos": [[espessura, largura], ...]}) ou todos
+    dados = request.get_json(silent=True)
+    if dados is None:
+        dados = {}
+    if not isinstance(dados, dict):
+        return jsonify({'error': 'O corpo JSON deve ser um objeto'}), 400
+    try:
+        grupos = [(float(esp), float(larg)) for esp, larg in dados['grupos']] if dados.get('grupos') else None
+        top_n = int(dados.get('top_n', request.args.get('top_n', 10)))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Grupos inválidos'}), 400
+    
+    resultados = otimizar_lote(
+        db_path,
+        largura_utilizavel,
+        grupos=grupos,
+        processos=current_app.config['LOTE_PROCESSOS'],
+        top_n=top_n,
+        margem_corte=current_app.config['MARGEM_CORTE'],
+        semente=current_app.config['BUSCA_SEMENTE'],
+        partidas=current_app.config['BUSCA_PARTIDAS']
+    )
+    
+    linhas = (json.dumps(resultado, ensure_ascii=False) + '\n' for resultado in resultados)
+    return Response(stream_with_context(linhas), mimetype='application/x-ndjson')
+
+
+# Formatos das exportações: (mimetype, extensão)
+_FORMATOS_EXPORTACAO = {
+    'csv': ('text/csv', 'csv'),
+    'json': ('application/json', 'json'),
+}
+
+
+def _exportacao(blocos, formato, nome):
+    """Resposta em fluxo para download (`nome`.csv ou `nome`.json)"""
+    mimetype, extensao = _FORMATOS_EXPORTACAO[formato]
+    return Response(
+        stream_with_context(blocos),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={nome}.{extensao}'}
+    )
+
+
+@bp.route('/api/importar/itens', methods=['POST'])
+def importar_itens():
+    """Upsert de itens por ItemCode a partir de um CSV (corpo da requisição ou arquivo `arquivo`).
+    
+    Lê em fluxo e grava em lotes numa transação só; com erro, nada é gravado.
+    """
+    db_path = current_app.config['DATABASE_PATH']
+    enviado = request.files.get('arquivo')
+    fluxo = enviado.stream if enviado else request.stream
+    
+    try:
+        resultado = intercambio.importar_csv(db_path, io.TextIOWrapper(fluxo, encoding='utf-8-sig', newline=''))
+    except (ValueError, UnicodeDecodeError) as erro:
+        return jsonify({'error': str(erro)}), 400
+    
+    return jsonify(resultado)
+
+
+@bp.route('/api/exportar/itens')
+def exportar_itens():
+    """Catálogo completo em CSV (padrão) ou JSON (`?formato=json`), em fluxo"""
+    formato = request.args.get('formato', 'csv')
+    if formato not in _FORMATOS_EXPORTACAO:
+        return jsonify({'error': 'Formato inválido (csv ou json)'}), 400
+    
+    return _exportacao(
+        intercambio.exportar_itens(current_app.config['DATABASE_PATH'], formato), formato, 'itens'
+    )
+
+
+@bp.route('/api/exportar/lote')
+def exportar_lote():
+    """Plano de produção de todos os grupos (chapas por padrão) em CSV ou JSON, cada grupo escrito quando termina"""
+    largura_bruta, refilo, largura_utilizavel = _largura_da_requisicao()
+    formato = request.args.get('formato', 'csv')
+    
+    erro = _erro_largura(largura_bruta, refilo)
+    if erro:
+        return jsonify({'error': erro}), 400
+    if formato not in _FORMATOS_EXPORTACAO:
+        return jsonify({'error': 'Formato inválido (csv ou json)'}), 400
+    
+    resultados = planejar_lote(
+        current_app.config['DATABASE_PATH'],
+        largura_utilizavel,
+        processos=current_app.config['LOTE_PROCESSOS'],
+        margem_corte=current_app.config['MARGEM_CORTE']
+    )
+    
+    return _exportacao(intercambio.exportar_lote(resultados, formato), formato, f'lote-{largura_utilizavel:g}')
@@ -27,23 +27,83 @@ function atualizarLargura() {
     });
 }
 
-function filtrarItens() {
-    const filtroDescricao = document.getElementById('filtroDescricao').value.toLowerCase();
-    const filtroEspessura = document.getElementById('filtroEspessura').value;
+// --- Lista de itens paginada no servidor (/api/itens) ---
+
+let temporizadorFiltro = null;
+let requisicaoItens = null;
+let carregandoItens = false;
+
+// Busca uma página de itens; com `reiniciar`, descarta a lista e volta à página 1
+function carregarItens(reiniciar) {
+    const grid = document.getElementById('itemsGrid');
+    const pagina = reiniciar ? 1 : parseInt(grid.dataset.pagina, 10) + 1;
+    
+    if (!reiniciar && (carregandoItens || pagina > parseInt(grid.dataset.paginas, 10))) {
+        return;
+    }
+    
+    // Uma busca nova cancela a anterior (digitação rápida)
+    if (requisicaoItens) {
+        requisicaoItens.abort();
+    }
+    requisicaoItens = new AbortController();
+    carregandoItens = true;
     
-    const cards = document.querySelectorAll('.item-card');
+    const parametros = new URLSearchParams({
+        q: document.getElementById('filtroDescricao').value.trim(),
+        espessura: document.getElementById('filtroEspessura').value,
+        pagina: pagina,
+        por_pagina: grid.dataset.porPagina
+    });
     
-    cards.forEach(card => {
-        const searchData = card.getAttribute('data-search');
-        const espessuraData = card.getAttribute('data-espessura');
+    fetch(`${grid.dataset.url}?${parametros}`, { signal: requisicaoItens.signal })
+    .then(response => response.json())
+    .then(dados => {
+        if (reiniciar) {
+            grid.innerHTML = '';
+        }
+        // Cartões renderizados no servidor com a macro item_card (_components.html)
+        grid.insertAdjacentHTML('beforeend', dados.html);
         
-        const matchDescricao = searchData.includes(filtroDescricao);
-        const matchEspessura = (filtroEspessura === "") || (espessuraData === filtroEspessura);
+        grid.dataset.pagina = dados.pagina;
+        grid.dataset.paginas = dados.paginas;
+        document.getElementById('itemsCount').textContent = `${dados.total} itens`;
+        carregandoItens = false;
         
-        if (matchDescricao && matchEspessura) {
-            card.style.display = 'block';
-        } else {
-            card.style.display = 'none';
+        // A página pode não ter enchido a tela: continua enquanto o fim estiver visível
+        verificarFimDaLista();
+    })
+    .catch(erro => {
+        if (erro.name !== 'AbortError') {
+            carregandoItens = false;
         }
     });
-}
\ No newline at end of file
+}
+
+function verificarFimDaLista() {
+    const sentinela = document.getElementById('itemsSentinel');
+    if (sentinela && sentinela.getBoundingClientRect().top <= window.innerHeight + 200) {
+        carregarItens(false);
+    }
+}
+
+function filtrarItens() {
+    // Espera a digitação parar antes de consultar o servidor
+    clearTimeout(temporizadorFiltro);
+    temporizadorFiltro = setTimeout(() => carregarItens(true), 250);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const sentinela = document.getElementById('itemsSentinel');
+    if (!sentinela) {
+        return;
+    }
+    
+    // Rolagem infinita: carrega a próxima página quando o fim da lista aparece
+    const observador = new IntersectionObserver(entradas => {
+        if (entradas.some(entrada => entrada.isIntersecting)) {
+            carregarItens(false);
+        }
+    }, { rootMargin: '200px' });
+    observador.observe(sentinela);
+});
@@ -18,4 +18,81 @@ document.addEventListener('DOMContentLoaded', function() {
             bar.style.width = width;
         }, 100 * index);
     });
-});
\ No newline at end of file
+});
+
+// --- Resultados por tarefa em segundo plano (Server-Sent Events) ---
+
+function escaparHtml(texto) {
+    const div = document.createElement('div');
+    div.textContent = texto;
+    return div.innerHTML;
+}
+
+// `html` vem renderizado no servidor com as macros de _components.html
+function mostrarPadroes(container, html, status, classe) {
+    const aviso = status ? `<div class="patterns-status ${classe || ''}">${status}</div>` : '';
+    container.innerHTML = aviso + html;
+}
+
+function mostrarDepuracao(html) {
+    const painel = document.getElementById('debug-panel');
+    if (painel) {
+        painel.innerHTML = html;
+    }
+}
+
+function acompanharTarefa(container) {
+    const dados = container.dataset;
+    
+    fetch(dados.tarefaUrl, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            item_code: dados.itemCode,
+            largura: parseFloat(dados.largura),
+            refilo: parseFloat(dados.refilo),
+            qtd_minima: parseInt(dados.qtdMinima, 10),
+            ordem: dados.ordem || undefined
+        })
+    })
+    .then(response => response.json().then(corpo => {
+        if (!response.ok) {
+            throw new Error(corpo.error || 'Falha ao criar a tarefa');
+        }
+        return corpo;
+    }))
+    .then(tarefa => {
+        const eventos = new EventSource(tarefa.eventos);
+        
+        // Melhores padrões até agora, a cada estratégia concluída
+        eventos.addEventListener('parcial', evento => {
+            const parcial = JSON.parse(evento.data);
+            mostrarPadroes(container, parcial.html, `⏳ Otimizando... (${parcial.estrategia})`);
+        });
+        
+        eventos.addEventListener('concluida', evento => {
+            eventos.close();
+            const resultado = JSON.parse(evento.data);
+            mostrarPadroes(container, resultado.html,
+                resultado.padroes.length === 0 ? 'Nenhum padrão encontrado para este item.' : '');
+            mostrarDepuracao(resultado.html_depuracao);
+        });
+        
+        eventos.addEventListener('erro', evento => {
+            eventos.close();
+            mostrarPadroes(container, '', '❌ ' + escaparHtml(JSON.parse(evento.data).erro), 'erro');
+        });
+    })
+    .catch(erro => {
+        mostrarPadroes(container, '', '❌ ' + escaparHtml(erro.message), 'erro');
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const container = document.getElementById('patterns');
+    if (container && container.dataset.tarefaUrl) {
+        acompanharTarefa(container);
+    }
+});
@@ -0,0 +1,131 @@
+# app/tarefas.py
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Estados de uma tarefa
+PENDENTE = 'pendente'
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+ERRO = 'erro'
+
+
+class Tarefa:
+    """Otimização em segundo plano com o histórico de eventos publicados.
+    
+    Os eventos ficam numa lista só de acréscimo; quem acompanha a tarefa
+    guarda o índice do último evento lido e espera pelos próximos, então
+    vários leitores (e reconexões) recebem a mesma sequência.
+    """
+    
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.estado = PENDENTE
+        self.resultado: Any = None
+        self.erro: Optional[str] = None
+        self.criada_em = time.time()
+        self.terminada_em: Optional[float] = None
+        
+        self._eventos: List[Tuple[str, Any]] = []
+        self._condicao = threading.Condition()
+    
+    @property
+    def terminada(self) -> bool:
+        return self.estado in (CONCLUIDA, ERRO)
+    
+    def publicar(self, tipo: str, dados: Any):
+        """Acrescenta um evento e acorda quem estiver esperando"""
+        with self._condicao:
+            self._eventos.append((tipo, dados))
+            self._condicao.notify_all()
+    
+    def _terminar(self, estado: str, resultado: Any = None, erro: Optional[str] = None):
+        """Marca o fim da tarefa e publica o evento final"""
+        with self._condicao:
+            self.estado = estado
+            self.resultado = resultado
+            self.erro = erro
+            self.terminada_em = time.time()
+            self._eventos.append((estado, resultado if estado == CONCLUIDA else {'erro': erro}))
+            self._condicao.notify_all()
+    
+    def eventos_desde(self, indice: int, timeout: float) -> Tuple[List[Tuple[int, str, Any]], bool]:
+        """Eventos a partir de `indice` (espera até `timeout` se não houver nenhum).
+        
+        Devolve `[(indice, tipo, dados), ...]` e se a tarefa já terminou.
+        """
+        with self._condicao:
+            if indice >= len(self._eventos) and not self.terminada:
+                self._condicao.wait(timeout)
+            novos = [(n, tipo, dados) for n, (tipo, dados) in enumerate(self._eventos[indice:], start=indice)]
+            return novos, self.terminada
+    
+    def resumo(self) -> dict:
+        """Estado serializável (sem o histórico de eventos)"""
+        return {
+            'id': self.id,
+            'estado': self.estado,
+            'resultado': self.resultado,
+            'erro': self.erro,
+            'eventos': len(self._eventos)
+        }
+
+
+class GerenciadorTarefas:
+    """Pool local de threads que executa as otimizações fora das requisições.
+    
+    As tarefas terminadas ficam disponíveis por `retencao_s` segundos para
+    consulta e reconexão; depois são descartadas na próxima submissão.
+    """
+    
+    def __init__(self, max_trabalhadores: int = 2, retencao_s: float = 600.0):
+        self.retencao_s = retencao_s
+        self._executor = ThreadPoolExecutor(max_workers=max_trabalhadores, thread_name_prefix='tarefa')
+        self._tarefas: Dict[str, Tarefa] = {}
+        self._lock = threading.Lock()
+    
+    def submeter(self, funcao: Callable[[Tarefa], Any]) -> Tarefa:
+        """Agenda `funcao(tarefa)`; o valor devolvido vira o resultado da tarefa"""
+        tarefa = Tarefa()
+        with self._lock:
+            self._descartar_antigas()
+            self._tarefas[tarefa.id] = tarefa
+        
+        self._executor.submit(self._executar, tarefa, funcao)
+        return tarefa
+    
+    def obter(self, tarefa_id: str) -> Optional[Tarefa]:
+        """Tarefa pelo id (None se não existe ou já foi descartada)"""
+        with self._lock:
+            return self._tarefas.get(tarefa_id)
+    
+    def estatisticas(self) -> dict:
+        """Quantidade de tarefas por estado"""
+        with self._lock:
+            contagem = {PENDENTE: 0, EXECUTANDO: 0, CONCLUIDA: 0, ERRO: 0}
+            for tarefa in self._tarefas.values():
+                contagem[tarefa.estado] += 1
+            return contagem
+    
+    def _executar(self, tarefa: Tarefa, funcao: Callable[[Tarefa], Any]):
+        """Roda a tarefa na thread do pool e registra o resultado ou a falha"""
+        tarefa.estado = EXECUTANDO
+        tarefa.publicar('estado', {'estado': EXECUTANDO})
+        try:
+            resultado = funcao(tarefa)
+        except Exception as erro:
+            tarefa._terminar(ERRO, erro=str(erro))
+        else:
+            tarefa._terminar(CONCLUIDA, resultado=resultado)
+    
+    def _descartar_antigas(self):
+        """Remove tarefas terminadas há mais de `retencao_s` (chamado com o lock)"""
+        limite = time.time() - self.retencao_s
+        antigas = [
+            tarefa_id for tarefa_id, tarefa in self._tarefas.items()
+            if tarefa.terminada and tarefa.terminada_em < limite
+        ]
+        for tarefa_id in antigas:
+            del self._tarefas[tarefa_id]
@@ -0,0 +1,325 @@
+# benchmarks/carga.py
+"""Teste de carga das rotas Flask com clientes concorrentes.
+
+Uso (na raiz do projeto):
+    
+    python -m benchmarks.carga                             # 12 clientes, 20 s
+    python -m benchmarks.carga --clientes 24 --escritas 5 --saida carga.json
+    python -m benchmarks.carga --comparar carga.json
+
+Gera um tbl_demanda sintético num arquivo temporário, sobe a aplicação de
+`create_app` num processo separado (servidor do werkzeug com threads, o
+mesmo do run.py) e dispara uma mistura de requisições de vários clientes
+ao mesmo tempo. Opcionalmente, uma thread grava no banco como uma
+sincronização de estoque, para medir a disputa pelo lock do SQLite e as
+invalidações de cache. O relatório traz vazão e latência p50/p95/p99 por
+rota.
+
+Com `--comparar`, termina com código 1 se alguma rota ficou mais lenta
+(p95) ou com menos vazão que a tolerância, ou se apareceram erros. Só são
+comparáveis execuções na mesma máquina e com os mesmos parâmetros.
+"""
+import argparse
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from typing import Dict, List, Tuple
+
+# O pacote app importa config.py, que exige estas variáveis; o banco de
+# verdade é o arquivo gerado, passado na configuração
+os.environ.setdefault('PORT', '0')
+os.environ.setdefault('DATABASE_PATH', ':memory:')
+
+import numpy as np
+
+from .gerador import gerar_banco
+
+# Versão do formato do relatório
+VERSAO_FORMATO = 1
+
+# Mistura padrão de requisições: (rota, peso). A rota é o rótulo do relatório
+MISTURA = (
+    ('GET /', 2),
+    ('GET /api/itens', 4),
+    ('GET /otimizar/<item_code>', 3),
+    ('GET /api/config', 1),
+)
+
+# Largura e refilo usados nas otimizações
+LARGURA = 1220.0
+REFILO = 10.0
+
+# Termos de busca de /api/itens (os códigos sintéticos começam com SIN)
+_BUSCAS = ('', '', 'SIN', 'sintético 1', '00')
+
+
+def _montar_requisicao(rota: str, aleatorio: random.Random, codigos: List[str]) -> Tuple[str, str]:
+    """Método e caminho de uma requisição da `rota`"""
+    if rota == 'GET /':
+        return 'GET', '/'
+    if rota == 'GET /api/itens':
+        return 'GET', (
+            f'/api/itens?q={urllib.parse.quote_plus(aleatorio.choice(_BUSCAS))}&pagina={aleatorio.randint(1, 3)}'
+        )
+    if rota == 'GET /otimizar/<item_code>':
+        return 'GET', f'/otimizar/{aleatorio.choice(codigos)}?largura={LARGURA}&refilo={REFILO}&sincrono=1'
+    if rota == 'GET /api/config':
+        return 'GET', '/api/config'
+    raise ValueError(f'Rota desconhecida: {rota}')
+
+
+def _servir(caminho_banco: str, fila):
+    """Processo do servidor: aplicação de `create_app` no werkzeug com threads"""
+    from werkzeug.serving import make_server
+    
+    from app import create_app
+    from config import Config
+    
+    class ConfigCarga(Config):
+        DEBUG = False
+        DATABASE_PATH = caminho_banco
+    
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    servidor = make_server('127.0.0.1', 0, create_app(ConfigCarga), threaded=True)
+    fila.put(servidor.server_port)
+    servidor.serve_forever()
+
+
+def _cliente(porta: int, semente: int, codigos: List[str], mistura: Tuple[Tuple[str, int], ...],
+             inicio_medida: float, fim: float, medidas: list):
+    """Repete requisições sorteadas até `fim`; guarda (rota, segundos, ok) das que começam após o aquecimento"""
+    aleatorio = random.Random(semente)
+    rotas = [rota for rota, _ in mistura]
+    pesos = [peso for _, peso in mistura]
+    conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=120)
+    
+    while time.perf_counter() < fim:
+        rota = aleatorio.choices(rotas, pesos)[0]
+        metodo, caminho = _montar_requisicao(rota, aleatorio, codigos)
+        
+        inicio = time.perf_counter()
+        try:
+            conexao.request(metodo, caminho)
+            resposta = conexao.getresponse()
+            resposta.read()
+            ok = resposta.status < 400
+        except (OSError, http.client.HTTPException):
+            conexao.close()
+            ok = False
+        duracao = time.perf_counter() - inicio
+        
+        if inicio >= inicio_medida:
+            medidas.append((rota, duracao, ok))
+    
+    conexao.close()
+
+
+def _escrever(caminho_banco: str, codigos: List[str], escritas_por_s: float, semente: int,
+              fim: float, contagem: list):
+    """Sincronização simulada: altera a demanda de um item `escritas_por_s` vezes por segundo"""
+    aleatorio = random.Random(semente)
+    conn = sqlite3.connect(caminho_banco, timeout=30)
+    intervalo = 1 / escritas_por_s
+    proxima = time.perf_counter()
+    
+    try:
+        while proxima < fim:
+            time.sleep(max(proxima - time.perf_counter(), 0))
+            with conn:
+                conn.execute(
+                    'UPDATE tbl_demanda SET demanda = demanda + ? WHERE ItemCode = ?',
+                    (aleatorio.randint(1, 10), aleatorio.choice(codigos))
+                )
+            contagem[0] += 1
+            proxima += intervalo
+    finally:
+        conn.close()
+
+
+def _resumir(latencias: List[float], erros: int, segundos: float) -> dict:
+    """Vazão e latências (ms) de um conjunto de requisições"""
+    if not latencias:
+        return {'requisicoes': 0, 'erros': erros, 'vazao_rps': 0.0}
+    
+    ms = np.array(latencias) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        'requisicoes': len(latencias),
+        'erros': erros,
+        'vazao_rps': len(latencias) / segundos,
+        'media_ms': float(ms.mean()),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(ms.max())
+    }
+
+
+def executar(clientes: int = 12, duracao_s: float = 20.0, aquecimento_s: float = 3.0,
+             grupos: int = 8, itens_por_grupo: int = 50, escritas_por_s: float = 1.0,
+             semente: int = 1, mistura=MISTURA) -> dict:
+    """Gera o banco, sobe o servidor, roda a carga e devolve o relatório"""
+    with tempfile.TemporaryDirectory(prefix='carga-') as pasta:
+        caminho_banco = os.path.join(pasta, 'demanda.db')
+        codigos = gerar_banco(caminho_banco, grupos, itens_por_grupo, semente)
+        
+        fila = multiprocessing.Queue()
+        servidor = multiprocessing.Process(target=_servir, args=(caminho_banco, fila), daemon=True)
+        servidor.start()
+        try:
+            porta = fila.get(timeout=60)
+            
+            inicio_medida = time.perf_counter() + aquecimento_s
+            fim = inicio_medida + duracao_s
+            medidas, escritas = [], [0]
+            threads = [
+                threading.Thread(
+                    target=_cliente,
+                    args=(porta, semente * 1000 + i, codigos, tuple(mistura), inicio_medida, fim, medidas)
+                )
+                for i in range(clientes)
+            ]
+            if escritas_por_s > 0:
+                threads.append(threading.Thread(
+                    target=_escrever,
+                    args=(caminho_banco, codigos, escritas_por_s, semente, fim, escritas)
+                ))
+            
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            # Requisições que terminaram depois de `fim` ainda contam
+            segundos = max(time.perf_counter(), fim) - inicio_medida
+        finally:
+            servidor.terminate()
+            servidor.join()
+    
+    por_rota: Dict[str, Tuple[List[float], int]] = {rota: ([], 0) for rota, _ in mistura}
+    for rota, duracao, ok in medidas:
+        latencias, erros = por_rota[rota]
+        latencias.append(duracao)
+        por_rota[rota] = (latencias, erros + (not ok))
+    
+    return {
+        'versao': VERSAO_FORMATO,
+        'ambiente': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'maquina': platform.machine(),
+            'processador': platform.processor() or platform.machine(),
+            'nucleos': os.cpu_count()
+        },
+        'configuracao': {
+            'clientes': clientes,
+            'duracao_s': duracao_s,
+            'aquecimento_s': aquecimento_s,
+            'grupos': grupos,
+            'itens_por_grupo': itens_por_grupo,
+            'escritas_por_s': escritas_por_s,
+            'semente': semente,
+            'mistura': [list(par) for par in mistura]
+        },
+        'escritas': escritas[0],
+        'rotas': {rota: _resumir(latencias, erros, segundos) for rota, (latencias, erros) in por_rota.items()},
+        'total': _resumir(
+            [duracao for _, duracao, _ in medidas], sum(not ok for _, _, ok in medidas), segundos
+        )
+    }
+
+
+def comparar(atual: dict, base: dict, tolerancia: float = 0.25) -> List[str]:
+    """Regressões de `atual` em relação a `base` (lista vazia = sem regressão).
+    
+    Por rota: p95 mais que `tolerancia` acima da base, vazão mais que
+    `tolerancia` abaixo, ou mais erros. Relatórios com configuração
+    diferente não são comparados.
+    """
+    if atual['configuracao'] != base.get('configuracao'):
+        return ['configuração diferente da base; rode com os mesmos parâmetros']
+    
+    regressoes = []
+    for rota, medida in list(atual['rotas'].items()) + [('total', atual['total'])]:
+        anterior = base['total'] if rota == 'total' else base.get('rotas', {}).get(rota)
+        if not anterior or not anterior['requisicoes']:
+            continue
+        
+        if medida['erros'] > anterior['erros']:
+            regressoes.append(f"{rota}: {medida['erros']} erros (base {anterior['erros']})")
+        if not medida['requisicoes']:
+            regressoes.append(f"{rota}: nenhuma requisição concluída")
+            continue
+        if medida['p95_ms'] > anterior['p95_ms'] * (1 + tolerancia):
+            regressoes.append(f"{rota}: p95 {medida['p95_ms']:.1f} ms (base {anterior['p95_ms']:.1f} ms)")
+        if medida['vazao_rps'] < anterior['vazao_rps'] * (1 - tolerancia):
+            regressoes.append(
+                f"{rota}: vazão {medida['vazao_rps']:.1f} req/s (base {anterior['vazao_rps']:.1f} req/s)"
+            )
+    
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Teste de carga das rotas Flask')
+    parser.add_argument('--clientes', type=int, default=12, help='Clientes simultâneos')
+    parser.add_argument('--duracao', type=float, default=20.0, help='Segundos medidos')
+    parser.add_argument('--aquecimento', type=float, default=3.0, help='Segundos iniciais descartados')
+    parser.add_argument('--grupos', type=int, default=8, help='Grupos (espessura, largura) no banco gerado')
+    parser.add_argument('--itens', dest='itens_por_grupo', type=int, default=50, help='Itens por grupo')
+    parser.add_argument('--escritas', type=float, default=1.0, help='Gravações por segundo no banco (0 = nenhuma)')
+    parser.add_argument('--semente', type=int, default=1, help='Semente do banco e dos clientes')
+    parser.add_argument('--saida', help='Grava o relatório JSON neste arquivo')
+    parser.add_argument('--comparar', help='Relatório JSON anterior para detectar regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='Folga aceita (fração)')
+    args = parser.parse_args(argv)
+    
+    relatorio = executar(
+        clientes=args.clientes,
+        duracao_s=args.duracao,
+        aquecimento_s=args.aquecimento,
+        grupos=args.grupos,
+        itens_por_grupo=args.itens_por_grupo,
+        escritas_por_s=args.escritas,
+        semente=args.semente
+    )
+    
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write('\n')
+    else:
+        print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    
+    # Resumo legível
+    for rota, medida in list(relatorio['rotas'].items()) + [('total', relatorio['total'])]:
+        if not medida['requisicoes']:
+            print(f"{rota:28s} sem requisições  {medida['erros']} erros", file=sys.stderr)
+            continue
+        print(
+            f"{rota:28s} {medida['vazao_rps']:8.1f} req/s  p50 {medida['p50_ms']:8.1f}  "
+            f"p95 {medida['p95_ms']:8.1f}  p99 {medida['p99_ms']:8.1f} ms  {medida['erros']} erros",
+            file=sys.stderr
+        )
+    
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), args.tolerancia)
+        for regressao in regressoes:
+            print(f'REGRESSÃO {regressao}', file=sys.stderr)
+        return 1 if regressoes else 0
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
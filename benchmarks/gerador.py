@@ -0,0 +1,121 @@
+# benchmarks/gerador.py
+import random
+import sqlite3
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from app.models import Item
+
+
+@dataclass(frozen=True)
+class CenarioSintetico:
+    """Parâmetros de um grupo sintético de itens (mesma espessura e largura).
+    
+    `dispersao` é a faixa do desenvolvimento como fração da largura da
+    chapa e `fracao_falta` a parte dos itens com demanda acima do estoque
+    (prioridade alta). `margem_corte` é a do otimizador (o padrão é o de
+    MARGEM_CORTE em produção).
+    """
+    nome: str
+    n_itens: int
+    largura_chapa: float = 1220.0
+    dispersao: Tuple[float, float] = (0.05, 0.45)
+    fracao_falta: float = 0.5
+    casas_decimais: int = 1
+    margem_corte: float = 5.0
+    espessura: float = field(default=1.2, compare=False)
+    
+    def gerar(self, semente: int) -> List[Item]:
+        """Grupo reprodutível: a mesma semente gera sempre os mesmos itens"""
+        return gerar_grupo(
+            semente, self.n_itens, self.largura_chapa, self.dispersao,
+            self.fracao_falta, self.casas_decimais, self.espessura
+        )
+
+
+def gerar_grupo(semente: int, n_itens: int, largura_chapa: float = 1220.0,
+                dispersao: Tuple[float, float] = (0.05, 0.45), fracao_falta: float = 0.5,
+                casas_decimais: int = 1, espessura: float = 1.2) -> List[Item]:
+    """Gera `n_itens` itens sintéticos de um grupo com gerador próprio (semente fixa)"""
+    aleatorio = random.Random(semente)
+    minimo, maximo = dispersao
+    itens = []
+    
+    for i in range(n_itens):
+        desenvolvimento = round(aleatorio.uniform(minimo, maximo) * largura_chapa, casas_decimais)
+        estoque_maximo = aleatorio.randint(20, 200)
+        estoque_atual = aleatorio.randint(0, estoque_maximo)
+        
+        if aleatorio.random() < fracao_falta:
+            demanda = estoque_atual + aleatorio.randint(1, 100)
+        else:
+            demanda = aleatorio.randint(0, estoque_atual)
+        
+        itens.append(Item(
+            item_code=f'SIN{semente:03d}-{i:04d}',
+            item_name=f'Perfil sintético {i}',
+            espessura=espessura,
+            desenvolvimento=max(desenvolvimento, 10 ** -casas_decimais),
+            largura=largura_chapa,
+            estoque_atual=estoque_atual,
+            estoque_maximo=estoque_maximo,
+            demanda=demanda
+        ))
+    
+    return itens
+
+
+def gerar_banco(caminho: str, grupos: int = 8, itens_por_grupo: int = 50, semente: int = 1) -> List[str]:
+    """Grava um tbl_demanda sintético em `caminho` (substitui a tabela); devolve os códigos.
+    
+    Os grupos combinam espessuras e larguras de chapa comuns, cada um com
+    seu gerador (semente + posição), então o mesmo arquivo sai sempre igual.
+    """
+    combinacoes = [(espessura, largura) for largura in (1220.0, 1000.0, 1500.0) for espessura in (0.9, 1.2, 1.5, 2.0)]
+    itens = [
+        item
+        for posicao in range(grupos)
+        for item in gerar_grupo(
+            semente * 1000 + posicao, itens_por_grupo,
+            largura_chapa=combinacoes[posicao % len(combinacoes)][1],
+            espessura=combinacoes[posicao % len(combinacoes)][0]
+        )
+    ]
+    
+    conn = sqlite3.connect(caminho)
+    try:
+        with conn:
+            conn.execute('DROP TABLE IF EXISTS tbl_demanda')
+            conn.execute(
+                'CREATE TABLE tbl_demanda (ItemCode TEXT, ItemName TEXT, espessura REAL, desenvolvimento REAL, '
+                'largura REAL, estoque_atual INTEGER, estoque_maximo INTEGER, demanda INTEGER)'
+            )
+            conn.executemany(
+                'INSERT INTO tbl_demanda VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (item.item_code, item.item_name, item.espessura, item.desenvolvimento, item.largura,
+                     item.estoque_atual, item.estoque_maximo, item.demanda)
+                    for item in itens
+                ]
+            )
+    finally:
+        conn.close()
+    
+    return [item.item_code for item in itens]
+
+
+# Cenários padrão do benchmark: variam tamanho do grupo, dispersão das
+# peças, largura da chapa e mistura demanda/estoque, um eixo por vez
+CENARIOS = (
+    CenarioSintetico('pequeno', n_itens=10),
+    CenarioSintetico('medio', n_itens=50),
+    CenarioSintetico('grande', n_itens=150),
+    CenarioSintetico('pecas_estreitas', n_itens=50, dispersao=(0.01, 0.08)),
+    CenarioSintetico('pecas_largas', n_itens=50, dispersao=(0.25, 0.6)),
+    CenarioSintetico('chapa_1000', n_itens=50, largura_chapa=1000.0),
+    CenarioSintetico('chapa_1500', n_itens=50, largura_chapa=1500.0),
+    CenarioSintetico('medidas_centesimais', n_itens=50, casas_decimais=2),
+    CenarioSintetico('so_falta', n_itens=50, fracao_falta=1.0),
+    CenarioSintetico('so_estoque', n_itens=50, fracao_falta=0.0),
+    CenarioSintetico('sem_margem', n_itens=50, margem_corte=0.0),
+)
@@ -0,0 +1,213 @@
+# benchmarks/otimizador.py
+"""Benchmark do OtimizadorCorte1D sobre grupos sintéticos.
+
+Uso (na raiz do projeto):
+
+    python -m benchmarks.otimizador                        # imprime o JSON
+    python -m benchmarks.otimizador --saida benchmarks/baseline.json
+    python -m benchmarks.otimizador --comparar benchmarks/baseline.json
+
+Com `--comparar`, termina com código 1 se algum cenário ficou mais lento
+que a tolerância ou se a qualidade (desperdício/score) piorou. Tempos só
+são comparáveis entre execuções na mesma máquina.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+# O pacote app importa config.py, que exige estas variáveis; o benchmark não usa banco
+os.environ.setdefault('PORT', '0')
+os.environ.setdefault('DATABASE_PATH', ':memory:')
+
+import numpy as np
+
+from app.optimizer import OtimizadorCorte1D
+from .gerador import CENARIOS, CenarioSintetico
+
+# Versão do formato do arquivo de baseline
+VERSAO_FORMATO = 1
+
+
+def medir_cenario(cenario: CenarioSintetico, sementes: List[int], repeticoes: int, top_n: int) -> dict:
+    """Mede um cenário somando as sementes; tempos são o mínimo das repetições"""
+    tempo_total = 0.0
+    memoria_pico = 0
+    estrategias: Dict[str, dict] = {}
+    melhores_desperdicios, melhores_scores, desperdicios_medios, padroes = [], [], [], []
+    
+    for semente in sementes:
+        itens = cenario.gerar(semente)
+        otimizador = OtimizadorCorte1D(cenario.largura_chapa, margem_corte=cenario.margem_corte)
+        
+        # Ponta a ponta e por estratégia, da repetição mais rápida (o mínimo
+        # filtra ruído da máquina)
+        tempo_minimo, medidas = float('inf'), None
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resultado = otimizador.gerar_padroes_otimizados(itens, top_n=top_n)
+            tempo = time.perf_counter() - inicio
+            if tempo < tempo_minimo:
+                tempo_minimo, medidas = tempo, otimizador.estatisticas['estrategias']
+        tempo_total += tempo_minimo
+        
+        for nome, medida in medidas.items():
+            acumulado = estrategias.setdefault(nome, {'tempo_s': 0.0, 'candidatos': 0, 'duplicados': 0, 'no_top': 0})
+            for campo in acumulado:
+                acumulado[campo] += medida[campo]
+        
+        # Memória em execução separada: o tracemalloc deixa tudo mais lento
+        tracemalloc.start()
+        otimizador.gerar_padroes_otimizados(itens, top_n=top_n)
+        memoria_pico = max(memoria_pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        
+        padroes.append(len(resultado))
+        if resultado:
+            melhores_desperdicios.append(resultado[0].desperdicio)
+            melhores_scores.append(resultado[0].score_prioridade)
+            desperdicios_medios.append(float(np.mean([padrao.desperdicio for padrao in resultado])))
+    
+    tempo_estrategias = sum(medida['tempo_s'] for medida in estrategias.values())
+    candidatos = sum(medida['candidatos'] for medida in estrategias.values())
+    for medida in estrategias.values():
+        medida['taxa_duplicados'] = medida['duplicados'] / medida['candidatos'] if medida['candidatos'] else 0.0
+    
+    return {
+        'parametros': {
+            'n_itens': cenario.n_itens,
+            'largura_chapa': cenario.largura_chapa,
+            'dispersao': list(cenario.dispersao),
+            'fracao_falta': cenario.fracao_falta,
+            'casas_decimais': cenario.casas_decimais,
+            'margem_corte': cenario.margem_corte
+        },
+        'tempo_total_s': tempo_total,
+        'estrategias': estrategias,
+        'candidatos_por_s': candidatos / tempo_estrategias if tempo_estrategias else 0.0,
+        'memoria_pico_kb': memoria_pico / 1024,
+        'padroes': sum(padroes),
+        'melhor_desperdicio': float(np.mean(melhores_desperdicios)) if melhores_desperdicios else None,
+        'melhor_score': float(np.mean(melhores_scores)) if melhores_scores else None,
+        'desperdicio_medio': float(np.mean(desperdicios_medios)) if desperdicios_medios else None
+    }
+
+
+def executar(cenarios=CENARIOS, sementes=(1, 2, 3), repeticoes: int = 3, top_n: int = 10,
+             progresso=None) -> dict:
+    """Roda todos os cenários e devolve o relatório no formato do baseline"""
+    relatorio = {
+        'versao': VERSAO_FORMATO,
+        'ambiente': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'maquina': platform.machine(),
+            'processador': platform.processor() or platform.machine()
+        },
+        'configuracao': {'sementes': list(sementes), 'repeticoes': repeticoes, 'top_n': top_n},
+        'cenarios': {}
+    }
+    
+    for cenario in cenarios:
+        if progresso:
+            progresso(cenario.nome)
+        relatorio['cenarios'][cenario.nome] = medir_cenario(cenario, list(sementes), repeticoes, top_n)
+    
+    return relatorio
+
+
+def comparar(atual: dict, base: dict, tolerancia: float = 0.25) -> List[str]:
+    """Regressões de `atual` em relação a `base` (lista vazia = sem regressão).
+    
+    Tempo: mais que `tolerancia` acima da base. Qualidade: melhor
+    desperdício ou desperdício médio maiores, ou mesmo desperdício com
+    score de prioridade menor.
+    """
+    regressoes = []
+    
+    for nome, medida in atual['cenarios'].items():
+        anterior = base.get('cenarios', {}).get(nome)
+        if anterior is None or medida['parametros'] != anterior['parametros']:
+            continue
+        
+        if medida['tempo_total_s'] > anterior['tempo_total_s'] * (1 + tolerancia):
+            regressoes.append(
+                f"{nome}: tempo {medida['tempo_total_s'] * 1000:.1f} ms "
+                f"(base {anterior['tempo_total_s'] * 1000:.1f} ms)"
+            )
+        
+        if anterior['melhor_desperdicio'] is None:
+            continue
+        if medida['melhor_desperdicio'] is None:
+            regressoes.append(f"{nome}: nenhum padrão (base {anterior['padroes']})")
+            continue
+        
+        if medida['melhor_desperdicio'] > anterior['melhor_desperdicio'] + 1e-6:
+            regressoes.append(
+                f"{nome}: melhor desperdício {medida['melhor_desperdicio']} (base {anterior['melhor_desperdicio']})"
+            )
+        elif (abs(medida['melhor_desperdicio'] - anterior['melhor_desperdicio']) <= 1e-6
+              and medida['melhor_score'] < anterior['melhor_score']):
+            regressoes.append(f"{nome}: score {medida['melhor_score']} (base {anterior['melhor_score']})")
+        
+        if medida['desperdicio_medio'] > anterior['desperdicio_medio'] + 1e-6:
+            regressoes.append(
+                f"{nome}: desperdício médio {medida['desperdicio_medio']:.3f} "
+                f"(base {anterior['desperdicio_medio']:.3f})"
+            )
+    
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark do otimizador de corte 1D')
+    parser.add_argument('--saida', help='Grava o relatório JSON neste arquivo')
+    parser.add_argument('--comparar', help='Baseline JSON para detectar regressões')
+    parser.add_argument('--tolerancia', type=float, default=0.25, help='Folga de tempo aceita (fração)')
+    parser.add_argument('--cenario', action='append', help='Só estes cenários (repetível)')
+    parser.add_argument('--sementes', type=int, default=3, help='Grupos sintéticos por cenário')
+    parser.add_argument('--repeticoes', type=int, default=3, help='Repetições por medida de tempo')
+    parser.add_argument('--top', dest='top_n', type=int, default=10, help='Padrões mantidos')
+    args = parser.parse_args(argv)
+    
+    cenarios = [cenario for cenario in CENARIOS if not args.cenario or cenario.nome in args.cenario]
+    relatorio = executar(
+        cenarios,
+        sementes=range(1, args.sementes + 1),
+        repeticoes=args.repeticoes,
+        top_n=args.top_n,
+        progresso=lambda nome: print(f'... {nome}', file=sys.stderr)
+    )
+    
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write('\n')
+    else:
+        print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    
+    # Resumo legível
+    for nome, medida in relatorio['cenarios'].items():
+        print(
+            f"{nome:22s} {medida['tempo_total_s'] * 1000:9.1f} ms  "
+            f"{medida['candidatos_por_s']:10.0f} cand/s  {medida['memoria_pico_kb']:8.0f} KiB  "
+            f"desp {medida['melhor_desperdicio']}",
+            file=sys.stderr
+        )
+    
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            regressoes = comparar(relatorio, json.load(arquivo), args.tolerancia)
+        for regressao in regressoes:
+            print(f'REGRESSÃO {regressao}', file=sys.stderr)
+        return 1 if regressoes else 0
+    
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,4 +12,62 @@ class Config:
         raise ValueError("A variável de ambiente DATABASE_PATH não foi definida.")
 
     LARGURA_CHAPA_PADRAO = float(os.environ.get('LARGURA_CHAPA_PADRAO', 1220.0))
-    MARGEM_CORTE = float(os.environ.get('MARGEM_CORTE', 5.0))
\ No newline at end of file
+    MARGEM_CORTE = float(os.environ.get('MARGEM_CORTE', 5.0))
+
+    # Maior largura de chapa aceita nas requisições (mm)
+    LARGURA_CHAPA_MAXIMA = float(os.environ.get('LARGURA_CHAPA_MAXIMA', 10_000.0))
+
+    # Larguras de bobina em estoque (mm, separadas por vírgula) para /api/otimizar/larguras
+    LARGURAS_CHAPA = [
+        float(largura) for largura in os.environ.get('LARGURAS_CHAPA', str(LARGURA_CHAPA_PADRAO)).split(',')
+        if largura.strip()
+    ]
+    VARREDURA_MAX_LARGURAS = int(os.environ.get('VARREDURA_MAX_LARGURAS', 12))
+
+    # Maior `qtd_minima` aceita; acima disso vale este valor (com a largura
+    # máxima, só peças menores que 1 mm chegariam a tantas por chapa)
+    QTD_MINIMA_MAXIMA = int(os.environ.get('QTD_MINIMA_MAXIMA', 10_000))
+
+    # Branch-and-bound com prazo (?prazo_ms=): maior prazo aceito por requisição
+    PRAZO_MAX_MS = float(os.environ.get('PRAZO_MAX_MS', 5000))
+
+    # Página inicial / busca de itens (/api/itens)
+    ITENS_POR_PAGINA = int(os.environ.get('ITENS_POR_PAGINA', 60))
+    ITENS_POR_PAGINA_MAX = int(os.environ.get('ITENS_POR_PAGINA_MAX', 200))
+
+    # Snapshot do catálogo em memória, recarregado quando o banco muda
+    CATALOGO_EM_MEMORIA = os.environ.get('CATALOGO_EM_MEMORIA', 'True').lower() == 'true'
+
+    # Cache de resultados do otimizador (LRU)
+    CACHE_MAX_ITENS = int(os.environ.get('CACHE_MAX_ITENS', 256))
+    CACHE_MAX_MB = float(os.environ.get('CACHE_MAX_MB', 64))
+
+    # Resultados do otimizador por perfil de demanda (sobrevivem a gravações no banco)
+    CACHE_PERFIS_MAX_ITENS = int(os.environ.get('CACHE_PERFIS_MAX_ITENS', 1024))
+    CACHE_PERFIS_MAX_MB = float(os.environ.get('CACHE_PERFIS_MAX_MB', 32))
+
+    # Cartões (padrões/itens) já renderizados, reaproveitados entre páginas (LRU)
+    FRAGMENTOS_MAX_ITENS = int(os.environ.get('FRAGMENTOS_MAX_ITENS', 4096))
+    FRAGMENTOS_MAX_MB = float(os.environ.get('FRAGMENTOS_MAX_MB', 16))
+
+    # Compressão (brotli/gzip) das respostas a partir deste tamanho (-1 = desligada)
+    COMPRESSAO_MIN_BYTES = int(os.environ.get('COMPRESSAO_MIN_BYTES', 1024))
+
+    # Cache-Control dos arquivos estáticos pedidos com o hash do conteúdo (segundos)
+    ESTATICOS_MAX_AGE = int(os.environ.get('ESTATICOS_MAX_AGE', 365 * 24 * 3600))
+
+    # Otimização em lote: processos do pool (0 = um por núcleo)
+    LOTE_PROCESSOS = int(os.environ.get('LOTE_PROCESSOS', 0))
+
+    # Busca multipartida do otimizador: semente (mesma semente, mesmo
+    # resultado), partidas (0 = desligada; só roda com prazo, na fronteira
+    # de Pareto ou com medidas que a mochila arredonda) e processos por
+    # otimização (1 = na própria requisição; mais que isso usa um pool
+    # mantido entre requisições)
+    BUSCA_SEMENTE = int(os.environ.get('BUSCA_SEMENTE', 0))
+    BUSCA_PARTIDAS = int(os.environ.get('BUSCA_PARTIDAS', 12))
+    BUSCA_PROCESSOS = int(os.environ.get('BUSCA_PROCESSOS', 1))
+
+    # Tarefas de otimização em segundo plano (threads do pool local)
+    TAREFAS_TRABALHADORES = int(os.environ.get('TAREFAS_TRABALHADORES', 2))
+    TAREFAS_RETENCAO_S = float(os.environ.get('TAREFAS_RETENCAO_S', 600))